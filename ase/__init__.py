@@ -3,8 +3,6 @@
 
 """Atomic Simulation Environment."""
 
-from distutils.version import LooseVersion
-
 import numpy as np
 
 from ase.atom import Atom
@@ -18,6 +16,6 @@ __version__ = '3.18.0b1'
 import ase.parallel  # noqa
 ase.parallel  # silence pyflakes
 
-if LooseVersion(np.__version__) < '1.9':
+if tuple(int(x) for x in np.__version__.split('.')[:2]) < (1, 9):
     raise ImportError(
         'ASE needs NumPy-1.9.0 or later. You have:', np.version)
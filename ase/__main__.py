@@ -1,2 +1,4 @@
 from ase.cli.main import main
-main()
+
+if __name__ == '__main__':
+    main()
@@ -922,8 +922,9 @@ class Atoms(object):
 
         conadd = []
         # Constraints need to be deepcopied, but only the relevant ones.
-        for con in copy.deepcopy(self.constraints):
+        for con in self.constraints:
             if isinstance(con, (FixConstraint, FixBondLengths)):
+                con = copy.deepcopy(con)
                 try:
                     con.index_shuffle(self, i)
                     conadd.append(con)
@@ -937,7 +938,11 @@ class Atoms(object):
 
         atoms.arrays = {}
         for name, a in self.arrays.items():
-            atoms.arrays[name] = a[i].copy()
+            if isinstance(i, slice):
+                atoms.arrays[name] = a[i].copy()
+            else:
+                # Indexing with an array already makes a copy:
+                atoms.arrays[name] = a[i]
 
         atoms.constraints = conadd
         return atoms
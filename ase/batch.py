@@ -0,0 +1,325 @@
+"""Many structures stored in concatenated arrays."""
+import numpy as np
+
+from ase.atoms import Atoms
+from ase.calculators.calculator import all_properties
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.data import atomic_masses
+from ase.geometry import complete_cell
+
+# Results with one value per atom:
+peratom_properties = ['forces', 'energies', 'stresses', 'magmoms',
+                      'charges']
+
+# Optional per-atom arrays read from database rows:
+row_arrays = ['tags', 'momenta', 'masses', 'initial_magmoms',
+              'initial_charges']
+
+
+class AtomsBatch:
+    """Many structures stored in concatenated arrays.
+
+    The per-atom arrays of all structures (numbers, positions, tags,
+    ...) are stored one after the other, so that
+    ``positions[offsets[i]:offsets[i + 1]]`` are the positions of
+    structure number *i*.  The unit cells and boundary conditions are
+    stored in arrays of shape (nframes, 3, 3) and (nframes, 3).
+
+    Results like energies (per structure) and forces (per atom) are
+    stored in the results dict with NaN for missing values.
+    Constraints, celldisp and the info dicts are not stored.
+
+    images: list of Atoms objects
+        Structures to store.
+
+    Indexing with an integer gives an :class:`~ase.Atoms` object
+    sharing memory with the batch (changing its positions in place
+    changes the batch).  Indexing with a slice or an array gives a new
+    AtomsBatch::
+
+        batch = AtomsBatch.read('md.traj')
+        atoms = batch[-1]
+        volumes = batch.get_volumes()
+    """
+
+    def __init__(self, images=()):
+        frames = []
+        for atoms in images:
+            calc = atoms.calc
+            results = getattr(calc, 'results', {}) if calc else {}
+            frames.append((atoms.arrays, atoms.cell, atoms.pbc, results))
+        self._concatenate(frames)
+
+    def _concatenate(self, frames):
+        """Initialize from (arrays, cell, pbc, results) tuples."""
+        natoms = [len(arrays['numbers']) for arrays, _, _, _ in frames]
+        self.offsets = np.zeros(len(frames) + 1, int)
+        self.offsets[1:] = np.cumsum(natoms)
+        self.cell = np.zeros((len(frames), 3, 3))
+        self.pbc = np.zeros((len(frames), 3), bool)
+
+        # Arrays that are missing in some frames are filled with zeros
+        # (default masses for masses) and results with NaN:
+        self.arrays = {}
+        self.results = {}
+        for f, (arrays, cell, pbc, results) in enumerate(frames):
+            self.cell[f] = cell
+            self.pbc[f] = pbc
+            for name, a in arrays.items():
+                self._allocate(self.arrays, name, a, True)[self.slice(f)] = a
+            for name, value in results.items():
+                if name not in all_properties:
+                    continue
+                peratom = name in peratom_properties
+                data = self._allocate(self.results, name, value, peratom,
+                                      fill=np.nan)
+                data[self.slice(f) if peratom else f] = value
+
+        if 'masses' in self.arrays:
+            for f, (arrays, _, _, _) in enumerate(frames):
+                if 'masses' not in arrays:
+                    s = self.slice(f)
+                    self.arrays['masses'][s] = atomic_masses[self.numbers[s]]
+
+        if not frames:
+            self.arrays['numbers'] = np.zeros(0, int)
+            self.arrays['positions'] = np.zeros((0, 3))
+
+    def _allocate(self, dct, name, value, peratom, fill=0):
+        a = dct.get(name)
+        if a is None:
+            value = np.asarray(value)
+            if peratom:
+                shape = (self.offsets[-1],) + value.shape[1:]
+            else:
+                shape = (len(self),) + value.shape
+            dtype = float if fill is np.nan else value.dtype
+            a = dct[name] = np.empty(shape, dtype)
+            a[:] = fill
+        return a
+
+    @classmethod
+    def read(cls, filename, index=':', **kwargs):
+        """Read structures from a file (trajectory, database, ...).
+
+        See :func:`ase.io.iread` for the arguments."""
+        from ase.io import iread
+        if str(filename).endswith('.db'):
+            return cls.from_db(filename)
+        return cls(iread(filename, index, **kwargs))
+
+    def write(self, filename, **kwargs):
+        """Write all structures to a file (trajectory, database, ...).
+
+        See :func:`ase.io.write` for the arguments."""
+        from ase.io import write
+        if str(filename).endswith('.db'):
+            self.to_db(filename)
+        else:
+            write(filename, list(self), **kwargs)
+
+    @classmethod
+    def from_db(cls, db, selection=None, **kwargs):
+        """Create batch from the rows of an ASE database.
+
+        The rows are read directly without creating Atoms objects.
+        See :meth:`ase.db.core.Database.select` for the selection
+        syntax."""
+        from ase.db import connect
+        from ase.utils import basestring
+        if isinstance(db, basestring):
+            db = connect(db)
+        frames = []
+        for row in db.select(selection, **kwargs):
+            arrays = {'numbers': row.numbers, 'positions': row.positions}
+            for name in row_arrays:
+                if name in row:
+                    arrays[name] = row[name]
+            results = {name: row[name] for name in all_properties
+                       if name in row}
+            frames.append((arrays, row.cell, row.pbc, results))
+        batch = cls()
+        batch._concatenate(frames)
+        return batch
+
+    def to_db(self, db, **key_value_pairs):
+        """Write all structures to an ASE database in one transaction."""
+        from ase.db import connect
+        from ase.utils import basestring
+        if isinstance(db, basestring):
+            db = connect(db)
+        with db:
+            for atoms in self:
+                db.write(atoms, **key_value_pairs)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def slice(self, i):
+        """Slice of the per-atom arrays belonging to structure i."""
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    @property
+    def numbers(self):
+        return self.arrays['numbers']
+
+    @property
+    def positions(self):
+        return self.arrays['positions']
+
+    def get_number_of_atoms(self):
+        """Number of atoms in each structure."""
+        return np.diff(self.offsets)
+
+    def get_frame_indices(self):
+        """Index of the structure that each atom belongs to."""
+        return np.repeat(np.arange(len(self)), self.get_number_of_atoms())
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            return self._get_atoms(i)
+
+        indices = np.arange(len(self))[i]
+        frames = []
+        for f in indices:
+            s = self.slice(f)
+            arrays = {name: a[s] for name, a in self.arrays.items()}
+            frames.append((arrays, self.cell[f], self.pbc[f],
+                           self._get_results(f)))
+        batch = self.__class__()
+        batch._concatenate(frames)
+        return batch
+
+    def _get_atoms(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('Index out of range')
+        s = self.slice(i)
+        atoms = Atoms()
+        atoms.arrays = {name: a[s] for name, a in self.arrays.items()}
+        atoms._cell = self.cell[i]
+        atoms._pbc = self.pbc[i]
+        results = self._get_results(i)
+        if results:
+            atoms.calc = SinglePointCalculator(atoms, **results)
+        return atoms
+
+    def _get_results(self, i):
+        """Results for structure i that are not missing."""
+        results = {}
+        for name, a in self.results.items():
+            value = a[self.slice(i)] if name in peratom_properties else a[i]
+            if not np.isnan(value).all():
+                results[name] = value
+        return results
+
+    def get_complete_cells(self):
+        """Unit cells with missing lattice vectors filled in."""
+        cells = self.cell.copy()
+        for f in np.where(~self.cell.any(2).all(1))[0]:
+            cells[f] = complete_cell(cells[f])
+        return cells
+
+    def get_volumes(self):
+        """Volume of the unit cell of each structure."""
+        return abs(np.linalg.det(self.cell))
+
+    def get_scaled_positions(self, wrap=True):
+        """Positions relative to unit cells.
+
+        See :meth:`ase.Atoms.get_scaled_positions`."""
+        f = self.get_frame_indices()
+        icells = np.linalg.inv(self.get_complete_cells())
+        fractional = np.einsum('ai,aij->aj', self.positions, icells[f])
+        if wrap:
+            pbc = self.pbc[f]
+            # Twice, as in Atoms.get_scaled_positions():
+            fractional[pbc] %= 1.0
+            fractional[pbc] %= 1.0
+        return fractional
+
+    def wrap(self, eps=1e-7):
+        """Wrap positions to the unit cells in periodic directions.
+
+        See :meth:`ase.Atoms.wrap`."""
+        f = self.get_frame_indices()
+        cells = self.get_complete_cells()
+        fractional = np.einsum('ai,aij->aj', self.positions,
+                               np.linalg.inv(cells)[f])
+        pbc = self.pbc[f]
+        fractional[pbc] = (fractional[pbc] + eps) % 1.0 - eps
+        self.positions[:] = np.einsum('ai,aij->aj', fractional, cells[f])
+
+    def neighbor_list(self, quantities, cutoff, self_interaction=False,
+                      skin=0.0):
+        """Neighbor lists of all structures.
+
+        Returns the same quantities as :func:`ase.neighborlist.neighbor_list`
+        concatenated for all structures.  The indices i and j refer to the
+        concatenated per-atom arrays, and so does a per-atom list of
+        cutoffs.
+
+        With a skin, the pairs found for one structure (with the cutoff
+        increased by the skin) are reused for the following structures
+        that have the same atoms, cell and boundary conditions, as long
+        as no atom has moved more than half the skin.  This saves a lot
+        of time for series of similar structures like displacements
+        or images along a path.  Does not work with a dict of
+        cutoffs."""
+        from ase.neighborlist import primitive_neighbor_list
+        cells = self.get_complete_cells()
+        if isinstance(cutoff, dict):
+            skin = 0.0
+        peratom = np.ndim(cutoff) == 1
+        output = [[] for q in quantities]
+        ref = None  # structure with neighbor list to reuse
+        for f in range(len(self)):
+            s = self.slice(f)
+            positions = self.positions[s]
+            # Per-atom cutoffs are given for all atoms:
+            c = cutoff[s] if peratom else cutoff
+
+            if not (skin > 0 and ref is not None and
+                    self._close(f, ref, 0.5 * skin) and
+                    (not peratom or (c == cutoff[self.slice(ref)]).all())):
+                ref = f
+                if skin > 0:
+                    c = c + (0.5 * skin if peratom else skin)
+                i, j, S = primitive_neighbor_list(
+                    'ijS', self.pbc[f], cells[f], positions, c,
+                    numbers=self.numbers[s],
+                    self_interaction=self_interaction)
+            D = positions[j] - positions[i] + np.dot(S, cells[f])
+            d = np.sqrt((D**2).sum(1))
+            if skin > 0:
+                c = cutoff[s] if peratom else cutoff
+                m = d < (c[i] + c[j] if peratom else c)
+            else:
+                m = slice(None)
+            values = {'i': i[m] + self.offsets[f], 'j': j[m] + self.offsets[f],
+                      'S': S[m], 'D': D[m], 'd': d[m]}
+            for q, out in zip(quantities, output):
+                out.append(values[q])
+
+        output = [np.concatenate(out) if out else np.zeros(0)
+                  for out in output]
+        if len(quantities) == 1:
+            return output[0]
+        return tuple(output)
+
+    def _close(self, f, ref, distance):
+        """Check if structure f is structure ref with atoms moved less
+        than distance."""
+        a = self.slice(f)
+        b = self.slice(ref)
+        return (a.stop - a.start == b.stop - b.start and
+                (self.numbers[a] == self.numbers[b]).all() and
+                (self.cell[f] == self.cell[ref]).all() and
+                (self.pbc[f] == self.pbc[ref]).all() and
+                (((self.positions[a] - self.positions[b])**2).sum(1) <
+                 distance**2).all())
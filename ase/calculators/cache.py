@@ -0,0 +1,121 @@
+"""Persistent cache of calculator results.
+
+Wrap an expensive calculator to store its results in an ASE database
+so that identical calculations are not done again, not even by other
+scripts:
+
+    calc = CachedCalculator(Vasp(...), db='cache.db', maxsize=10000)
+    atoms.calc = calc
+    e = atoms.get_potential_energy()  # done by Vasp first time only
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+from ase.calculators.calculator import (Calculator, all_changes,
+                                        all_properties)
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.db import connect
+from ase.io.jsonio import MyEncoder
+from ase.utils import basestring
+
+
+def cache_key(atoms, calc):
+    """Hash of everything that determines the result of a calculation.
+
+    That is the atomic numbers, positions, cell, boundary conditions,
+    initial magnetic moments and charges, and the name and
+    parameters of the calculator.  Positions and cell must agree to the
+    last bit for two keys to be equal."""
+    sha = hashlib.sha1()
+    for a, dtype in [(atoms.numbers, np.int64),
+                     (atoms.positions, np.float64),
+                     (atoms.cell, np.float64),
+                     (atoms.pbc, bool),
+                     (atoms.get_initial_magnetic_moments(), np.float64),
+                     (atoms.get_initial_charges(), np.float64)]:
+        sha.update(np.ascontiguousarray(a, dtype).tobytes())
+    name = getattr(calc, 'name', calc.__class__.__name__)
+    parameters = json.dumps(calc.todict(), sort_keys=True, cls=MyEncoder)
+    sha.update(name.encode())
+    sha.update(parameters.encode())
+    return sha.hexdigest()
+
+
+class CachedCalculator(Calculator):
+    """Calculator wrapper that stores results in an ASE database.
+
+    calculator: Calculator object
+        The calculator doing the real work.
+    db: str or Database object
+        Where to store the results.  Default is 'cache.db'.
+    maxsize: int or None
+        Maximum number of calculations to keep.  When there are
+        more, the ones that were least recently used are deleted.
+
+    Results are looked up using :func:`cache_key`, so a change of
+    parameters of the wrapped calculator means a new calculation.  The
+    number of calculations that were served from the cache and done by
+    the wrapped calculator are kept in the hits and misses attributes.
+    """
+
+    implemented_properties = all_properties
+    default_parameters = {}
+    name = 'CachedCalculator'
+
+    def __init__(self, calculator, db='cache.db', maxsize=None):
+        Calculator.__init__(self)
+        self.calculator = calculator
+        self.implemented_properties = calculator.implemented_properties
+        if isinstance(db, basestring):
+            db = connect(db)
+        self.db = db
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def calculate(self, atoms=None, properties=['energy'],
+                  system_changes=all_changes):
+        Calculator.calculate(self, atoms, properties, system_changes)
+        key = cache_key(self.atoms, self.calculator)
+        try:
+            row = self.db.get(cache_key=key)
+        except KeyError:
+            row = None
+
+        if row is not None and all(prop in row for prop in properties):
+            self.hits += 1
+            self.results = {prop: row[prop] for prop in all_properties
+                            if prop in row}
+            # Mark as recently used (updates mtime):
+            self.db.update(row.id)
+            return
+
+        self.misses += 1
+        for prop in properties:
+            self.calculator.get_property(prop, self.atoms)
+        self.results = {prop: value
+                        for prop, value in self.calculator.results.items()
+                        if prop in all_properties}
+
+        atoms = self.atoms.copy()
+        atoms.calc = SinglePointCalculator(atoms, **self.results)
+        if row is None:
+            self.db.write(atoms, cache_key=key)
+            self.evict()
+        else:
+            # More properties than last time:
+            self.db.update(row.id, atoms)
+
+    def evict(self):
+        """Delete least recently used calculations above maxsize."""
+        if self.maxsize is None:
+            return
+        n = self.db.count() - self.maxsize
+        if n > 0:
+            ids = [row.id for row in self.db.select(sort='mtime', limit=n,
+                                                    include_data=False,
+                                                    columns=['id'])]
+            self.db.delete(ids)
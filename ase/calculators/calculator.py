@@ -5,8 +5,6 @@ from math import pi, sqrt
 
 import numpy as np
 
-from ase.dft.kpoints import bandpath, monkhorst_pack
-
 
 class CalculatorError(RuntimeError):
     """Base class of error types related to ASE calculators."""
@@ -94,8 +92,8 @@ def compare_atoms(atoms1, atoms2, tol=1e-15):
     return system_changes
 
 
-all_properties = ['energy', 'forces', 'stress', 'dipole',
-                  'charges', 'magmom', 'magmoms', 'free_energy']
+all_properties = ['energy', 'forces', 'stress', 'stresses', 'dipole',
+                  'charges', 'magmom', 'magmoms', 'free_energy', 'energies']
 
 
 all_changes = ['positions', 'numbers', 'cell', 'pbc',
@@ -240,6 +238,7 @@ def kpts2sizeandoffsets(size=None, density=None, gamma=None, even=None,
 
 def kpts2ndarray(kpts, atoms=None):
     """Convert kpts keyword to 2-d ndarray of scaled k-points."""
+    from ase.dft.kpoints import bandpath, monkhorst_pack
 
     if kpts is None:
         return np.zeros((1, 3))
@@ -521,6 +520,15 @@ class Calculator(object):
     def get_stress(self, atoms=None):
         return self.get_property('stress', atoms)
 
+    def get_potential_energies(self, atoms=None):
+        return self.get_property('energies', atoms)
+
+    def get_stresses(self, atoms=None):
+        """Per-atom stresses in Voigt form.
+
+        They add up to the stress of the whole system."""
+        return self.get_property('stresses', atoms)
+
     def get_dipole_moment(self, atoms=None):
         return self.get_property('dipole', atoms)
 
@@ -584,8 +592,8 @@ class Calculator(object):
 
         properties: list of str
             List of what needs to be calculated.  Can be any combination
-            of 'energy', 'forces', 'stress', 'dipole', 'charges', 'magmom'
-            and 'magmoms'.
+            of 'energy', 'forces', 'stress', 'dipole', 'charges', 'magmom',
+            'magmoms', 'energies' and 'stresses'.
         system_changes: list of str
             List of what has changed since last calculation.  Can be
             any combination of these six: 'positions', 'numbers', 'cell',
@@ -602,7 +610,9 @@ class Calculator(object):
                             'dipole': np.zeros(3),
                             'charges': np.zeros(len(atoms)),
                             'magmom': 0.0,
-                            'magmoms': np.zeros(len(atoms))}
+                            'magmoms': np.zeros(len(atoms)),
+                            'energies': np.zeros(len(atoms)),
+                            'stresses': np.zeros((len(atoms), 6))}
 
         The subclass implementation should first call this
         implementation to set the atoms attribute.
@@ -611,6 +621,26 @@ class Calculator(object):
         if atoms is not None:
             self.atoms = atoms.copy()
 
+    def calculate_batch(self, images, properties=['energy', 'forces']):
+        """Calculate properties for many configurations.
+
+        images: list of Atoms objects
+            The configurations.  Their own calculators are not used.
+        properties: list of str
+            List of what needs to be calculated.
+
+        Returns a list with a dictionary of results for each
+        configuration.
+
+        This implementation does one calculation after the other.
+        Subclasses that can do many configurations in one go
+        (vectorized or by sending them to an external code together)
+        should override it.  See also :func:`supports_batch`.
+        """
+
+        return [{name: self.get_property(name, atoms) for name in properties}
+                for atoms in images]
+
     def calculate_numerical_forces(self, atoms, d=0.001):
         """Calculate numerical forces using finite difference.
 
@@ -675,6 +705,60 @@ class Calculator(object):
         return get_band_structure(calc=self)
 
 
+def supports_batch(calc):
+    """Check if calculator has its own implementation of calculate_batch().
+
+    An implementation inherited from a class whose calculate() method
+    was overridden in a subclass does not count, since it would bypass
+    the new calculate() method."""
+
+    def defined_in(name):
+        for cls in type(calc).__mro__:
+            if name in vars(cls):
+                return cls
+
+    cls = defined_in('calculate_batch')
+    default = vars(Calculator)['calculate_batch']
+    if cls is None or vars(cls)['calculate_batch'] is default:
+        return False
+    return issubclass(cls, defined_in('calculate'))
+
+
+def calculate_batches(images, properties=['energy', 'forces']):
+    """Calculate properties of many images using batches where possible.
+
+    Images with calculators of the same type and with the same
+    parameters are done together with one call to calculate_batch()
+    and the results are stored in the calculators, so that for example
+    atoms.get_forces() will not start a new calculation.  Only
+    calculators that support batches (see :func:`supports_batch`) and
+    that have already done a calculation for the same atomic numbers
+    are used.  All other images are left alone."""
+
+    import json
+    from ase.io.jsonio import MyEncoder
+
+    groups = {}
+    seen = set()
+    for atoms in images:
+        calc = atoms.calc
+        if (calc is None or id(calc) in seen or not supports_batch(calc) or
+            calc.atoms is None or len(calc.atoms) != len(atoms) or
+            (calc.atoms.numbers != atoms.numbers).any() or
+            not calc.calculation_required(atoms, properties)):
+            continue
+        seen.add(id(calc))
+        key = (type(calc),
+               json.dumps(calc.todict(), sort_keys=True, cls=MyEncoder))
+        groups.setdefault(key, []).append(atoms)
+
+    for group in groups.values():
+        results = group[0].calc.calculate_batch(group, properties)
+        for atoms, result in zip(group, results):
+            atoms.calc.atoms = atoms.copy()
+            atoms.calc.results = result
+
+
 class FileIOCalculator(Calculator):
     """Base class for calculators that write/read input/output files."""
 
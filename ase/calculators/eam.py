@@ -116,6 +116,11 @@ For example::
 The breakdown of energy contribution from the indvidual components are
 stored in the calculator instance ``.results['energy_components']``
 
+The per-atom energies (``atoms.get_potential_energies()``) are the
+embedding energy of each atom plus half of its pair energies.  The
+stress and the per-atom stresses are available for systems with three
+lattice vectors, except for the ``.adp`` format.
+
 Arguments
 =========
 
@@ -227,7 +232,8 @@ Notes/Issues
 End EAM Interface Documentation
     """
 
-    implemented_properties = ['energy', 'forces']
+    implemented_properties = ['energy', 'energies', 'forces', 'stress',
+                              'stresses']
 
     default_parameters = dict(
         skin=1.0,
@@ -650,7 +656,7 @@ End EAM Interface Documentation
             Contains positions, unit-cell, ...
         properties: list of str
             List of what needs to be calculated.  Can be any combination
-            of 'energy', 'forces'
+            of 'energy', 'energies', 'forces', 'stress' and 'stresses'.
         system_changes: list of str
             List of what has changed since last calculation.  Can be
             any combination of these five: 'positions', 'numbers', 'cell',
@@ -664,18 +670,33 @@ End EAM Interface Documentation
             self.update(self.atoms)
             self.calculate_energy(self.atoms)
 
-            if 'forces' in properties:
+            if set(properties) & set(['forces', 'stress', 'stresses']):
                 self.calculate_forces(self.atoms)
 
         # check we have all the properties requested
         for property in properties:
             if property not in self.results:
-                if property is 'energy':
+                if property == 'energy':
                     self.calculate_energy(self.atoms)
 
-                if property is 'forces':
+                if property == 'forces':
                     self.calculate_forces(self.atoms)
 
+        # per-atom energies and stresses come from the same passes as
+        # the energy and the forces
+        if 'energies' in properties:
+            if 'energy' not in self.results:
+                self.calculate_energy(self.atoms)
+            self.results['energies'] = self.energies
+        if 'stress' in properties or 'stresses' in properties:
+            if 'forces' not in self.results:
+                self.calculate_forces(self.atoms)
+            if self.stresses is not None:
+                if 'stress' in properties:
+                    self.results['stress'] = self.stresses.sum(0)
+                if 'stresses' in properties:
+                    self.results['stresses'] = self.stresses
+
         # we need to remember the previous state of parameters
 #        if 'potential' in parameter_changes and potential != None:
 #                self.read_potential(potential)
@@ -694,6 +715,7 @@ End EAM Interface Documentation
         trace_energy = 0.0
 
         self.total_density = np.zeros(len(atoms))
+        energies = np.zeros(len(atoms))
         if (self.form == 'adp'):
             self.mu = np.zeros([len(atoms), 3])
             self.lam = np.zeros([len(atoms), 3, 3])
@@ -714,8 +736,10 @@ End EAM Interface Documentation
                 use = self.index[neighbors[nearest]] == j_index
                 if not use.any():
                     continue
-                pair_energy += np.sum(self.phi[self.index[i], j_index](
+                energy_ij = np.sum(self.phi[self.index[i], j_index](
                     r[nearest][use])) / 2.
+                pair_energy += energy_ij
+                energies[i] += energy_ij
 
                 if self.form == 'fs':
                     density = np.sum(
@@ -737,8 +761,10 @@ End EAM Interface Documentation
                         self.q[self.index[i], j_index])
 
             # add in the electron embedding energy
-            embedding_energy += self.embedded_energy[self.index[i]](
+            energy_i = self.embedded_energy[self.index[i]](
                 self.total_density[i])
+            embedding_energy += energy_i
+            energies[i] += energy_i
 
         components = dict(pair=pair_energy, embedding=embedding_energy)
 
@@ -749,6 +775,10 @@ End EAM Interface Documentation
             for i in range(len(atoms)):  # this is the atom to be embedded
                 trace_energy -= np.sum(self.lam[i].trace() ** 2) / 6.
 
+            energies += ((self.mu ** 2).sum(1) / 2. +
+                         (self.lam ** 2).sum((1, 2)) / 2. -
+                         np.trace(self.lam, axis1=1, axis2=2) ** 2 / 6.)
+
             adp_result = dict(adp_mu=mu_energy,
                               adp_lam=lam_energy,
                               adp_trace=trace_energy)
@@ -766,12 +796,16 @@ End EAM Interface Documentation
 
         self.results['energy_components'] = components
         self.results['energy'] = energy
+        self.results['free_energy'] = energy
+        self.energies = energies
 
     def calculate_forces(self, atoms):
         # calculate the forces based on derivatives of the three EAM functions
 
         self.update(atoms)
         self.results['forces'] = np.zeros((len(atoms), 3))
+        # Half of the virial of each pair goes to each of the two atoms:
+        virials = np.zeros((len(atoms), 3, 3))
 
         for i in range(len(atoms)):  # this is the atom to be embedded
             neighbors, offsets = self.neighbors.get_neighbors(i)
@@ -808,6 +842,8 @@ End EAM Interface Documentation
                               self.d_electron_density[self.index[i]](rnuse)))
 
                 self.results['forces'][i] += np.dot(scale, urvec[nearest][use])
+                virials[i] += 0.5 * np.dot(rvec[nearest][use].T * scale,
+                                           urvec[nearest][use])
 
                 if (self.form == 'adp'):
                     adp_forces = self.angular_forces(
@@ -822,6 +858,13 @@ End EAM Interface Documentation
 
                     self.results['forces'][i] += adp_forces
 
+        # The angular forces of the adp form are not included in the
+        # virials:
+        self.stresses = None
+        if self.form != 'adp' and atoms.number_of_lattice_vectors == 3:
+            self.stresses = virials.reshape((-1, 9))[:, [0, 4, 8, 5, 2, 1]]
+            self.stresses /= atoms.get_volume()
+
     def angular_forces(self, mu_i, mu, lam_i, lam, r, rvec, form1, form2):
         # calculate the extra components for the adp forces
         # rvec are the relative positions to atom i
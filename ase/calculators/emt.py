@@ -1,13 +1,14 @@
 """Effective medium theory potential."""
 
-from math import sqrt, exp, log
+from math import sqrt, exp
 
 import numpy as np
 
 from ase.data import chemical_symbols, atomic_numbers
 from ase.units import Bohr
-from ase.neighborlist import NeighborList
+from ase.neighborlist import NeighborList, PairList
 from ase.calculators.calculator import Calculator, all_changes
+from ase.calculators.calculator import PropertyNotImplementedError
 
 
 parameters = {
@@ -48,16 +49,35 @@ class EMT(Calculator):
     table.  True gives the behaviour of the Asap code and
     older EMT implementations, although the results are not
     bitwise identical.
+
+    When only a few atoms have moved since the last calculation, only
+    their neighborhoods are recalculated.  Every full_update_interval
+    updates a full calculation is done so that rounding errors do not
+    accumulate.
+
+    The per-atom energies are the embedding energies minus the pair
+    terms of each atom.  The virial of each pair of atoms is shared
+    equally between the per-atom stresses of the two atoms.
     """
-    implemented_properties = ['energy', 'forces']
+    implemented_properties = ['energy', 'energies', 'forces', 'stress',
+                              'stresses']
 
     nolabel = True
 
     default_parameters = {'asap_cutoff': False}
 
+    # Number of incremental updates between full calculations:
+    full_update_interval = 100
+
     def __init__(self, **kwargs):
         Calculator.__init__(self, **kwargs)
 
+    def set(self, **kwargs):
+        changed_parameters = Calculator.set(self, **kwargs)
+        if changed_parameters:
+            self.reset()
+        return changed_parameters
+
     def initialize(self, atoms):
         self.par = {}
         self.rc = 0.0
@@ -113,105 +133,232 @@ class EMT(Calculator):
             for s2, p2 in self.par.items():
                 self.ksi[s1][s2] = p2['n0'] / p1['n0']
 
-        self.forces = np.empty((len(atoms), 3))
-        self.sigma1 = np.empty(len(atoms))
-        self.deds = np.empty(len(atoms))
+        self.p = self.get_parameter_arrays(self.numbers)
 
         self.nl = NeighborList([0.5 * self.rc_list] * len(atoms),
                                self_interaction=False)
 
+    def get_parameter_arrays(self, numbers):
+        """Parameters of atoms with the given atomic numbers as arrays."""
+        Z, index = np.unique(numbers, return_inverse=True)
+        return dict((name, np.array([self.par[z][name] for z in Z],
+                                    float)[index])
+                    for name in ['E0', 's0', 'V0', 'eta2', 'kappa',
+                                 'lambda', 'n0', 'gamma1', 'gamma2'])
+
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
         Calculator.calculate(self, atoms, properties, system_changes)
 
+        if system_changes:
+            self.update(system_changes)
+
+        stress = 'stress' in properties or 'stresses' in properties
+        if stress and self.atoms.number_of_lattice_vectors != 3:
+            raise PropertyNotImplementedError
+
+        self.results['energy'] = self.energy
+        self.results['free_energy'] = self.energy
+        self.results['forces'] = self.forces
+        if 'energies' in properties:
+            self.results['energies'] = self.energies
+        if stress:
+            stresses = self.virials / -self.atoms.get_volume()
+            stresses = stresses.reshape((-1, 9))[:, [0, 4, 8, 5, 2, 1]]
+            if 'stress' in properties:
+                self.results['stress'] = stresses.sum(0)
+            if 'stresses' in properties:
+                self.results['stresses'] = stresses
+
+    def update(self, system_changes):
+        """Update per-atom energies, forces and virials."""
         if 'numbers' in system_changes:
             self.initialize(self.atoms)
 
         positions = self.atoms.positions
-        numbers = self.atoms.numbers
-        cell = self.atoms.cell
+        natoms = len(self.atoms)
 
-        self.nl.update(self.atoms)
+        pairs = None
+        if self.nl.update(self.atoms):
+            self.pairs = PairList(self.nl, natoms)
+        elif (set(system_changes) <= set(['positions']) and
+              self.nincremental < self.full_update_interval):
+            moved = np.where((positions != self.positions).any(1))[0]
+            pairs = self.pairs.touching(moved)
+            # Atoms with new densities and all their pairs:
+            changed = np.unique(np.concatenate([moved, self.pairs.i[pairs],
+                                                self.pairs.j[pairs]]))
+            pairs2 = self.pairs.touching(changed)
+            if 2 * len(pairs2) > len(self.pairs):
+                # Cheaper to do everything:
+                pairs = None
 
-        self.energy = 0.0
-        self.sigma1[:] = 0.0
-        self.forces[:] = 0.0
+        if pairs is None:
+            pairs = np.arange(len(self.pairs))
+            self.energies1 = np.zeros(natoms)
+            self.forces1 = np.zeros((natoms, 3))
+            self.sigma1 = np.zeros(natoms)
+            self.virials = np.zeros((natoms, 3, 3))
+            self.interact1(positions, pairs, 1)
+            self.atom_energies, self.deds = self.embedding_terms(self.p,
+                                                                 self.sigma1)
+            self.forces2 = np.zeros((natoms, 3))
+            self.interact2(positions, pairs, 1)
+            self.nincremental = 0
+        else:
+            # Remove old contributions and add new ones:
+            self.interact1(self.positions, pairs, -1)
+            self.interact1(positions, pairs, 1)
+            self.interact2(self.positions, pairs2, -1)
+            p = dict((name, value[changed]) for name, value in self.p.items())
+            self.atom_energies[changed], self.deds[changed] = \
+                self.embedding_terms(p, self.sigma1[changed])
+            self.interact2(positions, pairs2, 1)
+            self.nincremental += 1
 
-        natoms = len(self.atoms)
+        self.positions = positions.copy()
+        self.energies = self.energies1 + self.atom_energies
+        self.energy = self.energies.sum()
+        self.forces = self.forces1 + self.forces2
 
-        for a1 in range(natoms):
-            Z1 = numbers[a1]
-            p1 = self.par[Z1]
-            ksi = self.ksi[Z1]
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            offsets = np.dot(offsets, cell)
-            for a2, offset in zip(neighbors, offsets):
-                d = positions[a2] + offset - positions[a1]
-                r = sqrt(np.dot(d, d))
-                if r < self.rc_list:
-                    Z2 = numbers[a2]
-                    p2 = self.par[Z2]
-                    self.interact1(a1, a2, d, r, p1, p2, ksi[Z2])
-
-        for a in range(natoms):
-            Z = numbers[a]
-            p = self.par[Z]
-            try:
-                ds = -log(self.sigma1[a] / 12) / (beta * p['eta2'])
-            except (OverflowError, ValueError):
-                self.deds[a] = 0.0
-                self.energy -= p['E0']
-                continue
-            x = p['lambda'] * ds
-            y = exp(-x)
-            z = 6 * p['V0'] * exp(-p['kappa'] * ds)
-            self.deds[a] = ((x * y * p['E0'] * p['lambda'] + p['kappa'] * z) /
-                            (self.sigma1[a] * beta * p['eta2']))
-            self.energy += p['E0'] * ((1 + x) * y - 1) + z
-
-        for a1 in range(natoms):
-            Z1 = numbers[a1]
-            p1 = self.par[Z1]
-            ksi = self.ksi[Z1]
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            offsets = np.dot(offsets, cell)
-            for a2, offset in zip(neighbors, offsets):
-                d = positions[a2] + offset - positions[a1]
-                r = sqrt(np.dot(d, d))
-                if r < self.rc_list:
-                    Z2 = numbers[a2]
-                    p2 = self.par[Z2]
-                    self.interact2(a1, a2, d, r, p1, p2, ksi[Z2])
+    def ordered_pairs(self, positions, pairs):
+        """Both (i, j) and (j, i) for pairs from the neighbor list."""
+        d = self.pairs.get_vectors(positions, self.atoms.cell, pairs)
+        i = self.pairs.i[pairs]
+        j = self.pairs.j[pairs]
+        return (np.concatenate([i, j]), np.concatenate([j, i]),
+                np.concatenate([d, -d]))
 
-        self.results['energy'] = self.energy
-        self.results['free_energy'] = self.energy
-        self.results['forces'] = self.forces
+    def interact1(self, positions, pairs, sign):
+        i, j, d = self.ordered_pairs(positions, pairs)
+        y1, f, s = self.pair_terms1(self.p, i, j, d)
+        np.add.at(self.energies1, i, -sign * y1)
+        np.add.at(self.forces1, i, sign * f)
+        np.add.at(self.forces1, j, -sign * f)
+        np.add.at(self.sigma1, i, sign * s)
+        self.add_virials(i, j, d, -sign * f)
+
+    def interact2(self, positions, pairs, sign):
+        i, j, d = self.ordered_pairs(positions, pairs)
+        f = self.pair_terms2(self.p, i, j, d, self.deds)
+        np.add.at(self.forces2, i, -sign * f)
+        np.add.at(self.forces2, j, sign * f)
+        self.add_virials(i, j, d, sign * f)
+
+    def add_virials(self, i, j, d, f):
+        """Add virials of forces f on atoms j (and -f on atoms i)."""
+        virials = 0.5 * f[:, :, np.newaxis] * d[:, np.newaxis]
+        # np.add.at() is much faster for 1-d arrays:
+        flat = self.virials.reshape(-1)
+        c = np.arange(9)
+        np.add.at(flat, (9 * i[:, np.newaxis] + c).ravel(), virials.ravel())
+        np.add.at(flat, (9 * j[:, np.newaxis] + c).ravel(), virials.ravel())
+
+    def pair_terms1(self, p, i, j, d):
+        """Terms of the first pass over ordered pairs of atoms.
+
+        p: dict of per-atom parameter arrays, d: vectors from atoms i to
+        atoms j.  Returns the energies to be subtracted, the forces on
+        atoms i (minus the forces on atoms j) and the contributions to
+        sigma1 of atoms i."""
+        r = np.sqrt((d**2).sum(1))
+        x = np.exp(self.acut * (r - self.rc))
+        theta = (r < self.rc_list) / (1.0 + x)
+        ksi = p['n0'][j] / p['n0'][i]
+        y1 = (0.5 * p['V0'][i] *
+              np.exp(-p['kappa'][j] * (r / beta - p['s0'][j])) *
+              ksi / p['gamma2'][i] * theta)
+        f = ((y1 * p['kappa'][j] / beta + y1 * self.acut * theta * x) /
+             r)[:, np.newaxis] * d
+        s = (np.exp(-p['eta2'][j] * (r - beta * p['s0'][j])) *
+             ksi * theta / p['gamma1'][i])
+        return y1, f, s
+
+    def pair_terms2(self, p, i, j, d, deds):
+        """Forces of the second pass on atoms j (minus forces on atoms i)."""
+        r = np.sqrt((d**2).sum(1))
+        x = np.exp(self.acut * (r - self.rc))
+        theta = (r < self.rc_list) / (1.0 + x)
+        ksi = p['n0'][j] / p['n0'][i]
+        y1 = (np.exp(-p['eta2'][j] * (r - beta * p['s0'][j])) *
+              ksi / p['gamma1'][i] * theta * deds[i])
+        return ((y1 * p['eta2'][j] + y1 * self.acut * theta * x) /
+                r)[:, np.newaxis] * d
+
+    def embedding_terms(self, p, sigma1):
+        """Energies and derivatives deds of atoms with densities sigma1."""
+        energies = -p['E0']
+        deds = np.zeros(len(sigma1))
+        ok = sigma1 > 0
+        p = dict((name, value[ok]) for name, value in p.items())
+        ds = -np.log(sigma1[ok] / 12) / (beta * p['eta2'])
+        x = p['lambda'] * ds
+        y = np.exp(-x)
+        z = 6 * p['V0'] * np.exp(-p['kappa'] * ds)
+        deds[ok] = ((x * y * p['E0'] * p['lambda'] + p['kappa'] * z) /
+                    (sigma1[ok] * beta * p['eta2']))
+        energies[ok] = p['E0'] * ((1 + x) * y - 1) + z
+        return energies, deds
+
+    def calculate_batch(self, images, properties=['energy', 'forces']):
+        if self.parameters.asap_cutoff:
+            # The cutoff depends on the elements in each image:
+            return Calculator.calculate_batch(self, images, properties)
+
+        from ase import Atoms
+        from ase.batch import AtomsBatch
+
+        batch = AtomsBatch(images)
+        natoms = len(batch.numbers)
+        stress = 'stress' in properties or 'stresses' in properties
+        if stress and not batch.cell.any(2).all():
+            raise PropertyNotImplementedError
+
+        # Parameters for all elements present (without touching the
+        # state of this calculator):
+        emt = EMT(**self.parameters)
+        emt.initialize(Atoms(numbers=np.unique(batch.numbers)))
+        p = emt.get_parameter_arrays(batch.numbers)
+
+        # Full neighbor list: both (i, j) and (j, i)
+        i, j, d = batch.neighbor_list('ijD', emt.rc_list, skin=0.3)
+
+        def sum_forces(f):
+            forces = np.zeros((natoms, 3))
+            for c in range(3):
+                forces[:, c] = (np.bincount(i, f[:, c], natoms) -
+                                np.bincount(j, f[:, c], natoms))
+            return forces
+
+        y1, f1, s = emt.pair_terms1(p, i, j, d)
+        sigma1 = np.bincount(i, s, natoms)
+        energies, deds = emt.embedding_terms(p, sigma1)
+        energies -= np.bincount(i, y1, natoms)
+        f2 = emt.pair_terms2(p, i, j, d, deds)
+        forces = sum_forces(f1 - f2)
+
+        frame = batch.get_frame_indices()
+        if stress:
+            # Force on atom j is f2 - f1:
+            virial = ((f2 - f1)[:, :, np.newaxis] *
+                      d[:, np.newaxis]).reshape((-1, 9))
+            stresses = np.empty((natoms, 9))
+            for c in range(9):
+                stresses[:, c] = 0.5 * (np.bincount(i, virial[:, c], natoms) +
+                                        np.bincount(j, virial[:, c], natoms))
+            stresses /= -batch.get_volumes()[frame, np.newaxis]
+            stresses = stresses[:, [0, 4, 8, 5, 2, 1]]
 
-    def interact1(self, a1, a2, d, r, p1, p2, ksi):
-        x = exp(self.acut * (r - self.rc))
-        theta = 1.0 / (1.0 + x)
-        y1 = (0.5 * p1['V0'] * exp(-p2['kappa'] * (r / beta - p2['s0'])) *
-              ksi / p1['gamma2'] * theta)
-        y2 = (0.5 * p2['V0'] * exp(-p1['kappa'] * (r / beta - p1['s0'])) /
-              ksi / p2['gamma2'] * theta)
-        self.energy -= y1 + y2
-        f = ((y1 * p2['kappa'] + y2 * p1['kappa']) / beta +
-             (y1 + y2) * self.acut * theta * x) * d / r
-        self.forces[a1] += f
-        self.forces[a2] -= f
-        self.sigma1[a1] += (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
-                            ksi * theta / p1['gamma1'])
-        self.sigma1[a2] += (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
-                            ksi * theta / p2['gamma1'])
-
-    def interact2(self, a1, a2, d, r, p1, p2, ksi):
-        x = exp(self.acut * (r - self.rc))
-        theta = 1.0 / (1.0 + x)
-        y1 = (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
-              ksi / p1['gamma1'] * theta * self.deds[a1])
-        y2 = (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
-              ksi / p2['gamma1'] * theta * self.deds[a2])
-        f = ((y1 * p2['eta2'] + y2 * p1['eta2']) +
-             (y1 + y2) * self.acut * theta * x) * d / r
-        self.forces[a1] -= f
-        self.forces[a2] += f
+        frame_energies = np.bincount(frame, energies, len(batch))
+        results = []
+        for n, energy in enumerate(frame_energies):
+            s = batch.slice(n)
+            result = {'energy': energy,
+                      'free_energy': energy,
+                      'energies': energies[s],
+                      'forces': forces[s]}
+            if stress:
+                result['stress'] = stresses[s].sum(0)
+                result['stresses'] = stresses[s]
+            results.append(result)
+        return results
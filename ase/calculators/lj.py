@@ -2,30 +2,74 @@ from __future__ import division
 
 import numpy as np
 
-from ase.neighborlist import NeighborList
+from ase.neighborlist import NeighborList, PairList
 from ase.calculators.calculator import Calculator, all_changes
 from ase.calculators.calculator import PropertyNotImplementedError
 
 
 class LennardJones(Calculator):
-    implemented_properties = ['energy', 'forces', 'stress']
+    """Lennard-Jones potential.
+
+    When only a few atoms have moved since the last calculation, only
+    the pairs they are part of are recalculated.  Every
+    full_update_interval updates a full calculation is done so that
+    rounding errors do not accumulate.
+
+    The per-atom energies and stresses get half of the energy and
+    virial of each pair the atom is part of."""
+
+    implemented_properties = ['energy', 'energies', 'forces', 'stress',
+                              'stresses']
     default_parameters = {'epsilon': 1.0,
                           'sigma': 1.0,
                           'rc': None}
     nolabel = True
 
+    # Number of incremental updates between full calculations:
+    full_update_interval = 100
+
     def __init__(self, **kwargs):
         Calculator.__init__(self, **kwargs)
 
+    def set(self, **kwargs):
+        changed_parameters = Calculator.set(self, **kwargs)
+        if changed_parameters:
+            self.reset()
+        return changed_parameters
+
     def calculate(self, atoms=None,
                   properties=['energy'],
                   system_changes=all_changes):
         Calculator.calculate(self, atoms, properties, system_changes)
 
+        if system_changes:
+            self.update(system_changes)
+
+        stress = 'stress' in properties or 'stresses' in properties
+        if stress and self.atoms.number_of_lattice_vectors != 3:
+            raise PropertyNotImplementedError
+
+        energy = self.energies.sum()
+        self.results['energy'] = energy
+        self.results['free_energy'] = energy
+        self.results['forces'] = self.forces.copy()
+        if 'energies' in properties:
+            self.results['energies'] = self.energies.copy()
+        if stress:
+            stresses = self.virials + self.virials.transpose((0, 2, 1))
+            stresses *= -0.5 / self.atoms.get_volume()
+            stresses = stresses.reshape((-1, 9))[:, [0, 4, 8, 5, 2, 1]]
+            if 'stress' in properties:
+                self.results['stress'] = stresses.sum(0)
+            if 'stresses' in properties:
+                self.results['stresses'] = stresses
+
+    def update(self, system_changes):
+        """Update per-atom energies, forces and virials."""
         natoms = len(self.atoms)
+        positions = self.atoms.positions
 
         sigma = self.parameters.sigma
-        epsilon = self.parameters.epsilon
         rc = self.parameters.rc
         if rc is None:
             rc = 3 * sigma
@@ -33,41 +77,123 @@ class LennardJones(Calculator):
         if 'numbers' in system_changes:
             self.nl = NeighborList([rc / 2] * natoms, self_interaction=False)
 
-        self.nl.update(self.atoms)
-
-        positions = self.atoms.positions
-        cell = self.atoms.cell
+        pairs = None
+        if self.nl.update(self.atoms):
+            self.pairs = PairList(self.nl, natoms)
+        elif (set(system_changes) <= set(['positions']) and
+              self.nincremental < self.full_update_interval):
+            moved = np.where((positions != self.positions).any(1))[0]
+            pairs = self.pairs.touching(moved)
+            if 2 * len(pairs) > len(self.pairs):
+                # Cheaper to do everything:
+                pairs = None
+
+        if pairs is None:
+            self.energies = np.zeros(natoms)
+            self.forces = np.zeros((natoms, 3))
+            self.virials = np.zeros((natoms, 3, 3))
+            self.add_pairs(positions, slice(None), 1)
+            self.nincremental = 0
+        else:
+            # Remove old contributions of the pairs and add new ones:
+            self.add_pairs(self.positions, pairs, -1)
+            self.add_pairs(positions, pairs, 1)
+            self.nincremental += 1
+
+        self.positions = positions.copy()
+
+    def pair_terms(self, positions, pairs=slice(None)):
+        """Energies, forces and vectors of pairs from the neighbor list."""
+        sigma = self.parameters.sigma
+        epsilon = self.parameters.epsilon
+        rc = self.parameters.rc
+        if rc is None:
+            rc = 3 * sigma
 
         e0 = 4 * epsilon * ((sigma / rc)**12 - (sigma / rc)**6)
 
-        energy = 0.0
-        forces = np.zeros((natoms, 3))
-        stress = np.zeros((3, 3))
-
-        for a1 in range(natoms):
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            cells = np.dot(offsets, cell)
-            d = positions[neighbors] + cells - positions[a1]
-            r2 = (d**2).sum(1)
-            c6 = (sigma**2 / r2)**3
-            c6[r2 > rc**2] = 0.0
-            energy -= e0 * (c6 != 0.0).sum()
-            c12 = c6**2
-            energy += 4 * epsilon * (c12 - c6).sum()
-            f = (24 * epsilon * (2 * c12 - c6) / r2)[:, np.newaxis] * d
-            forces[a1] -= f.sum(axis=0)
-            for a2, f2 in zip(neighbors, f):
-                forces[a2] += f2
-            stress += np.dot(f.T, d)
-
-        if 'stress' in properties:
-            if self.atoms.number_of_lattice_vectors == 3:
-                stress += stress.T.copy()
-                stress *= -0.5 / self.atoms.get_volume()
-                self.results['stress'] = stress.flat[[0, 4, 8, 5, 2, 1]]
-            else:
-                raise PropertyNotImplementedError
+        d = self.pairs.get_vectors(positions, self.atoms.cell, pairs)
+        r2 = (d**2).sum(1)
+        c6 = (sigma**2 / r2)**3
+        c6[r2 > rc**2] = 0.0
+        c12 = c6**2
+        energies = 4 * epsilon * (c12 - c6) - e0 * (c6 != 0.0)
+        f = (24 * epsilon * (2 * c12 - c6) / r2)[:, np.newaxis] * d
+        return energies, f, d
+
+    def add_pairs(self, positions, pairs, sign):
+        """Add (sign=1) or remove (sign=-1) contributions of pairs.
+
+        Pair energies and virials are shared equally between the two
+        atoms."""
+        energies, f, d = self.pair_terms(positions, pairs)
+        i = self.pairs.i[pairs]
+        j = self.pairs.j[pairs]
+        energies *= 0.5 * sign
+        np.add.at(self.energies, i, energies)
+        np.add.at(self.energies, j, energies)
+        f *= sign
+        np.add.at(self.forces, i, -f)
+        np.add.at(self.forces, j, f)
+        virials = 0.5 * f[:, :, np.newaxis] * d[:, np.newaxis]
+        # np.add.at() is much faster for 1-d arrays:
+        flat = self.virials.reshape(-1)
+        c = np.arange(9)
+        np.add.at(flat, (9 * i[:, np.newaxis] + c).ravel(), virials.ravel())
+        np.add.at(flat, (9 * j[:, np.newaxis] + c).ravel(), virials.ravel())
+
+    def calculate_batch(self, images, properties=['energy', 'forces']):
+        from ase.batch import AtomsBatch
 
-        self.results['energy'] = energy
-        self.results['free_energy'] = energy
-        self.results['forces'] = forces
+        sigma = self.parameters.sigma
+        epsilon = self.parameters.epsilon
+        rc = self.parameters.rc
+        if rc is None:
+            rc = 3 * sigma
+
+        batch = AtomsBatch(images)
+        stress = 'stress' in properties or 'stresses' in properties
+        if stress and not batch.cell.any(2).all():
+            raise PropertyNotImplementedError
+
+        # Full neighbor list: each pair appears twice
+        i, d, D = batch.neighbor_list('idD', rc, skin=0.3)
+        frame = batch.get_frame_indices()
+        nframes = len(batch)
+        natoms = len(batch.positions)
+
+        e0 = 4 * epsilon * ((sigma / rc)**12 - (sigma / rc)**6)
+        r2 = d**2
+        c6 = (sigma**2 / r2)**3
+        c12 = c6**2
+        atom_energies = 0.5 * np.bincount(i, 4 * epsilon * (c12 - c6) - e0,
+                                          natoms)
+        energies = np.bincount(frame, atom_energies, nframes)
+        f = (24 * epsilon * (2 * c12 - c6) / r2)[:, np.newaxis] * D
+        forces = np.zeros((natoms, 3))
+        for c in range(3):
+            forces[:, c] = -np.bincount(i, f[:, c], natoms)
+
+        if stress:
+            virial = (f[:, :, np.newaxis] * D[:, np.newaxis]).reshape((-1, 9))
+            stresses = np.empty((natoms, 9))
+            for c in range(9):
+                stresses[:, c] = 0.5 * np.bincount(i, virial[:, c], natoms)
+            stresses = stresses.reshape((-1, 3, 3))
+            stresses += stresses.transpose((0, 2, 1))
+            volumes = batch.get_volumes()[frame]
+            stresses *= (-0.5 / volumes)[:, np.newaxis, np.newaxis]
+            stresses = stresses.reshape((-1, 9))[:, [0, 4, 8, 5, 2, 1]]
+
+        results = []
+        for n in range(nframes):
+            s = batch.slice(n)
+            result = {'energy': energies[n],
+                      'free_energy': energies[n],
+                      'energies': atom_energies[s],
+                      'forces': forces[s]}
+            if stress:
+                result['stress'] = stresses[s].sum(0)
+                result['stresses'] = stresses[s]
+            results.append(result)
+        return results
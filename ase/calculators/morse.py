@@ -1,17 +1,16 @@
 import numpy as np
 
-from math import exp, sqrt
-
 from ase.calculators.calculator import Calculator
 
 
 class MorsePotential(Calculator):
     """Morse potential.
 
-    Default values chosen to be similar as Lennard-Jones.
+    Default values chosen to be similar as Lennard-Jones.  Half of the
+    energy of each pair goes to the per-atom energies of the two atoms.
     """
 
-    implemented_properties = ['energy', 'forces']
+    implemented_properties = ['energy', 'energies', 'forces']
     default_parameters = {'epsilon': 1.0,
                           'rho0': 6.0,
                           'r0': 1.0}
@@ -24,21 +23,39 @@ class MorsePotential(Calculator):
                   system_changes=['positions', 'numbers', 'cell',
                                   'pbc', 'charges', 'magmoms']):
         Calculator.calculate(self, atoms, properties, system_changes)
+        self.results.update(self.calculate_batch([self.atoms])[0])
+
+    def calculate_batch(self, images, properties=['energy', 'forces']):
+        from ase.batch import AtomsBatch
         epsilon = self.parameters.epsilon
         rho0 = self.parameters.rho0
         r0 = self.parameters.r0
-        positions = self.atoms.get_positions()
-        energy = 0.0
-        forces = np.zeros((len(self.atoms), 3))
+
+        # All pairs within each image (boundary conditions are ignored
+        # just like in calculate()):
+        batch = AtomsBatch(images)
+        natoms = batch.get_number_of_atoms()
+        pairs = [np.triu_indices(n, 1) for n in natoms]
+        i = np.concatenate([p[0] + o for p, o in zip(pairs, batch.offsets)])
+        j = np.concatenate([p[1] + o for p, o in zip(pairs, batch.offsets)])
+
+        positions = batch.positions
+        diff = positions[i] - positions[j]
+        r = np.sqrt((diff**2).sum(1))
+        expf = np.exp(rho0 * (1.0 - r / r0))
+        pair_energies = 0.5 * epsilon * expf * (expf - 2)
+        atom_energies = (np.bincount(i, pair_energies, len(positions)) +
+                         np.bincount(j, pair_energies, len(positions)))
+        energies = np.bincount(batch.get_frame_indices(), atom_energies,
+                               len(batch))
         preF = 2 * epsilon * rho0 / r0
-        for i1, p1 in enumerate(positions):
-            for i2, p2 in enumerate(positions[:i1]):
-                diff = p2 - p1
-                r = sqrt(np.dot(diff, diff))
-                expf = exp(rho0 * (1.0 - r / r0))
-                energy += epsilon * expf * (expf - 2)
-                F = preF * expf * (expf - 1) * diff / r
-                forces[i1] -= F
-                forces[i2] += F
-        self.results['energy'] = energy
-        self.results['forces'] = forces
+        F = (preF * expf * (expf - 1) / r)[:, np.newaxis] * diff
+        forces = np.zeros((len(positions), 3))
+        for c in range(3):
+            forces[:, c] = (np.bincount(i, F[:, c], len(positions)) -
+                            np.bincount(j, F[:, c], len(positions)))
+
+        return [{'energy': energy,
+                 'energies': atom_energies[batch.slice(n)],
+                 'forces': forces[batch.slice(n)]}
+                for n, energy in enumerate(energies)]
@@ -1,6 +1,9 @@
 from __future__ import print_function
 import os
+import queue
 import socket
+import threading
+from concurrent.futures import Future
 from subprocess import Popen
 
 import numpy as np
@@ -197,6 +200,7 @@ class IPIProtocol:
 
 class SocketServer:
     default_port = 31415
+    backlog = 1  # number of pending connections passed to listen()
 
     def __init__(self, client_command=None, port=None,
                  unixsocket=None, timeout=None, cwd=None, log=None):
@@ -254,7 +258,7 @@ class SocketServer:
 
         self.serversocket.settimeout(timeout)
 
-        self.serversocket.listen(1)
+        self.serversocket.listen(self.backlog)
 
         self.log = log
 
@@ -354,6 +358,148 @@ class SocketServer:
         return self.protocol.calculate(atoms.positions, atoms.cell)
 
 
+class SocketPool(SocketServer):
+    backlog = 16
+
+    def __init__(self, port=None, unixsocket=None, timeout=None, log=None):
+        """Serve many clients on one socket.
+
+        Any number of clients may connect at any time.  Geometries
+        submitted with submit() are queued and each one is sent to
+        the first client that is idle.  The results are returned as
+        concurrent.futures.Future objects.  If a client disconnects
+        in the middle of a calculation, the geometry is given to
+        another client.
+
+        Parameters are the same as for SocketServer.
+
+        >>> with SocketPool(unixsocket='pool') as pool:
+        ...     futures = [pool.submit(atoms) for atoms in images]
+        ...     energies = [f.result()['energy'] for f in futures]
+        """
+        SocketServer.__init__(self, port=port, unixsocket=unixsocket,
+                              timeout=timeout, log=log)
+        self.queue = queue.Queue()
+        self.workers = []
+        self.lock = threading.Lock()
+        self.acceptor = threading.Thread(target=self._accept_clients)
+        self.acceptor.daemon = True
+        self.acceptor.start()
+
+    @property
+    def nclients(self):
+        """Number of connected clients."""
+        with self.lock:
+            return sum(thread.is_alive() for thread in self.workers)
+
+    def _accept_clients(self):
+        # Poll so that close() can stop us:
+        self.serversocket.settimeout(0.2)
+        while not self._closed:
+            try:
+                clientsocket, address = self.serversocket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._closed:
+                    break
+                raise
+            clientsocket.settimeout(self.timeout)
+            with self.lock:
+                n = len(self.workers)
+                if self.log:
+                    source = 'client' if address == b'' else address
+                    print('Accepted connection {} from {}'.format(n, source),
+                          file=self.log)
+                thread = threading.Thread(target=self._serve,
+                                          args=(clientsocket, n))
+                thread.daemon = True
+                self.workers.append(thread)
+                thread.start()
+
+    def _serve(self, clientsocket, n):
+        """Do calculations from the queue until close() is called."""
+        protocol = IPIProtocol(clientsocket, txt=self.log)
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    protocol.end()
+                    break
+                positions, cell, future = item
+                if (not future.running() and
+                    not future.set_running_or_notify_cancel()):
+                    continue
+                try:
+                    results = protocol.calculate(positions, cell)
+                except OSError as err:
+                    # Let another client do it:
+                    self.queue.put(item)
+                    if self.log:
+                        print('Lost connection {}: {}'.format(n, err),
+                              file=self.log)
+                    break
+                except Exception as err:
+                    future.set_exception(err)
+                    break
+                future.set_result(results)
+        except OSError:
+            pass
+        finally:
+            clientsocket.close()
+
+    def submit(self, atoms):
+        """Queue calculation of energy, forces and virial.
+
+        Returns a Future object whose result is a dict like the one
+        returned by SocketServer.calculate().  Later changes to the
+        atoms do not affect the calculation."""
+        assert not self._closed
+        future = Future()
+        self.queue.put((atoms.get_positions(), np.array(atoms.cell), future))
+        return future
+
+    def map(self, images):
+        """Calculate all images.  Returns list of result dicts."""
+        futures = [self.submit(atoms) for atoms in images]
+        return [future.result() for future in futures]
+
+    def calculate(self, atoms):
+        return self.submit(atoms).result()
+
+    def close(self):
+        """Finish the submitted calculations and disconnect clients.
+
+        Calculations that are still queued when the last client
+        disconnects are cancelled."""
+        if self._closed:
+            return
+
+        if self.log:
+            print('Close socket pool', file=self.log)
+        self._closed = True
+        self.acceptor.join()
+        for thread in self.workers:
+            self.queue.put(None)
+        for thread in self.workers:
+            thread.join()
+        while not self.queue.empty():
+            item = self.queue.get()
+            if item is not None and not item[2].cancel():
+                # Its client was lost:
+                item[2].set_exception(SocketClosed('No clients left'))
+        self.serversocket.close()
+        if self._created_socket_file is not None:
+            assert self._created_socket_file.startswith('/tmp/ipi_')
+            os.unlink(self._created_socket_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
 class SocketClient:
     def __init__(self, host='localhost', port=None,
                  unixsocket=None, timeout=None, log=None, comm=None):
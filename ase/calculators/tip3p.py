@@ -5,6 +5,7 @@ import numpy as np
 
 import ase.units as units
 from ase.calculators.calculator import Calculator, all_changes
+from ase.neighborlist import NewPrimitiveNeighborList
 
 qH = 0.417
 sigma0 = 3.15061
@@ -14,21 +15,32 @@ angleHOH = 104.52
 thetaHOH = 104.52 / 180 * np.pi  # we keep this for backwards compatibility
 
 
+def scatter_add(forces, indices, F):
+    """Add rows of F to forces[indices], also for repeated indices."""
+    for c in range(3):
+        forces[:, c] += np.bincount(indices, F[:, c], minlength=len(forces))
+
+
 class TIP3P(Calculator):
     implemented_properties = ['energy', 'forces']
     nolabel = True
     pcpot = None
 
-    def __init__(self, rc=5.0, width=1.0):
+    def __init__(self, rc=5.0, width=1.0, skin=0.5):
         """TIP3P potential.
 
         rc: float
             Cutoff radius for Coulomb part.
         width: float
             Width for cutoff function for Coulomb part.
+        skin: float
+            The O-O neighbor list is only rebuilt when an oxygen has moved
+            more than this distance.
         """
         self.rc = rc
         self.width = width
+        self.skin = skin
+        self.nl = None
         Calculator.__init__(self)
         self.sites_per_mol = 3
 
@@ -39,12 +51,8 @@ class TIP3P(Calculator):
 
         R = self.atoms.positions.reshape((-1, 3, 3))
         Z = self.atoms.numbers
-        pbc = self.atoms.pbc
-        cell = self.atoms.cell.diagonal()
         nh2o = len(R)
 
-        assert (self.atoms.cell == np.diag(cell)).all(), 'not orthorhombic'
-        assert ((cell >= 2 * self.rc) | ~pbc).all(), 'cutoff too large'  # ???
         if Z[0] == 8:
             o = 0
         else:
@@ -56,49 +64,9 @@ class TIP3P(Calculator):
         charges = np.array([qH, qH, qH])
         charges[o] *= -2
 
-        energy = 0.0
-        forces = np.zeros((3 * nh2o, 3))
-
-        for m in range(nh2o - 1):
-            DOO = R[m + 1:, o] - R[m, o]
-            shift = np.zeros_like(DOO)
-            for i, periodic in enumerate(pbc):
-                if periodic:
-                    L = cell[i]
-                    shift[:, i] = (DOO[:, i] + L / 2) % L - L / 2 - DOO[:, i]
-            DOO += shift
-            d2 = (DOO**2).sum(1)
-            d = d2**0.5
-            x1 = d > self.rc - self.width
-            x2 = d < self.rc
-            x12 = np.logical_and(x1, x2)
-            y = (d[x12] - self.rc + self.width) / self.width
-            t = np.zeros(len(d))  # cutoff function
-            t[x2] = 1.0
-            t[x12] -= y**2 * (3.0 - 2.0 * y)
-            dtdd = np.zeros(len(d))
-            dtdd[x12] -= 6.0 / self.width * y * (1.0 - y)
-            c6 = (sigma0**2 / d2)**3
-            c12 = c6**2
-            e = 4 * epsilon0 * (c12 - c6)
-            energy += np.dot(t, e)
-            F = (24 * epsilon0 * (2 * c12 - c6) / d2 * t -
-                 e * dtdd / d)[:, np.newaxis] * DOO
-            forces[m * 3 + o] -= F.sum(0)
-            forces[m * 3 + 3 + o::3] += F
-
-            for j in range(3):
-                D = R[m + 1:] - R[m, j] + shift[:, np.newaxis]
-                r2 = (D**2).sum(axis=2)
-                r = r2**0.5
-                e = charges[j] * charges / r * units.Hartree * units.Bohr
-                energy += np.dot(t, e).sum()
-                F = (e / r2 * t[:, np.newaxis])[:, :, np.newaxis] * D
-                FOO = -(e.sum(1) * dtdd / d)[:, np.newaxis] * DOO
-                forces[(m + 1) * 3 + o::3] += FOO
-                forces[m * 3 + o] -= FOO.sum(0)
-                forces[(m + 1) * 3:] += F.reshape((-1, 3))
-                forces[m * 3 + j] -= F.sum(axis=0).sum(axis=0)
+        energy, forces = self.energy_and_forces(R, charges, o,
+                                                sigma0, epsilon0)
+        forces.shape = (3 * nh2o, 3)
 
         if self.pcpot:
             e, f = self.pcpot.calculate(np.tile(charges, nh2o),
@@ -109,6 +77,83 @@ class TIP3P(Calculator):
         self.results['energy'] = energy
         self.results['forces'] = forces
 
+    def energy_and_forces(self, R, charges, o, sigma, epsilon):
+        """Energy and forces from interactions between molecules.
+
+        R: (nmol, nsites, 3) array
+            Positions of the interaction sites of each molecule.
+        charges: array
+            Charges of the nsites sites of a molecule.
+        o: int
+            Index of the oxygen site.  Oxygens interact through a
+            Lennard-Jones potential with parameters sigma and epsilon,
+            and the O-O distance is used for the cutoff of all
+            interactions between two molecules.
+
+        All interacting pairs of molecules are found with a neighbor
+        list, which works for any unit cell, and the interactions are
+        evaluated for all pairs at once."""
+        nmol, nsites = R.shape[:2]
+        RO = R[:, o]
+
+        if np.isinf(self.rc):
+            assert not self.atoms.pbc.any(), 'infinite cutoff with pbc'
+            i, j = np.triu_indices(nmol, 1)
+            shift = np.zeros((len(i), 3))
+        else:
+            if self.nl is None or len(self.nl.cutoffs) != nmol:
+                self.nl = NewPrimitiveNeighborList(
+                    np.zeros(nmol) + self.rc / 2, skin=self.skin,
+                    self_interaction=False)
+            self.nl.update(self.atoms.pbc, self.atoms.cell, RO)
+            i = self.nl.pair_first
+            j = self.nl.pair_second
+            shift = np.dot(self.nl.offset_vec, self.atoms.cell)
+
+        DOO = RO[j] + shift - RO[i]
+        d2 = (DOO**2).sum(1)
+        d = d2**0.5
+        x1 = d > self.rc - self.width
+        x2 = d < self.rc
+        x12 = np.logical_and(x1, x2)
+        y = (d[x12] - self.rc + self.width) / self.width
+        t = np.zeros(len(d))  # cutoff function
+        t[x2] = 1.0
+        t[x12] -= y**2 * (3.0 - 2.0 * y)
+        dtdd = np.zeros(len(d))
+        dtdd[x12] -= 6.0 / self.width * y * (1.0 - y)
+
+        forces = np.zeros((nmol, nsites, 3))
+
+        c6 = (sigma**2 / d2)**3
+        c12 = c6**2
+        e = 4 * epsilon * (c12 - c6)
+        energy = np.dot(t, e)
+        F = (24 * epsilon * (2 * c12 - c6) / d2 * t -
+             e * dtdd / d)[:, np.newaxis] * DOO
+        scatter_add(forces[:, o], j, F)
+        scatter_add(forces[:, o], i, -F)
+
+        ecoul = np.zeros(len(d))
+        for a in range(nsites):
+            for b in range(nsites):
+                if charges[a] == 0.0 or charges[b] == 0.0:
+                    continue
+                D = R[j, b] + shift - R[i, a]
+                r2 = (D**2).sum(1)
+                e = (charges[a] * charges[b] / r2**0.5 *
+                     units.Hartree * units.Bohr)
+                ecoul += e
+                F = (e / r2 * t)[:, np.newaxis] * D
+                scatter_add(forces[:, b], j, F)
+                scatter_add(forces[:, a], i, -F)
+        energy += np.dot(t, ecoul)
+        FOO = -(ecoul * dtdd / d)[:, np.newaxis] * DOO
+        scatter_add(forces[:, o], j, FOO)
+        scatter_add(forces[:, o], i, -FOO)
+
+        return energy, forces
+
     def embed(self, charges):
         """Embed atoms in point-charges."""
         self.pcpot = PointChargePotential(charges)
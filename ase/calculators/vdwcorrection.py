@@ -217,14 +217,13 @@ class vdWTkatchenko09prl(Calculator):
             self.results[name] = self.calculator.get_property(name, atoms)
         self.atoms = atoms.copy()
 
+        symbols = atoms.get_chemical_symbols()
         if self.vdwradii is not None:
             # external vdW radii
             vdwradii = self.vdwradii
             assert(len(atoms) == len(vdwradii))
         else:
-            vdwradii = []
-            for atom in atoms:
-                self.vdwradii.append(vdWDB_Grimme06jcc[atom.symbol][1])
+            vdwradii = [vdWDB_Grimme06jcc[symbol][1] for symbol in symbols]
 
         if self.hirshfeld is None:
             volume_ratios = [1.] * len(atoms)
@@ -234,113 +233,83 @@ class vdWTkatchenko09prl(Calculator):
         else:  # should be an object
             self.hirshfeld.initialize()
             volume_ratios = self.hirshfeld.get_effective_volume_ratios()
+        volume_ratios = np.asarray(volume_ratios, float)
 
+        # free atom values
+        alpha_a, C6eff_a = np.array([self.vdWDB_alphaC6[symbol]
+                                     for symbol in symbols], float).T
         # correction for effective C6
-        na = len(atoms)
-        C6eff_a = np.empty((na))
-        alpha_a = np.empty((na))
-        R0eff_a = np.empty((na))
-        for a, atom in enumerate(atoms):
-            # free atom values
-            alpha_a[a], C6eff_a[a] = self.vdWDB_alphaC6[atom.symbol]
-            # correction for effective C6
-            C6eff_a[a] *= Hartree * volume_ratios[a]**2 * Bohr**6
-            R0eff_a[a] = vdwradii[a] * volume_ratios[a]**(1 / 3.)
-        C6eff_aa = np.empty((na, na))
-        for a in range(na):
-            for b in range(a, na):
-                C6eff_aa[a, b] = (2 * C6eff_a[a] * C6eff_a[b] /
-                                  (alpha_a[b] / alpha_a[a] * C6eff_a[a] +
-                                   alpha_a[a] / alpha_a[b] * C6eff_a[b]))
-                C6eff_aa[b, a] = C6eff_aa[a, b]
+        C6eff_a *= Hartree * volume_ratios**2 * Bohr**6
+        R0eff_a = np.asarray(vdwradii, float) * volume_ratios**(1 / 3.)
 
         # New implementation by Miguel Caro (complaints etc to mcaroba@gmail.com)
         # If all 3 PBC are False, we do the summation over the atom
         # pairs in the simulation box. If any of them is True, we
         # use the cutoff radius instead
         pbc_c = atoms.get_pbc()
-        EvdW = 0.0
-        forces = 0. * self.results['forces']
         # PBC: we build a neighbor list according to the Reff criterion
         if pbc_c.any():
             # Effective cutoff radius
             tol = 1.e-5
             Reff = self.Rmax + self.Ldecay * erfinv(1. - 2.*tol)
             # Build list of neighbors
-            n_list = neighbor_list(quantities = "ijdDS",
-                                   a = atoms,
-                                   cutoff = Reff,
-                                   self_interaction=False)
-            atom_list = [[] for _ in range(0, len(atoms))]
-            d_list = [[] for _ in range(0, len(atoms))]
-            v_list = [[] for _ in range(0, len(atoms))]
-            #r_list = [[] for _ in range(0, len(atoms))]
-            # Look for neighbor pairs
-            for k in range(0, len(n_list[0])):
-                i = n_list[0][k]
-                j = n_list[1][k]
-                dist = n_list[2][k]
-                vect = n_list[3][k] # vect is the distance rj - ri
-                #repl = n_list[4][k]
-                if j >= i:
-                    atom_list[i].append( j )
-                    d_list[i].append( dist )
-                    v_list[i].append( vect )
-                    #r_list[i].append( repl )
-        # Not PBC: we loop over all atoms in the unit cell only
+            i, j, r, vect = neighbor_list(quantities="ijdD",
+                                          a=atoms,
+                                          cutoff=Reff,
+                                          self_interaction=False)
+            # vect is the distance rj - ri.  Keep each interaction once;
+            # an atom interacting with its own images (i == j) appears
+            # twice and these are corrected for below
+            mask = j >= i
+            i = i[mask]
+            j = j[mask]
+            r = r[mask]
+            vect = vect[mask]
+            smooth = 0.5 * erfc((r - self.Rmax) / self.Ldecay)
+            smooth_der = -1. / np.sqrt(np.pi) / self.Ldecay * np.exp(
+                -((r - self.Rmax) / self.Ldecay)**2)
+        # Not PBC: we use all pairs of atoms in the unit cell only
         else:
-            atom_list = []
-            d_list = []
-            v_list = []
-            #r_list = []
             # Do this to avoid double counting
-            for i in range(0, len(atoms)):
-                atom_list.append( range(i+1, len(atoms)) )
-                d_list.append( [atoms.get_distance(i, j) for j in range(i+1, len(atoms))] )
-                v_list.append( [atoms.get_distance(i, j, vector=True) for j in range(i+1, len(atoms))] )
-                #r_list.append( [[0,0,0] for j in range(i+1, len(atoms))]) # No PBC means we are in the same cell
-        # Here goes the calculation, valid with and without PBC because we loop over
-        # independent pairwise *interactions*
-        for i in range(0,len(atoms)):
-            #for j, r, vect, repl in zip(atom_list[i], d_list[i], v_list[i], r_list[i]):
-            for j, r, vect in zip(atom_list[i], d_list[i], v_list[i]):
-                r6 = r**6
-                Edamp, Fdamp = self.damping(r,
-                                            R0eff_a[i],
-                                            R0eff_a[j],
-                                            d=self.d,
-                                            sR=self.sR)
-                if pbc_c.any():
-                    smooth = 0.5 * erfc((r - self.Rmax) / self.Ldecay)
-                    smooth_der = -1. / np.sqrt(np.pi) / self.Ldecay * np.exp(
-                                  -((r - self.Rmax) / self.Ldecay)**2 )
-                else:
-                    smooth = 1.
-                    smooth_der = 0.
-                # Here we compute the contribution to the energy
-                # Self interactions (only possible in PBC) are double counted. We correct it here
-                if i == j:
-                    EvdW -= (Edamp * C6eff_aa[i, j] / r6) / 2. * smooth
-                else:
-                    EvdW -= (Edamp * C6eff_aa[i, j] / r6) * smooth
-                # Here we compute the contribution to the forces
-                # We neglect the C6eff contribution to the forces (which can actually be larger
-                # than the other contributions)
-                # Self interactions do not contribute to the forces
-                if i != j:
-                    # Force on i due to j
-                    force_ij = -(
-                                  (Fdamp - 6 * Edamp / r) * C6eff_aa[i, j] / r6 * smooth
-                                 +(Edamp * C6eff_aa[i, j] / r6) * smooth_der
-                                ) * vect / r
-                    # Forces go both ways for every interaction
-                    forces[i] += force_ij
-                    forces[j] -= force_ij
+            i, j = np.triu_indices(len(atoms), 1)
+            vect = atoms.positions[j] - atoms.positions[i]
+            r = np.sqrt((vect**2).sum(1))
+            smooth = 1.
+            smooth_der = 0.
+
+        # Here goes the calculation, valid with and without PBC because
+        # we work on independent pairwise *interactions*
+        C6eff_ij = (2 * C6eff_a[i] * C6eff_a[j] /
+                    (alpha_a[j] / alpha_a[i] * C6eff_a[i] +
+                     alpha_a[i] / alpha_a[j] * C6eff_a[j]))
+        r6 = r**6
+        Edamp, Fdamp = self.damping(r,
+                                    R0eff_a[i],
+                                    R0eff_a[j],
+                                    d=self.d,
+                                    sR=self.sR)
+        # Self interactions (only possible in PBC) are double counted.
+        # We correct it here
+        e_ij = Edamp * C6eff_ij / r6 * smooth
+        EvdW = -np.dot(np.where(i == j, 0.5, 1.0), e_ij)
+        # Here we compute the contribution to the forces
+        # We neglect the C6eff contribution to the forces (which can actually
+        # be larger than the other contributions)
+        # Self interactions do not contribute to the forces, since the
+        # force on i and j cancel
+        force_ij = -((Fdamp - 6 * Edamp / r) * C6eff_ij / r6 * smooth +
+                     Edamp * C6eff_ij / r6 * smooth_der)[:, np.newaxis] * (
+                         vect / r[:, np.newaxis])
+        # Forces go both ways for every interaction
+        forces = np.zeros((len(atoms), 3))
+        for c in range(3):
+            forces[:, c] += np.bincount(i, force_ij[:, c],
+                                        minlength=len(atoms))
+            forces[:, c] -= np.bincount(j, force_ij[:, c],
+                                        minlength=len(atoms))
         self.results['energy'] += EvdW
         self.results['forces'] += forces
 
-
-
         if self.txt:
             print(('\n' + self.__class__.__name__), file=self.txt)
             print('vdW correction: %g' % (EvdW), file=self.txt)
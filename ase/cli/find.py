@@ -1,8 +1,11 @@
 from __future__ import print_function
+import multiprocessing
 import os
 import os.path as op
+import sqlite3
 import sys
 
+from ase import Atoms
 from ase.io import read
 from ase.io.formats import filetype, UnknownFileTypeError
 from ase.db import connect
@@ -18,6 +21,10 @@ class CLICommand:
 
     See https://wiki.fysik.dtu.dk/ase/ase/db/db.html#querying for more
     informations on how to construct the query string.
+
+    What was found in each file is stored in a cache (an ASE database)
+    so that only new and modified files need to be read next time.
+    Files that have been removed are dropped from the cache.
     """
 
     @staticmethod
@@ -39,12 +46,29 @@ class CLICommand:
         parser.add_argument('-x', '--exclude', help='Exclude filenames '
                             'ending with given strings.  Example: '
                             '"-x .cif".')
+        parser.add_argument('-j', '--jobs', type=int,
+                            help='Number of processes used for reading '
+                            'files.  Default is number of CPUs.')
+        parser.add_argument('--cache', default=default_cache(),
+                            help='ASE database used as cache.  '
+                            'Default: {}.'.format(default_cache()))
+        parser.add_argument('--no-cache', action='store_true',
+                            help='Read all files and don\'t use a cache.')
 
     @staticmethod
     def run(args):
         main(args)
 
 
+# File types that are databases and can be queried directly:
+database_types = ['db', 'json', 'jsonl']
+
+
+def default_cache():
+    folder = os.environ.get('XDG_CACHE_HOME', op.expanduser('~/.cache'))
+    return op.join(folder, 'ase', 'find.db')
+
+
 def main(args):
     query = parse_selection(args.query)
     include = args.include.split(',') if args.include else []
@@ -53,9 +77,60 @@ def main(args):
     if args.long:
         print('pbc {:10} {:15} path'.format('formula', 'filetype'))
 
+    cache = None
+    if not args.no_cache:
+        folder = op.dirname(args.cache)
+        try:
+            if folder and not op.isdir(folder):
+                os.makedirs(folder)
+            cache = Cache(args.cache, args.folder)
+        except (OSError, sqlite3.Error) as x:
+            print('Not using cache {}: {}'.format(args.cache, x),
+                  file=sys.stderr)
+
+    # Find the files that must be read:
+    paths = []
+    todo = []
     for path in allpaths(args.folder, include, exclude):
-        format, row = check(path, query, args.verbose)
-        if format:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        new = cache is None or not cache.has(path, st)
+        if new:
+            todo.append(path)
+        paths.append((path, st, new))
+
+    if args.jobs == 1 or len(todo) < 2:
+        results = (parse(path) for path in todo)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(args.jobs)
+        results = pool.imap(parse, todo, chunksize=16)
+
+    try:
+        if cache is not None:
+            # Apply query to all files in the cache at once:
+            found = cache.select(query)
+
+        for path, st, new in paths:
+            if new:
+                format, atoms, error = next(results)
+                if error and args.verbose:
+                    print(path + ':', error, file=sys.stderr)
+                if cache is not None:
+                    cache.add(path, st, format, atoms)
+                row = select(path, format, atoms, query, args.verbose)
+            else:
+                format = cache.filetype(path)
+                if format in database_types:
+                    row = select(path, format, None, query, args.verbose)
+                else:
+                    row = found.get(op.abspath(path))
+
+            if row is None:
+                continue
+
             if args.long:
                 print('{} {:10} {:15} {}'
                       .format(''.join(str(p) for p in row.pbc.astype(int)),
@@ -64,6 +139,11 @@ def main(args):
                               path))
             else:
                 print(path)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if cache is not None:
+            cache.close()
 
 
 def allpaths(folder, include, exclude):
@@ -86,36 +166,102 @@ def allpaths(folder, include, exclude):
         dirnames[:] = (name for name in dirnames if name[0] not in '._')
 
 
-def check(path, query, verbose):
-    """Check a path.
-
-    Returns a (filetype, AtomsRow object) tuple.
-    """
+def parse(path):
+    """Read atoms from path.
 
+    Returns (filetype, Atoms object, error message) tuple.  The filetype
+    is '' and the Atoms object is None if there are no atoms.  Files that
+    are databases are not read."""
     try:
         format = filetype(path, guess=False)
     except (OSError, UnknownFileTypeError):
-        return '', None
+        return '', None, None
+
+    if format in database_types:
+        return format, None, None
+
+    try:
+        atoms = read(path, format=format)
+    except Exception as x:
+        return '', None, str(x)
+    if not isinstance(atoms, Atoms):
+        return '', None, None
+    return format, atoms, None
 
-    if format in ['db', 'json']:
+
+def select(path, format, atoms, query, verbose):
+    """Apply query to atoms or to rows of database file.
+
+    Returns first matching AtomsRow object or None."""
+    if format in database_types:
         db = connect(path)
+    elif atoms is None:
+        return None
     else:
-        try:
-            atoms = read(path, format=format)
-        except Exception as x:
-            if verbose:
-                print(path + ':', x, file=sys.stderr)
-            return '', None
         db = FakeDB(atoms)
 
     try:
         for row in db._select(*query):
-            return format, row
+            return row
     except Exception as x:
         if verbose:
             print(path + ':', x, file=sys.stderr)
 
-    return '', None
+
+class Cache:
+    """ASE database with what was found in each file.
+
+    There is one row per file with the atoms and the key-value pairs
+    path, filesize, filemtime and filetype.  New rows are committed when
+    the cache is closed.  Rows for files in folder that no longer exist
+    are deleted.
+    """
+    def __init__(self, filename, folder):
+        self.db = connect(filename, use_lock_file=False)
+        self.files = {}  # path -> (id, filesize, filemtime, filetype)
+        for row in self.db.select(columns=['id', 'key_value_pairs'],
+                                  include_data=False):
+            self.files[row.path] = (row.id, row.filesize, row.filemtime,
+                                    row.filetype)
+
+        folder = op.join(op.abspath(folder), '')
+        missing = [path for path in self.files
+                   if path.startswith(folder) and not op.isfile(path)]
+        self.db.delete([self.files.pop(path)[0] for path in missing])
+
+        self.db.__enter__()
+
+    def has(self, path, st):
+        """Check if path is in the cache and has not been modified."""
+        entry = self.files.get(op.abspath(path))
+        return (entry is not None and
+                entry[1:3] == (st.st_size, st.st_mtime))
+
+    def filetype(self, path):
+        return self.files[op.abspath(path)][3]
+
+    def select(self, query):
+        """Find rows matching query.
+
+        Returns dict mapping paths to rows."""
+        found = {}
+        for row in self.db._select(*query, include_data=False):
+            if row.filetype and row.filetype not in database_types:
+                found[row.path] = row
+        return found
+
+    def add(self, path, st, format, atoms):
+        path = op.abspath(path)
+        if atoms is None:
+            atoms = Atoms()
+        entry = self.files.get(path)
+        id = self.db.write(atoms, id=entry and entry[0], path=path,
+                           filesize=st.st_size, filemtime=st.st_mtime,
+                           filetype=format)
+        self.files[path] = (id, st.st_size, st.st_mtime, format)
+
+    def close(self):
+        self.db.__exit__(None, None, None)
 
 
 class FakeDB(JSONDatabase):
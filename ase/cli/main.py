@@ -54,9 +54,19 @@ def main(prog='ase', description='ASE command line tool.',
                            metavar='sub-command',
                            help='Provide help for sub-command.')
 
+    # Only the module of the sub-command that is run needs to be imported.
+    # The help needs all of them:
+    argv = sys.argv[1:] if args is None else args
+    selected = next((arg for arg in argv if not arg.startswith('-')), None)
+    if selected not in dict(commands):
+        selected = None
+
     functions = {}
     parsers = {}
     for command, module_name in commands:
+        if selected is not None and command != selected:
+            subparsers.add_parser(command)
+            continue
         cmd = import_module(module_name).CLICommand
         docstring = cmd.__doc__
         if docstring is None:
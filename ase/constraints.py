@@ -5,7 +5,6 @@ from ase.geometry import find_mic
 from ase.calculators.calculator import PropertyNotImplementedError
 
 import numpy as np
-from scipy.linalg import expm
 
 __all__ = ['FixCartesian', 'FixBondLength', 'FixedMode', 'FixConstraintSingle',
            'FixAtoms', 'UnitCellFilter', 'ExpCellFilter', 'FixScaled', 'StrainFilter',
@@ -82,16 +81,12 @@ class FixConstraintSingle(FixConstraint):
 
     def index_shuffle(self, atoms, ind):
         """The atom index must be stored as self.a."""
-        newa = None   # Signal error
         if self.a < 0:
             self.a += len(atoms)
-        for new, old in slice2enlist(ind, len(atoms)):
-            if old == self.a:
-                newa = new
-                break
-        if newa is None:
+        newa = np.where(np.arange(len(atoms))[ind] == self.a)[0]
+        if len(newa) == 0:
             raise IndexError('Constraint not part of slice')
-        self.a = newa
+        self.a = int(newa[0])
 
     def get_indices(self):
         return [self.a]
@@ -155,13 +150,13 @@ class FixAtoms(FixConstraint):
 
     def index_shuffle(self, atoms, ind):
         # See docstring of superclass
-        index = []
-        for new, old in slice2enlist(ind, len(atoms)):
-            if old in self.index:
-                index.append(new)
+        fixed = np.zeros(len(atoms), bool)
+        fixed[self.index] = True
+        index = np.where(fixed[ind])[0]
         if len(index) == 0:
             raise IndexError('All indices in FixAtoms not part of slice')
-        self.index = np.asarray(index, int)
+        self.index = index
+        self.removed_dof = 3 * len(index)
 
     def get_indices(self):
         return self.index
@@ -1717,6 +1712,7 @@ class ExpCellFilter(UnitCellFilter):
         current deformation gradient.
         '''
 
+        from scipy.linalg import expm
         natoms = len(self.atoms)
         self.atom_positions[:] = new[:natoms]
         self.deform_grad_log = new[natoms:]
@@ -1743,6 +1739,7 @@ class ExpCellFilter(UnitCellFilter):
         computed from the stress tensor.
         '''
 
+        from scipy.linalg import expm
         atoms_forces = self.atoms.get_forces()
         stress = self.atoms.get_stress()
 
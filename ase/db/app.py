@@ -23,9 +23,12 @@ import functools
 import io
 import os
 import os.path as op
+import queue
 import re
 import sys
 import tempfile
+import threading
+import time
 
 from flask import Flask, render_template, request, send_from_directory, flash
 
@@ -75,6 +78,21 @@ SUBSCRIPT = re.compile(r'(\d+)')
 next_con_id = 1
 connections = {}
 
+# Cached tables and row counts.  The keys contain the "version" of the
+# database (see database_version()) so old entries will not be found
+# after the database has been modified:
+tables = collections.OrderedDict()  # type: Dict[tuple, Table]
+counts = collections.OrderedDict()  # type: Dict[tuple, int]
+max_cache_size = 200
+cache_lock = threading.Lock()
+
+# Thumbnails for the rows of the page being shown are rendered by a
+# background thread:
+prefetch_thumbnails = True
+thumbnails = queue.LifoQueue()  # (project, id) tuples
+render_lock = threading.Lock()
+renderer = None  # type: threading.Thread
+
 
 def connect_databases(uris):
     # types: (List[str]) -> None
@@ -226,17 +244,24 @@ def index(project):
                 columns.append(column)
 
     okquery = query
+    version = database_version(db)
 
-    if nrows is None:
-        try:
-            nrows = db.count(query[2])
-        except (ValueError, KeyError) as e:
-            flash(', '.join(['Bad query'] + list(e.args)))
-            okquery = ('', {}, 'id=0')  # this will return no rows
-            nrows = 0
-
-    table = Table(db, meta.get('unique_key', 'id'))
-    table.select(okquery[2], columns, sort, limit, offset=page * limit)
+    try:
+        nrows = cached(counts, (project, query[2], version),
+                       functools.partial(db.count, query[2]))
+    except (ValueError, KeyError) as e:
+        flash(', '.join(['Bad query'] + list(e.args)))
+        okquery = ('', {}, 'id=0')  # this will return no rows
+        nrows = 0
+
+    table = cached(tables,
+                   (project, okquery[2], sort, page, limit, tuple(columns),
+                    version),
+                   functools.partial(select, db, okquery[2], columns, sort,
+                                     limit, page * limit))
+
+    if prefetch_thumbnails:
+        prefetch(project, [row.dct.id for row in table.rows])
 
     con = Connection(query, nrows, page, columns, sort, limit)
     connections[con_id] = con
@@ -267,16 +292,83 @@ def index(project):
                            download_button=download_button)
 
 
+def database_version(db):
+    """Something that changes when the database is modified.
+
+    For database files, this is the modification time and the size.
+    For database servers, we can't tell, so the version changes every
+    minute."""
+    if isinstance(db.filename, str) and op.isfile(db.filename):
+        st = os.stat(db.filename)
+        return st.st_mtime, st.st_size
+    return int(time.time() // 60)
+
+
+def cached(cache, key, func):
+    """Look up key in cache.  Call func() and store result if missing."""
+    with cache_lock:
+        value = cache.pop(key, None)
+    if value is None:
+        value = func()
+    with cache_lock:
+        cache[key] = value  # most recently used go at the end
+        while len(cache) > max_cache_size:
+            cache.popitem(last=False)
+    return value
+
+
+def select(db, query, columns, sort, limit, offset):
+    table = Table(db, db.meta.get('unique_key', 'id'))
+    table.select(query, columns, sort, limit, offset=offset)
+    return table
+
+
+def png_name(project, id):
+    return '{}-{}.png'.format(project, id)
+
+
+def render_png(project, id):
+    """Create png-file for a row unless it is already there."""
+    path = op.join(tmpdir, png_name(project, id))
+    with render_lock:
+        if not op.isfile(path):
+            atoms = databases[project].get_atoms(id)
+            # Write to temporary file first so that other threads never
+            # see a half-written file:
+            atoms2png(atoms, path + '.tmp')
+            os.replace(path + '.tmp', path)
+
+
+def prefetch(project, ids):
+    """Render thumbnails for rows in the background."""
+    global renderer
+    # Last in, first out: the first row of the latest page comes first:
+    for id in reversed(ids):
+        if not op.isfile(op.join(tmpdir, png_name(project, id))):
+            thumbnails.put((project, id))
+    if renderer is None:
+        renderer = threading.Thread(target=render_thumbnails)
+        renderer.daemon = True
+        renderer.start()
+
+
+def render_thumbnails():
+    while True:
+        project, id = thumbnails.get()
+        try:
+            render_png(project, id)
+        except Exception:
+            pass  # image() will try again and report the error
+        finally:
+            thumbnails.task_done()
+
+
 @app.route('/<project>/image/<name>')
 def image(project, name):
     id = int(name[:-4])
-    name = project + '-' + name
-    path = op.join(tmpdir, name)
-    if not op.isfile(path):
-        db = databases[project]
-        atoms = db.get_atoms(id)
-        atoms2png(atoms, path)
-
+    name = png_name(project, id)
+    if not op.isfile(op.join(tmpdir, name)):
+        render_png(project, id)
     return send_from_directory(tmpdir, name)
 
 
@@ -125,8 +125,8 @@ def connect(name, type='extract_from_name', create_indices=True,
     name: str
         Filename or address of database.
     type: str
-        One of 'json', 'db', 'postgresql',
-        (JSON, SQLite, PostgreSQL).
+        One of 'json', 'jsonl', 'db', 'postgresql',
+        (JSON, JSON-lines, SQLite, PostgreSQL).
         Default is 'extract_from_name', which will guess the type
         from the name.
     use_lock_file: bool
@@ -163,6 +163,10 @@ def connect(name, type='extract_from_name', create_indices=True,
     if type == 'json':
         from ase.db.jsondb import JSONDatabase
         return JSONDatabase(name, use_lock_file=use_lock_file, serial=serial)
+    if type == 'jsonl':
+        from ase.db.jsonlinesdb import JSONLinesDatabase
+        return JSONLinesDatabase(name, use_lock_file=use_lock_file,
+                                 serial=serial)
     if type == 'db':
         from ase.db.sqlite import SQLite3Database
         return SQLite3Database(name, create_indices, use_lock_file,
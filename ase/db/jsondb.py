@@ -11,6 +11,26 @@ from ase.parallel import world, parallel_function
 from ase.utils import basestring
 
 
+def matches(row, keys, cmps):
+    """Check if row has all keys and fulfills all comparisons.
+
+    The operators in cmps must be functions from the ops dictionary."""
+    for key in keys:
+        if key not in row:
+            return False
+    for key, op, val in cmps:
+        if isinstance(key, int):
+            value = np.equal(row.numbers, key).sum()
+        else:
+            value = row.get(key)
+            if key == 'pbc':
+                assert op in [ops['='], ops['!=']]
+                value = ''.join('FT'[x] for x in value)
+        if value is None or not op(value, val):
+            return False
+    return True
+
+
 class JSONDatabase(Database, object):
     def __enter__(self):
         return self
@@ -32,6 +52,21 @@ class JSONDatabase(Database, object):
             except (SyntaxError, ValueError):
                 pass
 
+        dct = self._row_dict(atoms, key_value_pairs, data)
+
+        if id is None:
+            id = nextid
+            ids.append(id)
+            nextid += 1
+        else:
+            assert id in bigdct
+
+        bigdct[id] = dct
+        self._write_json(bigdct, ids, nextid)
+        return id
+
+    def _row_dict(self, atoms, key_value_pairs, data):
+        """Create dictionary with everything that goes into a row."""
         mtime = now()
 
         if isinstance(atoms, AtomsRow):
@@ -59,16 +94,7 @@ class JSONDatabase(Database, object):
         if constraints:
             dct['constraints'] = constraints
 
-        if id is None:
-            id = nextid
-            ids.append(id)
-            nextid += 1
-        else:
-            assert id in bigdct
-
-        bigdct[id] = dct
-        self._write_json(bigdct, ids, nextid)
-        return id
+        return dct
 
     def _read_json(self):
         if isinstance(self.filename, basestring):
@@ -180,24 +206,10 @@ class JSONDatabase(Database, object):
                 dct.pop('data', None)
             row = AtomsRow(dct)
             row.id = id
-            for key in keys:
-                if key not in row:
-                    break
-            else:
-                for key, op, val in cmps:
-                    if isinstance(key, int):
-                        value = np.equal(row.numbers, key).sum()
-                    else:
-                        value = row.get(key)
-                        if key == 'pbc':
-                            assert op in [ops['='], ops['!=']]
-                            value = ''.join('FT'[x] for x in value)
-                    if value is None or not op(value, val):
-                        break
-                else:
-                    if n >= offset:
-                        yield row
-                    n += 1
+            if matches(row, keys, cmps):
+                if n >= offset:
+                    yield row
+                n += 1
 
     @property
     def metadata(self):
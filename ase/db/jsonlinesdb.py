@@ -0,0 +1,238 @@
+"""JSON-lines database backend.
+
+The file contains one JSON object per line and is only ever appended to:
+
+* ``{"id": 1, "row": {...}}``: a new row or a new version of a row
+* ``{"id": 1, "deleted": true}``: a deleted row (tombstone)
+* ``{"metadata": {...}}``: metadata
+* ``{"nextid": 7}``: next id (written when the file is compacted)
+
+The last line for a given id wins.  An index of the byte offsets of the
+current version of all rows is kept in memory and is brought up to date by
+reading only what has been appended to the file since last time.
+"""
+from __future__ import absolute_import, print_function
+import os
+import re
+from collections import OrderedDict
+
+from ase.db.core import Database, ops, lock
+from ase.db.jsondb import JSONDatabase, matches
+from ase.db.row import AtomsRow
+from ase.io.jsonio import encode, decode
+from ase.parallel import world, parallel_function
+
+line_start = re.compile(br'\{"id": (\d+), "(row|deleted)"')
+
+
+class Rows(object):
+    """Dictionary-like object decoding rows on demand."""
+    def __init__(self, data, index):
+        self.data = data
+        self.index = index
+
+    def __getitem__(self, id):
+        offset = self.index[id]
+        end = self.data.index(b'\n', offset)
+        return decode(self.data[offset:end].decode())['row']
+
+
+class JSONLinesDatabase(JSONDatabase):
+    # Compact the file when it has more than this many lines that are no
+    # longer needed and they outnumber the current rows:
+    compact_threshold = 1000
+
+    def __init__(self, filename, create_indices=True, use_lock_file=False,
+                 serial=False):
+        JSONDatabase.__init__(self, filename, create_indices,
+                              use_lock_file, serial)
+        self._reset()
+
+    def _reset(self):
+        self._index = OrderedDict()  # id -> byte offset
+        self._nextid = 1
+        self._metadata_offset = None
+        self._dead = 0  # number of lines that are no longer needed
+        self._size = 0  # number of bytes indexed so far
+        self._inode = None
+
+    def _update_index(self):
+        """Index the lines added to the file since last time."""
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            self._reset()
+            return
+
+        if st.st_ino != self._inode or st.st_size < self._size:
+            # New or compacted file:
+            self._reset()
+            self._inode = st.st_ino
+
+        if st.st_size == self._size:
+            return
+
+        with open(self.filename, 'rb') as fd:
+            fd.seek(self._size)
+            offset = self._size
+            for line in fd:
+                if not line.endswith(b'\n'):
+                    break  # not completely written yet
+                self._add_line(line, offset)
+                offset += len(line)
+        self._size = offset
+
+    def _add_line(self, line, offset):
+        match = line_start.match(line)
+        if match:
+            id = int(match.group(1))
+            if id in self._index:
+                self._dead += 1
+            if match.group(2) == b'row':
+                self._index[id] = offset
+            else:
+                self._index.pop(id, None)
+                self._dead += 1
+            self._nextid = max(self._nextid, id + 1)
+        elif line.startswith(b'{"metadata"'):
+            if self._metadata_offset is not None:
+                self._dead += 1
+            self._metadata_offset = offset
+            self._metadata = None
+        elif line.startswith(b'{"nextid"'):
+            self._nextid = max(self._nextid, decode(line.decode())['nextid'])
+        else:
+            raise ValueError('Bad line in {}: {!r}'.format(self.filename,
+                                                           line[:40]))
+
+    def _append(self, lines):
+        if world.rank > 0:
+            return
+
+        with open(self.filename, 'ab') as fd:
+            fd.seek(0, os.SEEK_END)
+            offset = fd.tell()
+            for line in lines:
+                line = line.encode()
+                fd.write(line)
+                self._add_line(line, offset)
+                offset += len(line)
+        self._size = offset
+        self._inode = os.stat(self.filename).st_ino
+
+        if self._dead > max(self.compact_threshold, len(self._index)):
+            self._compact()
+
+    def _read_line(self, offset):
+        with open(self.filename, 'rb') as fd:
+            fd.seek(offset)
+            return decode(fd.readline().decode())
+
+    def _write(self, atoms, key_value_pairs, data, id):
+        Database._write(self, atoms, key_value_pairs, data)
+        self._update_index()
+
+        dct = self._row_dict(atoms, key_value_pairs, data)
+
+        if id is None:
+            id = self._nextid
+        else:
+            assert id in self._index
+
+        self._append(['{{"id": {0}, "row": {1}}}\n'.format(id, encode(dct))])
+        return id
+
+    @parallel_function
+    @lock
+    def compact(self):
+        """Rewrite the file without deleted rows and old versions of rows."""
+        self._update_index()
+        self._compact()
+
+    def _compact(self):
+        if world.rank > 0:
+            return
+
+        tmpname = self.filename + '.tmp'
+        with open(self.filename, 'rb') as fd:
+            with open(tmpname, 'wb') as tmp:
+                tmp.write('{{"nextid": {0}}}\n'.format(self._nextid).encode())
+                offsets = list(self._index.values())
+                if self._metadata_offset is not None:
+                    offsets.append(self._metadata_offset)
+                for offset in offsets:
+                    fd.seek(offset)
+                    tmp.write(fd.readline())
+        os.replace(tmpname, self.filename)
+        self._reset()
+        self._update_index()
+
+    @parallel_function
+    @lock
+    def delete(self, ids):
+        self._update_index()
+        for id in ids:
+            if id not in self._index:
+                raise KeyError(id)
+        self._append(['{{"id": {0}, "deleted": true}}\n'.format(id)
+                      for id in ids])
+
+    def _get_row(self, id):
+        self._update_index()
+        if id is None:
+            assert len(self._index) == 1
+            id = next(iter(self._index))
+        dct = self._read_line(self._index[id])['row']
+        dct['id'] = id
+        return AtomsRow(dct)
+
+    def _read_json(self):
+        self._update_index()
+        if self._index:
+            with open(self.filename, 'rb') as fd:
+                data = fd.read(self._size)
+        else:
+            data = b''
+        return Rows(data, self._index), list(self._index), self._nextid
+
+    def _select(self, keys, cmps, explain=False, verbosity=0,
+                limit=None, offset=0, sort=None, include_data=True,
+                columns='all'):
+        if not explain and not sort:
+            for key, op, val in cmps:
+                if key == 'id' and op == '=':
+                    # Look up the row directly:
+                    self._update_index()
+                    if offset > 0 or val not in self._index:
+                        return
+                    row = self._get_row(val)
+                    if not include_data:
+                        row._data = {}
+                    cmps = [(key, ops[op], val) for key, op, val in cmps]
+                    if matches(row, keys, cmps):
+                        yield row
+                    return
+
+        for row in JSONDatabase._select(self, keys, cmps, explain=explain,
+                                        verbosity=verbosity, limit=limit,
+                                        offset=offset, sort=sort,
+                                        include_data=include_data,
+                                        columns=columns):
+            yield row
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._update_index()
+            if self._metadata_offset is None:
+                self._metadata = {}
+            else:
+                self._metadata = self._read_line(
+                    self._metadata_offset)['metadata']
+        return self._metadata.copy()
+
+    @metadata.setter
+    def metadata(self, dct):
+        self._update_index()
+        self._append(['{{"metadata": {0}}}\n'.format(encode(dct))])
+        self._metadata = dct
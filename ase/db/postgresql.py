@@ -1,12 +1,17 @@
+import itertools
 import json
+import os
+from collections import OrderedDict
 
 import numpy as np
-from psycopg2 import connect
+import psycopg2
 from psycopg2.extras import execute_values
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 
 from ase.db.sqlite import (init_statements, index_statements, VERSION,
                            SQLite3Database)
 import ase.io.jsonio
+from ase.utils import basestring
 
 jsonb_indices = [
     'CREATE INDEX idxkeys ON systems USING GIN (key_value_pairs);',
@@ -33,23 +38,81 @@ def insert_nan_and_inf(obj):
     return obj
 
 
+# Pools of open connections for each process and database address:
+pools = {}
+
+
+def get_pool(dsn, maxconn):
+    key = (os.getpid(), dsn)
+    pool = pools.get(key)
+    if pool is None:
+        pool = ThreadedConnectionPool(0, maxconn, dsn)
+        pools[key] = pool
+    return pool
+
+
 class Connection:
-    def __init__(self, con):
+    """Connection borrowed from a pool.
+
+    Rows given to Cursor.executemany() are collected and inserted with
+    one statement per table when the connection is committed or used for
+    something else.  With pool=None, the connection is not from a pool
+    and is closed when it is no longer needed."""
+    cursor_names = itertools.count()
+
+    def __init__(self, con, pool):
         self.con = con
+        self.pool = pool
+        self.pending = OrderedDict()  # INSERT statement -> list of rows
 
     def cursor(self):
-        return Cursor(self.con.cursor())
+        return Cursor(self.con.cursor(), self)
+
+    def server_side_cursor(self):
+        """Named cursor that fetches the selected rows in batches."""
+        name = 'ase_select_{}'.format(next(self.cursor_names))
+        return ServerSideCursor(self.con.cursor(name), self)
+
+    def flush(self):
+        if not self.pending:
+            return
+        cur = self.con.cursor()
+        # Insert into systems table first because of foreign keys:
+        for statement, rows in sorted(
+                self.pending.items(),
+                key=lambda item: 'INSERT INTO systems' not in item[0]):
+            q = ', '.join('?' * len(rows[0]))
+            statement = statement.replace('({})'.format(q), '%s')
+            q = '({})'.format(q.replace('?', '%s'))
+            execute_values(cur, statement.replace('?', '%s'),
+                           argslist=rows, template=q, page_size=1000)
+        self.pending.clear()
 
     def commit(self):
+        self.flush()
         self.con.commit()
 
+    def rollback(self):
+        self.pending.clear()
+        self.con.rollback()
+
     def close(self):
-        self.con.close()
+        """Give connection back to the pool.
+
+        Anything not committed is rolled back."""
+        self.pending.clear()
+        if self.con is not None:
+            if self.pool is None:
+                self.con.close()
+            else:
+                self.pool.putconn(self.con)
+            self.con = None
 
 
 class Cursor:
-    def __init__(self, cur):
+    def __init__(self, cur, con):
         self.cur = cur
+        self.con = con
 
     def fetchone(self):
         return self.cur.fetchone()
@@ -58,27 +121,37 @@ class Cursor:
         return self.cur.fetchall()
 
     def execute(self, statement, *args):
+        self.con.flush()
         self.cur.execute(statement.replace('?', '%s'), *args)
 
     def executemany(self, statement, *args):
         if len(args[0]) > 0:
-            N = len(args[0][0])
-        else:
-            return
-        if 'INSERT INTO systems' in statement:
-            q = 'DEFAULT' + ', ' + ', '.join('?' * N)  # DEFAULT for id
-        else:
-            q = ', '.join('?' * N)
-        statement = statement.replace('({})'.format(q), '%s')
-        q = '({})'.format(q.replace('?', '%s'))
+            self.con.pending.setdefault(statement, []).extend(args[0])
 
-        execute_values(self.cur, statement.replace('?', '%s'),
-                       argslist=args[0], template=q, page_size=len(args[0]))
+
+class ServerSideCursor(Cursor):
+    def __iter__(self):
+        """Iterate over rows.
+
+        The rows are fetched from the server in batches of
+        self.cur.itersize rows."""
+        return iter(self.cur)
 
 
 class PostgreSQLDatabase(SQLite3Database):
     type = 'postgresql'
     default = 'DEFAULT'
+    # Maximum number of open connections in the pool of each process
+    # (more connections are opened outside the pool when needed):
+    max_connections = 16
+    # Maximum number of row ids to reserve at a time when writing many
+    # rows inside a "with db:" block:
+    max_reserved_ids = 1000
+
+    def __init__(self, *args, **kwargs):
+        SQLite3Database.__init__(self, *args, **kwargs)
+        self._reserved_ids = []
+        self._nreserve = 1
 
     def encode(self, obj):
         return ase.io.jsonio.encode(remove_nan_and_inf(obj))
@@ -86,6 +159,17 @@ class PostgreSQLDatabase(SQLite3Database):
     def decode(self, obj):
         return insert_nan_and_inf(ase.io.jsonio.numpyfy(obj))
 
+    def encode_data(self, data):
+        if ase.io.jsonio.is_binary(data):
+            # From a version 9 SQLite file:
+            data = ase.io.jsonio.decode_binary(data)
+        elif isinstance(data, basestring):
+            return data
+        return self.encode(data)
+
+    def decode_data(self, value):
+        return self.decode(value)
+
     def blob(self, array):
         """Convert array to blob/buffer object."""
 
@@ -105,8 +189,52 @@ class PostgreSQLDatabase(SQLite3Database):
             return None
         return np.array(buf, dtype=dtype)
 
+    def _add_per_atom_columns(self, cur):
+        cur.execute('ALTER TABLE systems '
+                    'ADD COLUMN energies DOUBLE PRECISION[], '
+                    'ADD COLUMN stresses DOUBLE PRECISION[][]')
+
     def _connect(self):
-        return Connection(connect(self.filename))
+        pool = get_pool(self.filename, self.max_connections)
+        try:
+            return Connection(pool.getconn(), pool)
+        except PoolError:
+            # All connections of the pool are in use:
+            return Connection(psycopg2.connect(self.filename), None)
+
+    def __exit__(self, exc_type, exc_value, tb):
+        SQLite3Database.__exit__(self, exc_type, exc_value, tb)
+        self._reserved_ids = []
+        self._nreserve = 1
+
+    def _insert_system(self, cur, values):
+        id = self._reserve_id(cur)
+        names = ', '.join(self.columnnames[:len(values) + 1])
+        q = ', '.join('?' * (len(values) + 1))
+        cur.executemany('INSERT INTO systems ({}) VALUES ({})'
+                        .format(names, q), [(id,) + values])
+        return id
+
+    def _reserve_id(self, cur):
+        """Get id for new row from the sequence of the systems table.
+
+        Inside a "with db:" block, ids are taken from the sequence in
+        blocks of increasing size, so that the rows can be inserted
+        together when the block ends."""
+        if not self._reserved_ids:
+            n = self._nreserve
+            cur.execute("SELECT nextval('systems_id_seq') "
+                        'FROM generate_series(1, ?)', (n,))
+            self._reserved_ids = [id for id, in cur.fetchall()][::-1]
+            if self.connection is not None:
+                self._nreserve = min(2 * n, self.max_reserved_ids)
+        return self._reserved_ids.pop()
+
+    def _select_cursor(self, con):
+        return con.server_side_cursor()
+
+    def _fetch_selected(self, cur):
+        return cur
 
     def _initialize(self, con):
         if self.initialized:
@@ -162,7 +290,8 @@ def schema_update(sql):
         sql = sql.replace(a, b)
 
     arrays_1D = ['numbers', 'initial_magmoms', 'initial_charges', 'masses',
-                 'tags', 'momenta', 'stress', 'dipole', 'magmoms', 'charges']
+                 'tags', 'momenta', 'stress', 'dipole', 'magmoms', 'charges',
+                 'energies']
 
     arrays_2D = ['positions', 'cell', 'forces']
 
@@ -178,6 +307,8 @@ def schema_update(sql):
     for column in arrays_2D:
         sql = sql.replace('{} BLOB,'.format(column),
                           '{} DOUBLE PRECISION[][],'.format(column))
+    # Last column:
+    sql = sql.replace('stresses BLOB)', 'stresses DOUBLE PRECISION[][])')
     for column in txt2jsonb:
         sql = sql.replace('{} TEXT,'.format(column),
                           '{} JSONB,'.format(column))
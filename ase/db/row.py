@@ -8,7 +8,7 @@ from ase.calculators.calculator import get_calculator, all_properties
 from ase.calculators.calculator import PropertyNotImplementedError
 from ase.calculators.singlepoint import SinglePointCalculator
 from ase.data import chemical_symbols, atomic_masses
-from ase.io.jsonio import decode
+from ase.io.jsonio import decode, decode_binary
 from ase.utils import formula_metal, basestring
 
 
@@ -141,7 +141,11 @@ class AtomsRow:
     def data(self):
         """Data dict."""
         if not isinstance(self._data, dict):
-            self._data = decode(self._data)  # lazy decoding
+            # lazy decoding
+            if isinstance(self._data, basestring):
+                self._data = decode(self._data)
+            else:
+                self._data = decode_binary(self._data)
         return FancyDict(self._data)
 
     @property
@@ -11,6 +11,10 @@ Versions:
 6) Use REAL for magmom and drop possibility for non-collinear spin
 7) Volume can be None
 8) Added name='metadata' row to "information" table
+9) Store data column in binary form with NumPy arrays as raw bytes
+10) Added energies and stresses columns for per-atom properties.  Files
+    from version 6 on get the new columns when the first row with
+    per-atom properties is written
 """
 
 from __future__ import absolute_import, print_function
@@ -32,7 +36,7 @@ from ase.utils import basestring
 if sys.version >= '3':
     buffer = memoryview
 
-VERSION = 8
+VERSION = 10
 
 init_statements = [
     """CREATE TABLE systems (
@@ -68,7 +72,9 @@ init_statements = [
     smax REAL,
     volume REAL,
     mass REAL,
-    charge REAL)""",
+    charge REAL,
+    energies BLOB,  -- per-atom properties
+    stresses BLOB)""",
 
     """CREATE TABLE species (
     Z INTEGER,
@@ -135,6 +141,31 @@ class SQLite3Database(Database, object):
     def decode(self, txt):
         return ase.io.jsonio.decode(txt)
 
+    def encode_data(self, data):
+        """Encode data dict for the data column.
+
+        From version 9, NumPy arrays are stored as raw bytes, which is
+        much faster to write and read than JSON text for large arrays.
+        Data from rows of other databases can also be JSON text, which
+        is stored as is, or bytes in the binary form, which are decoded
+        first if this database can not store them."""
+        if ase.io.jsonio.is_binary(data):
+            if self.version >= 9:
+                return buffer(data)
+            data = ase.io.jsonio.decode_binary(data)
+        elif isinstance(data, basestring):
+            return data
+        if self.version < 9:
+            return self.encode(data)
+        return buffer(ase.io.jsonio.encode_binary(data))
+
+    def decode_data(self, value):
+        """Decode value from the data column.
+
+        Decoding is left to the AtomsRow object, which does it the first
+        time row.data is accessed."""
+        return value
+
     def blob(self, array):
         """Convert array to blob/buffer object."""
 
@@ -167,6 +198,11 @@ class SQLite3Database(Database, object):
     def _connect(self):
         return sqlite3.connect(self.filename, timeout=600)
 
+    def _add_per_atom_columns(self, cur):
+        """Upgrade to version 10."""
+        for name in ['energies', 'stresses']:
+            cur.execute('ALTER TABLE systems ADD COLUMN {} BLOB'.format(name))
+
     def __enter__(self):
         assert self.connection is None
         self.connection = self._connect()
@@ -177,6 +213,8 @@ class SQLite3Database(Database, object):
             self.connection.commit()
         else:
             self.connection.rollback()
+            # An upgrade of the schema may have been rolled back:
+            self.initialized = False
         self.connection.close()
         self.connection = None
 
@@ -286,8 +324,7 @@ class SQLite3Database(Database, object):
 
         if not data:
             data = row._data
-        if not isinstance(data, basestring):
-            data = encode(data)
+        data = self.encode_data(data)
 
         values += (row.get('energy'),
                    row.get('free_energy'),
@@ -306,13 +343,22 @@ class SQLite3Database(Database, object):
                    float(row.mass),
                    float(row.charge))
 
+        if (self.version < 10 and self.version >= 6 and
+            ('energies' in row or 'stresses' in row)):
+            self._add_per_atom_columns(cur)
+            cur.execute("UPDATE information SET value=? WHERE name='version'",
+                        [str(VERSION)])
+            self.version = VERSION
+
+        if self.version >= 10:
+            values += (blob(row.get('energies')),
+                       blob(row.get('stresses')))
+
         if id is None:
-            q = self.default + ', ' + ', '.join('?' * len(values))
-            cur.execute('INSERT INTO systems VALUES ({})'.format(q),
-                        values)
-            id = self.get_last_id(cur)
+            id = self._insert_system(cur, values)
         else:
-            q = ', '.join(name + '=?' for name in self.columnnames[1:])
+            q = ', '.join(name + '=?'
+                          for name in self.columnnames[1:len(values) + 1])
             cur.execute('UPDATE systems SET {} WHERE id=?'.format(q),
                         values + (id,))
 
@@ -345,6 +391,14 @@ class SQLite3Database(Database, object):
 
         return id
 
+    def _insert_system(self, cur, values):
+        """Insert row in systems table and return its id."""
+        names = ', '.join(self.columnnames[:len(values) + 1])
+        q = self.default + ', ' + ', '.join('?' * len(values))
+        cur.execute('INSERT INTO systems ({}) VALUES ({})'.format(names, q),
+                    values)
+        return self.get_last_id(cur)
+
     def get_last_id(self, cur):
         cur.execute('SELECT seq FROM sqlite_sequence WHERE name="systems"')
         result = cur.fetchone()
@@ -365,6 +419,7 @@ class SQLite3Database(Database, object):
         else:
             c.execute('SELECT * FROM systems WHERE id=?', (id,))
         values = c.fetchone()
+        con.close()
 
         values = self._old2new(values)
         return self._convert_tuple_to_row(values)
@@ -420,7 +475,12 @@ class SQLite3Database(Database, object):
         if values[25] != '{}':
             dct['key_value_pairs'] = decode(values[25])
         if len(values) >= 27 and values[26] != 'null':
-            dct['data'] = decode(values[26])
+            dct['data'] = self.decode_data(values[26])
+        if len(values) >= 35:
+            if values[33] is not None:
+                dct['energies'] = deblob(values[33])
+            if values[34] is not None:
+                dct['stresses'] = deblob(values[34], shape=(-1, 6))
 
         return AtomsRow(dct)
 
@@ -542,7 +602,7 @@ class SQLite3Database(Database, object):
         con = self._connect()
         self._initialize(con)
 
-        values = np.array([None for i in range(27)])
+        values = np.array([None for i in range(35)])
         values[25] = '{}'
         values[26] = 'null'
 
@@ -553,6 +613,10 @@ class SQLite3Database(Database, object):
                            if self.columnnames[c] in columns]
         if include_data:
             columnindex.append(26)
+        if self.version >= 10:
+            columnindex += [c for c in [33, 34]
+                            if columns == 'all' or
+                            self.columnnames[c] in columns]
 
         if sort:
             if sort[0] == '-':
@@ -600,29 +664,43 @@ class SQLite3Database(Database, object):
         if verbosity == 2:
             print(sql, args)
 
-        cur = con.cursor()
-        cur.execute(sql, args)
-        if explain:
-            for row in cur.fetchall():
-                yield {'explain': row}
-        else:
+        cur = self._select_cursor(con)
+        try:
+            cur.execute(sql, args)
+            if explain:
+                for row in cur.fetchall():
+                    yield {'explain': row}
+                return
             n = 0
-            for shortvalues in cur.fetchall():
+            for shortvalues in self._fetch_selected(cur):
                 values[columnindex] = shortvalues
                 yield self._convert_tuple_to_row(tuple(values))
                 n += 1
+        finally:
+            con.close()
 
-            if sort and sort_table != 'systems':
-                # Yield rows without sort key last:
-                if limit is not None:
-                    if n == limit:
-                        return
-                    limit -= n
-                for row in self._select(keys + ['-' + sort], cmps,
-                                        limit=limit, offset=offset,
-                                        include_data=include_data,
-                                        columns=columns):
-                    yield row
+        if sort and sort_table != 'systems':
+            # Yield rows without sort key last:
+            if limit is not None:
+                if n == limit:
+                    return
+                limit -= n
+            for row in self._select(keys + ['-' + sort], cmps,
+                                    limit=limit, offset=offset,
+                                    include_data=include_data,
+                                    columns=columns):
+                yield row
+
+    def _select_cursor(self, con):
+        """Cursor for reading the rows of a selection."""
+        return con.cursor()
+
+    def _fetch_selected(self, cur):
+        """Rows of a selection.
+
+        All rows are fetched before the first one is used, so that the
+        caller can write to the database while looping over them."""
+        return cur.fetchall()
 
     @parallel_function
     def count(self, selection=None, **kwargs):
@@ -632,7 +710,9 @@ class SQLite3Database(Database, object):
         self._initialize(con)
         cur = con.cursor()
         cur.execute(sql, args)
-        return cur.fetchone()[0]
+        n = cur.fetchone()[0]
+        con.close()
+        return n
 
     def analyse(self):
         con = self._connect()
@@ -658,7 +738,9 @@ class SQLite3Database(Database, object):
     @property
     def metadata(self):
         if self._metadata is None:
-            self._initialize(self._connect())
+            con = self._connect()
+            self._initialize(con)
+            con.close()
         return self._metadata.copy()
 
     @metadata.setter
@@ -678,6 +760,7 @@ class SQLite3Database(Database, object):
             cur.execute('INSERT INTO information VALUES (?, ?)',
                         ('metadata', md))
         con.commit()
+        con.close()
 
 
 if __name__ == '__main__':
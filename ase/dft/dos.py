@@ -115,28 +115,29 @@ def ltidos(cell, eigs, energies, weights=None):
     dos = np.zeros_like(energies)
     integrate = functools.partial(_lti, energies, dos)
 
+    # The k-points of this process and the size of the chunks they are
+    # done in (each k-point gives one tetrahedron per band):
+    mykpts = np.arange(I * J * K)[world.rank::world.size]
+    chunksize = max(1, 10000 // eigs.shape[3])
+
     for s in dt.simplices:
         kpts = dt.points[s]
         try:
             M = np.linalg.inv(kpts[1:, :] - kpts[0, :])
         except np.linalg.linalg.LinAlgError:
             continue
-        n = -1
-        for i in range(I):
-            for j in range(J):
-                for k in range(K):
-                    n += 1
-                    if n % world.size != world.rank:
-                        continue
-                    E = np.array([eigs[(i + a) % I, (j + b) % J, (k + c) % K]
-                                  for a, b, c in indices[s]])
-                    if weights is None:
-                        integrate(kpts, M, E)
-                    else:
-                        w = np.array([weights[(i + a) % I, (j + b) % J,
-                                              (k + c) % K]
-                                      for a, b, c in indices[s]])
-                        integrate(kpts, M, E, w)
+        for q in range(0, len(mykpts), chunksize):
+            i, j, k = np.unravel_index(mykpts[q:q + chunksize], size)
+            corners = [((i + a) % I, (j + b) % J, (k + c) % K)
+                       for a, b, c in indices[s]]
+            # Eigenvalues (and weights) at the four corners of all the
+            # tetrahedra.  Shape: (4, nkpts * nbands)
+            E = np.array([eigs[c].ravel() for c in corners])
+            if weights is None:
+                integrate(kpts, M, E)
+            else:
+                w = np.array([weights[c].ravel() for c in corners])
+                integrate(kpts, M, E, w)
 
     world.sum(dos)
 
@@ -144,71 +145,91 @@ def ltidos(cell, eigs, energies, weights=None):
 
 
 def _lti(energies, dos, kpts, M, E, W=None):
+    """Add contribution from tetrahedra to dos.
+
+    All tetrahedra have the corners kpts, but each column of E (and W)
+    holds its own four eigenvalues (and weights).  The energies where a
+    tetrahedron contributes are found for all of them at once and the
+    contributions are added with np.bincount()."""
     zero = energies[0]
     de = energies[1] - zero
-    for z, e in enumerate(E.T):
-        dedk = (np.dot(M, e[1:] - e[0])**2).sum()**0.5
-        i = e.argsort()
-        k = kpts[i, :, np.newaxis]
-        e0, e1, e2, e3 = ee = e[i]
-        for j in range(3):
-            m = max(0, int((ee[j] - zero) / de) + 1)
-            n = min(len(energies) - 1, int((ee[j + 1] - zero) / de) + 1)
-            if n > m:
-                v = energies[m:n]
-                if j == 0:
-                    x10 = (e1 - v) / (e1 - e0)
-                    x01 = (v - e0) / (e1 - e0)
-                    x20 = (e2 - v) / (e2 - e0)
-                    x02 = (v - e0) / (e2 - e0)
-                    x30 = (e3 - v) / (e3 - e0)
-                    x03 = (v - e0) / (e3 - e0)
-                    k1 = k[0] * x10 + k[1] * x01
-                    k2 = k[0] * x20 + k[2] * x02 - k1
-                    k3 = k[0] * x30 + k[3] * x03 - k1
-                    if W is None:
-                        w = 0.5 / dedk
-                    else:
-                        w = np.dot(W[i, z],
-                                   [x10 + x20 + x30, x01, x02, x03])
-                        w /= 6 * dedk
-                    dos[m:n] += (np.cross(k2, k3, 0, 0)**2).sum(1)**0.5 * w
-                elif j == 1:
-                    x21 = (e2 - v) / (e2 - e1)
-                    x12 = (v - e1) / (e2 - e1)
-                    x20 = (e2 - v) / (e2 - e0)
-                    x02 = (v - e0) / (e2 - e0)
-                    x30 = (e3 - v) / (e3 - e0)
-                    x03 = (v - e0) / (e3 - e0)
-                    x31 = (e3 - v) / (e3 - e1)
-                    x13 = (v - e1) / (e3 - e1)
-                    k1 = k[1] * x21 + k[2] * x12
-                    k2 = k[0] * x20 + k[2] * x02 - k1
-                    k3 = k[0] * x30 + k[3] * x03 - k1
-                    k4 = k[1] * x31 + k[3] * x13 - k1
-                    if W is None:
-                        w = 0.5 / dedk
-                    else:
-                        w = np.dot(W[i, z],
-                                   [x20 + x30, x21 + x31,
-                                    x12 + x02, x03 + x13])
-                        w /= 8 * dedk
-                    dos[m:n] += (np.cross(k2, k3, 0, 0)**2).sum(1)**0.5 * w
-                    dos[m:n] += (np.cross(k4, k3, 0, 0)**2).sum(1)**0.5 * w
-                elif j == 2:
-                    x30 = (e3 - v) / (e3 - e0)
-                    x03 = (v - e0) / (e3 - e0)
-                    x31 = (e3 - v) / (e3 - e1)
-                    x13 = (v - e1) / (e3 - e1)
-                    x32 = (e3 - v) / (e3 - e2)
-                    x23 = (v - e2) / (e3 - e2)
-                    k1 = k[0] * x30 + k[3] * x03
-                    k2 = k[1] * x31 + k[3] * x13 - k1
-                    k3 = k[2] * x32 + k[3] * x23 - k1
-                    if W is None:
-                        w = 0.5 / dedk
-                    else:
-                        w = np.dot(W[i, z],
-                                   [x30, x31, x32, x03 + x13 + x23])
-                        w /= 6 * dedk
-                    dos[m:n] += (np.cross(k2, k3, 0, 0)**2).sum(1)**0.5 * w
+    nt = E.shape[1]
+    t = np.arange(nt)
+    dedk = (np.dot(M, E[1:] - E[0])**2).sum(0)**0.5
+    i = E.argsort(0)
+    ee = E[i, t]
+    k = kpts[i]
+    if W is not None:
+        W = W[i, t]
+    # Index of first energy above each corner (int() rounds towards zero):
+    first = np.trunc((ee - zero) / de).astype(int) + 1
+    for j in range(3):
+        m = np.maximum(first[j], 0)
+        n = np.minimum(first[j + 1], len(energies) - 1)
+        count = np.maximum(n - m, 0)
+        if not count.any():
+            continue
+        # One entry per (tetrahedron, energy) pair:
+        p = np.repeat(t, count)
+        ie = np.arange(len(p)) - np.repeat(count.cumsum() - count, count)
+        ie += m[p]
+        v = energies[ie]
+        e0, e1, e2, e3 = ee[:, p]
+        k0, k1, k2, k3 = k[:, p]
+        if j == 0:
+            x10 = (e1 - v) / (e1 - e0)
+            x01 = (v - e0) / (e1 - e0)
+            x20 = (e2 - v) / (e2 - e0)
+            x02 = (v - e0) / (e2 - e0)
+            x30 = (e3 - v) / (e3 - e0)
+            x03 = (v - e0) / (e3 - e0)
+            q1 = k0 * x10[:, None] + k1 * x01[:, None]
+            q2 = k0 * x20[:, None] + k2 * x02[:, None] - q1
+            q3 = k0 * x30[:, None] + k3 * x03[:, None] - q1
+            if W is None:
+                w = 0.5 / dedk[p]
+            else:
+                w0, w1, w2, w3 = W[:, p]
+                w = w0 * (x10 + x20 + x30) + w1 * x01 + w2 * x02 + w3 * x03
+                w /= 6 * dedk[p]
+            a = (np.cross(q2, q3)**2).sum(1)**0.5 * w
+        elif j == 1:
+            x21 = (e2 - v) / (e2 - e1)
+            x12 = (v - e1) / (e2 - e1)
+            x20 = (e2 - v) / (e2 - e0)
+            x02 = (v - e0) / (e2 - e0)
+            x30 = (e3 - v) / (e3 - e0)
+            x03 = (v - e0) / (e3 - e0)
+            x31 = (e3 - v) / (e3 - e1)
+            x13 = (v - e1) / (e3 - e1)
+            q1 = k1 * x21[:, None] + k2 * x12[:, None]
+            q2 = k0 * x20[:, None] + k2 * x02[:, None] - q1
+            q3 = k0 * x30[:, None] + k3 * x03[:, None] - q1
+            q4 = k1 * x31[:, None] + k3 * x13[:, None] - q1
+            if W is None:
+                w = 0.5 / dedk[p]
+            else:
+                w0, w1, w2, w3 = W[:, p]
+                w = (w0 * (x20 + x30) + w1 * (x21 + x31) +
+                     w2 * (x12 + x02) + w3 * (x03 + x13))
+                w /= 8 * dedk[p]
+            a = (np.cross(q2, q3)**2).sum(1)**0.5 * w
+            a += (np.cross(q4, q3)**2).sum(1)**0.5 * w
+        else:
+            x30 = (e3 - v) / (e3 - e0)
+            x03 = (v - e0) / (e3 - e0)
+            x31 = (e3 - v) / (e3 - e1)
+            x13 = (v - e1) / (e3 - e1)
+            x32 = (e3 - v) / (e3 - e2)
+            x23 = (v - e2) / (e3 - e2)
+            q1 = k0 * x30[:, None] + k3 * x03[:, None]
+            q2 = k1 * x31[:, None] + k3 * x13[:, None] - q1
+            q3 = k2 * x32[:, None] + k3 * x23[:, None] - q1
+            if W is None:
+                w = 0.5 / dedk[p]
+            else:
+                w0, w1, w2, w3 = W[:, p]
+                w = w0 * x30 + w1 * x31 + w2 * x32 + w3 * (x03 + x13 + x23)
+                w /= 6 * dedk[p]
+            a = (np.cross(q2, q3)**2).sum(1)**0.5 * w
+        dos += np.bincount(ie, a, len(dos))
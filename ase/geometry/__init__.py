@@ -6,8 +6,17 @@ from ase.geometry.geometry import (wrap_positions,
                                    get_duplicate_atoms,
                                    get_angles, get_distances)
 from ase.geometry.distance import distance
-from ase.geometry.dimensionality.interval_analysis \
-    import analyze_kintervals as analyze_dimensionality
+
+
+def analyze_dimensionality(atoms, method='RDA'):
+    """Performs a k-interval analysis of a periodic solid.
+
+    See analyze_kintervals() in ase.geometry.dimensionality.interval_analysis
+    for details."""
+    # Imported here so that "import ase" does not pull in the neighbor list:
+    from ase.geometry.dimensionality.interval_analysis \
+        import analyze_kintervals
+    return analyze_kintervals(atoms, method)
 
 
 __all__ = ['wrap_positions', 'complete_cell',
@@ -1,4 +1,8 @@
 from __future__ import print_function
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
 from math import sqrt
 
 import numpy as np
@@ -14,6 +18,150 @@ from ase.gui.i18n import _
 import warnings
 
 
+def fingerprint(atoms):
+    """Hash of the things in an Atoms object that can be edited."""
+    h = hashlib.sha1()
+    for name, array in sorted(atoms.arrays.items()):
+        h.update(name.encode())
+        h.update(np.ascontiguousarray(array).tobytes())
+    h.update(np.asarray(atoms.cell).tobytes())
+    h.update(atoms.pbc.tobytes())
+    h.update(repr((atoms.constraints, id(atoms.calc))).encode())
+    return h.digest()
+
+
+class LazyFrames:
+    """List of Atoms objects that are read from files on demand.
+
+    The items are Atoms objects or (read, n) tuples, where read(n) returns
+    the Atoms object.  The last cache_size frames used are kept in memory
+    and the nprefetch frames after and the frame before the one asked for
+    are read in a background thread.  Frames that have been modified are
+    never forgotten.  The files are objects with a close() method that
+    will be called by close()."""
+
+    def __init__(self, items, files=(), cache_size=100, nprefetch=2):
+        self.items = items
+        self.files = list(files)
+        self.cache_size = cache_size
+        self.nprefetch = nprefetch
+        self.cache = OrderedDict()  # index -> (Atoms object, fingerprint)
+        self.lock = threading.RLock()  # readers are not thread safe
+        self.queue = None
+        self.thread = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        i = range(len(self))[index]
+        atoms = self.get(i)
+        self.prefetch(i)
+        return atoms
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def get(self, i):
+        item = self.items[i]
+        if isinstance(item, Atoms):
+            return item
+        with self.lock:
+            if i in self.cache:
+                self.cache.move_to_end(i)
+                return self.cache[i][0]
+            read, n = item
+            atoms = read(n)
+            self.cache[i] = (atoms, fingerprint(atoms))
+            while len(self.cache) > self.cache_size:
+                j, (old, fp) = self.cache.popitem(last=False)
+                if fingerprint(old) != fp:
+                    self.items[j] = old
+        return atoms
+
+    def prefetch(self, i):
+        if self.nprefetch == 0:
+            return
+        if self.thread is None:
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self._prefetch)
+            self.thread.daemon = True
+            self.thread.start()
+        for j in list(range(i + 1, i + 1 + self.nprefetch)) + [i - 1]:
+            if (0 <= j < len(self) and j not in self.cache and
+                not isinstance(self.items[j], Atoms)):
+                self.queue.put(j)
+
+    def _prefetch(self):
+        while True:
+            i = self.queue.get()
+            try:
+                self.get(i)
+            except Exception:
+                pass  # error will show up when the frame is really needed
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        with self.lock:
+            for fd in self.files:
+                fd.close()
+            self.files = []
+
+
+def open_frames(filename, index, format=None):
+    """Prepare reading of frames on demand.
+
+    Returns list of (read, n) tuples for the LazyFrames class and the
+    object that must be closed when done (or None) or None if frames can't
+    be read on demand from this file."""
+    from ase.io.formats import filetype
+    if not isinstance(index, slice):
+        return None
+    if format is None:
+        try:
+            format = filetype(filename)
+        except Exception:
+            return None
+
+    if format == 'traj':
+        from ase.io.trajectory import TrajectoryReader
+        try:
+            reader = TrajectoryReader(filename)
+        except IOError:
+            return None  # old pickle-trajectory
+        read = reader.__getitem__
+        nframes = len(reader)
+        fd = reader
+    elif format in ['xyz', 'extxyz']:
+        from ase.io.extxyz import get_xyz_index
+        frames = get_xyz_index(filename, sidecar=False)
+        fd = open(filename)
+
+        def read(n):
+            return frames.read_frame(fd, n)
+
+        nframes = len(frames)
+    elif format in ['db', 'jsonl', 'postgresql']:
+        from ase.db import connect
+        db = connect(filename)
+        ids = [row.id for row in db.select(columns=['id'],
+                                           include_data=False)]
+
+        def read(n):
+            return db.get_atoms(ids[n])
+
+        nframes = len(ids)
+        fd = None
+    else:
+        return None
+
+    return [(read, n) for n in range(nframes)[index]], fd
+
+
 class Images:
     def __init__(self, images=None):
         self.covalent_radii = covalent_radii.copy()
@@ -27,10 +175,29 @@ class Images:
         return len(self._images)
 
     def __getitem__(self, index):
-        return self._images[index]
+        images = self._images[index]
+        if isinstance(index, slice):
+            for atoms in images:
+                self.check_natoms(atoms)
+        else:
+            self.check_natoms(images)
+        return images
 
     def __iter__(self):
-        return iter(self._images)
+        for atoms in self._images:
+            self.check_natoms(atoms)
+            yield atoms
+
+    def check_natoms(self, atoms):
+        """Make room for more atoms.
+
+        Frames read on demand can have more atoms than the ones that were
+        there when we were initialized."""
+        n = len(atoms) - self.maxnatoms
+        if n > 0:
+            self.maxnatoms += n
+            self.selected = np.append(self.selected, np.zeros(n, bool))
+            self.visible = np.append(self.visible, np.ones(n, bool))
 
     # XXXXXXX hack
     # compatibility hacks while allowing variable number of atoms
@@ -101,28 +268,38 @@ class Images:
 
         warning = False
 
-        self._images = []
+        old = getattr(self, '_images', None)
+        if isinstance(old, LazyFrames) and old is not images:
+            old.close()
 
-        # Whether length or chemical composition changes:
-        self.have_varying_species = False
-        for i, atoms in enumerate(images):
+        if isinstance(images, LazyFrames):
+            # Only the first frame is checked.  The rest will be read
+            # when needed:
+            self._images = images
+            images = images[:1]
+        else:
             # copy atoms or not?  Not copying allows back-editing,
             # but copying actually forgets things like the attached
             # calculator (might have forces/energies
-            self._images.append(atoms)
-            self.have_varying_species |= np.array_equal(self[0].numbers,
+            self._images = list(images)
+
+        # Whether length or chemical composition changes (for frames read
+        # on demand only the first one is checked here):
+        self.have_varying_species = False
+        for i, atoms in enumerate(images):
+            self.have_varying_species |= np.array_equal(images[0].numbers,
                                                         atoms.numbers)
             if hasattr(self, 'Q'):
                 assert False  # XXX askhl fix quaternions
                 self.Q[i] = atoms.get_quaternions()
-            if (atoms.pbc != self[0].pbc).any():
+            if (atoms.pbc != images[0].pbc).any():
                 warning = True
 
         if warning:
             import warnings
             warnings.warn('Not all images have the same boundary conditions!')
 
-        self.maxnatoms = max(len(atoms) for atoms in self)
+        self.maxnatoms = max(len(atoms) for atoms in images)
         self.selected = np.zeros(self.maxnatoms, bool)
         self.selected_ordered = []
         self.visible = np.ones(self.maxnatoms, bool)
@@ -141,6 +318,8 @@ class Images:
 
         images = []
         names = []
+        files = []
+        lazy = False
         for filename in filenames:
             from ase.io.formats import parse_filename
 
@@ -150,9 +329,18 @@ class Images:
             else:
                 actual_filename, index = parse_filename(filename,
                                                         default_index)
-            imgs = read(filename, index, filetype)
-            if hasattr(imgs, 'iterimages'):
-                imgs = list(imgs.iterimages())
+
+            # Read frames on demand if possible:
+            frames = open_frames(actual_filename, index, filetype)
+            if frames is None:
+                imgs = read(filename, index, filetype)
+                if hasattr(imgs, 'iterimages'):
+                    imgs = list(imgs.iterimages())
+            else:
+                imgs, fd = frames
+                if fd is not None:
+                    files.append(fd)
+                lazy = True
 
             images.extend(imgs)
 
@@ -169,7 +357,8 @@ class Images:
                 else:
                     names.append('{}@{}'.format(actual_filename, start))
 
-
+        if lazy:
+            images = LazyFrames(images, files)
         self.initialize(images, names)
 
     def repeat_results(self, atoms, repeat=None, oldprod=None):
@@ -329,34 +518,51 @@ class Images:
                 angle = 2 * np.pi - angle
             return angle * 180.0 / np.pi
 
-        # get number of mobile atoms for temperature calculation
-        E = np.array([self.get_energy(atoms) for atoms in self])
-
         s = 0.0
 
         # Namespace for eval:
-        ns = {'E': E,
-              'd': d, 'a': a, 'dih': dih}
+        ns = {'d': d, 'a': a, 'dih': dih}
+
+        # Frames may be read from a file on demand, so we make one pass
+        # through them and look at each frame only once.  Only expressions
+        # that use the array E with the energies of all images need an
+        # extra pass:
+        E = None
+        if 'E' in code.co_names:
+            E = np.array([self.get_energy(atoms) for atoms in self])
+            ns['E'] = E
 
         data = []
-        for i in range(nimages):
+        R0 = None
+        Z0 = None
+        for i, atoms in enumerate(self):
+            R = atoms.get_positions()
+            Z = atoms.numbers
+            if R0 is not None and np.array_equal(Z, Z0):
+                s += sqrt(((R - R0)**2).sum())
+            R0 = R
+            Z0 = Z
             ns['i'] = i
             ns['s'] = s
-            ns['R'] = R = self[i].get_positions()
-            ns['V'] = self[i].get_velocities()
-            F = self.get_forces(self[i])
+            ns['R'] = R
+            ns['V'] = atoms.get_velocities()
+            F = self.get_forces(atoms)
             if F is not None:
                 ns['F'] = F
-            ns['A'] = self[i].get_cell()
-            ns['M'] = self[i].get_masses()
+            ns['A'] = atoms.get_cell()
+            ns['M'] = atoms.get_masses()
             # XXX askhl verify:
-            dynamic = self.get_dynamic(self[i])
+            dynamic = self.get_dynamic(atoms)
             if F is not None:
                 ns['f'] = f = ((F * dynamic[:, None])**2).sum(1)**.5
                 ns['fmax'] = max(f)
                 ns['fave'] = f.mean()
-            ns['epot'] = epot = E[i]
-            ns['ekin'] = ekin = self[i].get_kinetic_energy()
+            if E is None:
+                epot = self.get_energy(atoms)
+            else:
+                epot = E[i]
+            ns['epot'] = epot
+            ns['ekin'] = ekin = atoms.get_kinetic_energy()
             ns['e'] = epot + ekin
             ndynamic = dynamic.sum()
             if ndynamic > 0:
@@ -366,8 +572,6 @@ class Images:
                 nvariables = len(data)
                 xy = np.empty((nvariables, nimages))
             xy[:, i] = data
-            if i + 1 < nimages and not self.have_varying_species:
-                s += sqrt(((self[i + 1].positions - R)**2).sum())
         return xy
 
     def write(self, filename, rotations='', show_unit_cell=False, bbox=None,
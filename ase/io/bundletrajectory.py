@@ -23,7 +23,9 @@ from ase.parallel import paropen
 from ase.calculators.singlepoint import (SinglePointCalculator,
                                          PropertyNotImplementedError)
 from ase.io.ulm import open as ulmopen
+from ase.utils import BackgroundWriter
 import numpy as np
+import copy
 import os
 import sys
 import shutil
@@ -79,11 +81,19 @@ class BundleTrajectory:
 
     singleprecision=False:
         Store floating point data in single precision (ulm backend only).
+
+    asynchronous=False:
+        Write the files in a background thread.  The write() method copies
+        the data and returns while the files are being written, so that
+        writing overlaps with the calculation of the next frame.  Frames
+        are written in order.  An error in the background thread is
+        raised by the next call to write() or close().  Only honored when
+        writing.
     """
     slavelog = True  # Log from all nodes
 
     def __init__(self, filename, mode='r', atoms=None, backup=True,
-                 backend='ulm', singleprecision=False):
+                 backend='ulm', singleprecision=False, asynchronous=False):
         self.state = 'constructing'
         self.filename = filename
         self.pre_observers = []  # callback functions before write is performed
@@ -91,6 +101,7 @@ class BundleTrajectory:
         self.master = ase.parallel.rank == 0
         self.extra_data = []
         self.singleprecision = singleprecision
+        self.writer = None
         self._set_defaults()
         if mode == 'r':
             if atoms is not None:
@@ -102,6 +113,8 @@ class BundleTrajectory:
             self._open_append(atoms)
         else:
             raise ValueError('Unknown mode: ' + str(mode))
+        if asynchronous and mode != 'r':
+            self.writer = BackgroundWriter()
 
     def _set_defaults(self):
         "Set default values for internal parameters."
@@ -154,8 +167,9 @@ class BundleTrajectory:
     def _write_atoms(self, atoms):
         # OK, it is a real atoms object.  Write it.
         self._call_observers(self.pre_observers)
-        self.log('Beginning to write frame ' + str(self.nframes))
-        framedir = self._make_framedir(self.nframes)
+        self._io(self.log, 'Beginning to write frame ' + str(self.nframes))
+        framedir = os.path.join(self.filename, 'F' + str(self.nframes))
+        self._io(self._make_framedir, self.nframes)
 
         # Check which data should be written the first time:
         # Modify datatypes so any element of type 'once' becomes true
@@ -182,32 +196,36 @@ class BundleTrajectory:
                 smalldata['stress'] = atoms.get_stress()
             except PropertyNotImplementedError:
                 self.datatypes['stress'] = False
-        self.backend.write_small(framedir, smalldata)
+        if self.writer is not None:
+            smalldata = copy.deepcopy(smalldata)
+        self._io(self.backend.write_small, framedir, smalldata)
+
+        def write(name, data):
+            self._io(self.backend.write, framedir, name, data)
 
         # Write the large arrays.
         if datatypes.get('positions'):
-            self.backend.write(framedir, 'positions', atoms.get_positions())
+            write('positions', atoms.get_positions())
         if datatypes.get('numbers'):
-            self.backend.write(framedir, 'numbers', atoms.get_atomic_numbers())
+            write('numbers', atoms.get_atomic_numbers())
         if datatypes.get('tags'):
             if atoms.has('tags'):
-                self.backend.write(framedir, 'tags', atoms.get_tags())
+                write('tags', atoms.get_tags())
             else:
                 self.datatypes['tags'] = False
         if datatypes.get('masses'):
             if atoms.has('masses'):
-                self.backend.write(framedir, 'masses', atoms.get_masses())
+                write('masses', atoms.get_masses())
             else:
                 self.datatypes['masses'] = False
         if datatypes.get('momenta'):
             if atoms.has('momenta'):
-                self.backend.write(framedir, 'momenta', atoms.get_momenta())
+                write('momenta', atoms.get_momenta())
             else:
                 self.datatypes['momenta'] = False
         if datatypes.get('magmoms'):
             if atoms.has('initial_magmoms'):
-                self.backend.write(framedir, 'magmoms',
-                                   atoms.get_initial_magnetic_moments())
+                write('magmoms', atoms.get_initial_magnetic_moments())
             else:
                 self.datatypes['magmoms'] = False
         if datatypes.get('forces'):
@@ -216,7 +234,7 @@ class BundleTrajectory:
             except (RuntimeError, PropertyNotImplementedError):
                 self.datatypes['forces'] = False
             else:
-                self.backend.write(framedir, 'forces', x)
+                write('forces', x)
                 del x
         if datatypes.get('energies'):
             try:
@@ -224,16 +242,18 @@ class BundleTrajectory:
             except (RuntimeError, PropertyNotImplementedError):
                 self.datatypes['energies'] = False
             else:
-                self.backend.write(framedir, 'energies', x)
+                write('energies', x)
                 del x
         # Write any extra data
         for (label, source, once) in self.extra_data:
             if self.nframes == 0 or not once:
                 if source is not None:
                     x = source()
+                    if self.writer is not None:
+                        x = np.array(x)
                 else:
                     x = atoms.get_array(label)
-                self.backend.write(framedir, label, x)
+                write(label, x)
                 del x
                 if once:
                     self.datatypes[label] = 'once'
@@ -241,13 +261,22 @@ class BundleTrajectory:
                     self.datatypes[label] = True
         # Finally, write metadata if it is the first frame
         if self.nframes == 0:
-            metadata = {'datatypes': self.datatypes}
-            self._write_metadata(metadata)
-        self._write_nframes(self.nframes + 1)
+            metadata = {'datatypes': self.datatypes.copy()}
+            self._io(self._write_metadata, metadata)
+        self._io(self._write_nframes, self.nframes + 1)
         self._call_observers(self.post_observers)
-        self.log('Done writing frame ' + str(self.nframes))
+        self._io(self.log, 'Done writing frame ' + str(self.nframes))
         self.nframes += 1
 
+    def _io(self, function, *args):
+        """Call function now or in the background (asynchronous mode).
+
+        Arrays in args must be copies that nobody else will modify."""
+        if self.writer is None:
+            function(*args)
+        else:
+            self.writer.put(function, *args)
+
     def select_data(self, data, value):
         """Selects if a given data type should be written.
 
@@ -289,6 +318,10 @@ class BundleTrajectory:
 
     def close(self):
         "Closes the trajectory."
+        if self.writer is not None:
+            writer = self.writer
+            self.writer = None
+            writer.close()
         self.state = 'closed'
         lf = getattr(self, 'logfile', None)
         self.backend.close(log=lf)
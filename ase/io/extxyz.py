@@ -13,21 +13,25 @@ Contributed by James Kermode <james.kermode@gmail.com>
 
 from __future__ import print_function
 
+from collections import deque
 from itertools import islice
+import os
 import re
 import warnings
 
 import numpy as np
 
 from ase.atoms import Atoms
+from ase.symbols import symbols2numbers
 from ase.calculators.calculator import all_properties, Calculator
 from ase.calculators.singlepoint import SinglePointCalculator
 from ase.spacegroup.spacegroup import Spacegroup
 from ase.parallel import paropen
+from ase.io.formats import is_plain_file
 from ase.utils import basestring
 from ase.constraints import FixAtoms, FixCartesian
 
-__all__ = ['read_xyz', 'write_xyz', 'iread_xyz']
+__all__ = ['read_xyz', 'write_xyz', 'iread_xyz', 'XYZIndex', 'get_xyz_index']
 
 PROPERTY_NAME_MAP = {'positions': 'pos',
                      'numbers': 'Z',
@@ -313,6 +317,27 @@ def parse_properties(prop_str):
     return properties, properties_list, dtype, converters
 
 
+def _parse_species_pos(block):
+    """Parse lines with only a species and three coordinates.
+
+    This is the default and by far the most common layout
+    (Properties=species:S:1:pos:R:3), which is parsed in one go instead
+    of line by line.  Returns None if the lines have extra columns."""
+    tokens = ''.join(block).split()
+    if len(tokens) != 4 * len(block):
+        return None
+    try:
+        positions = np.array([tokens[1::4], tokens[2::4], tokens[3::4]],
+                             float).T
+    except ValueError:
+        return None
+    # Convert each distinct species only once:
+    species, inverse = np.unique(tokens[0::4], return_inverse=True)
+    numbers = symbols2numbers([s.capitalize() for s in species])
+    return {'numbers': np.array(numbers, int)[inverse],
+            'positions': positions}
+
+
 def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0):
     # comment line
     line = next(lines)
@@ -348,22 +373,37 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0
     properties, names, dtype, convs = parse_properties(info['Properties'])
     del info['Properties']
 
-    data = []
-    for ln in range(natoms):
+    block = list(islice(lines, natoms))
+    if len(block) < natoms:
+        raise XYZError('ase.io.extxyz: Frame has {} atoms, expected {}'
+                       .format(len(block), natoms))
+
+    arrays = None
+    if names == ['species', 'pos']:
+        arrays = _parse_species_pos(block)
+
+    if arrays is None:
+        data = []
+        for line in block:
+            vals = line.split()
+            row = tuple([conv(val) for conv, val in zip(convs, vals)])
+            data.append(row)
+
         try:
-            line = next(lines)
-        except StopIteration:
-            raise XYZError('ase.io.extxyz: Frame has {} atoms, expected {}'
-                           .format(len(data), natoms))
-        vals = line.split()
-        row = tuple([conv(val) for conv, val in zip(convs, vals)])
-        data.append(row)
+            data = np.array(data, dtype)
+        except TypeError:
+            raise XYZError('Badly formatted data '
+                           'or end of file reached before end of frame')
 
-    try:
-        data = np.array(data, dtype)
-    except TypeError:
-        raise XYZError('Badly formatted data '
-                       'or end of file reached before end of frame')
+        arrays = {}
+        for name in names:
+            ase_name, cols = properties[name]
+            if cols == 1:
+                value = data[name]
+            else:
+                value = np.vstack([data[name + str(c)]
+                                  for c in range(cols)]).T
+            arrays[ase_name] = value
 
     #Read VEC entries if present
     if nvec > 0:
@@ -391,16 +431,6 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0
             raise XYZError('Problem with number of cell vectors')
         pbc = tuple(pbc)
 
-    arrays = {}
-    for name in names:
-        ase_name, cols = properties[name]
-        if cols == 1:
-            value = data[name]
-        else:
-            value = np.vstack([data[name + str(c)]
-                              for c in range(cols)]).T
-        arrays[ase_name] = value
-
     symbols = None
     if 'symbols' in arrays:
         symbols = [s.capitalize() for s in arrays['symbols']]
@@ -504,8 +534,9 @@ def ixyzchunks(fd):
 
 class ImageIterator:
     """"""
-    def __init__(self, ichunks):
+    def __init__(self, ichunks, index_frames=None):
         self.ichunks = ichunks
+        self.index_frames = index_frames
 
     def __call__(self, fd, indices=-1):
         if not hasattr(indices, 'start'):
@@ -518,6 +549,17 @@ class ImageIterator:
             yield chunk.build()
 
     def _getslice(self, fd, indices):
+        negative = any(i is not None and i < 0
+                       for i in [indices.start, indices.stop, indices.step])
+        frames = None
+        if self.index_frames is not None:
+            # Use an existing index, or create one for negative indices:
+            frames = self.index_frames(fd, scan=negative)
+        if frames is not None:
+            # Jump directly to the requested chunks
+            return (self._getchunk(fd, frames.offsets[i])
+                    for i in range(len(frames))[indices])
+
         try:
             iterator = islice(self.ichunks(fd), indices.start, indices.stop,
                               indices.step)
@@ -533,11 +575,158 @@ class ImageIterator:
             iterator = islice(self.ichunks(fd), *indices_tuple)
         return iterator
 
+    def _getchunk(self, fd, offset):
+        fd.seek(int(offset))
+        return next(self.ichunks(fd))
+
+
+def _stat(filename):
+    st = os.stat(filename)
+    mtime = getattr(st, 'st_mtime_ns', None)
+    if mtime is None:
+        mtime = int(st.st_mtime * 1e9)
+    return np.array([st.st_size, mtime], np.int64)
+
+
+class XYZIndex:
+    """Table of the frames in an XYZ file.
+
+    Holds the byte offset, the number of atoms and the number of VEC
+    lines of every frame, so that frames can be read directly without
+    going through the file.  The table can be stored in a sidecar file
+    (the name of the XYZ file with an extra ``.idx`` extension), which
+    is only used as long as the size and modification time of the XYZ
+    file are unchanged.  See :func:`get_xyz_index`."""
+
+    def __init__(self, offsets, natoms, nvec, stat=None):
+        self.offsets = np.array(offsets, np.int64)
+        self.natoms = np.array(natoms, np.int64)
+        self.nvec = np.array(nvec, np.int64)
+        self.stat = stat
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @classmethod
+    def scan(cls, fileobj, last_frame=None):
+        """Find the frames of an XYZ file.
+
+        The file is scanned from the beginning.  Stop after frame number
+        last_frame if given."""
+        if is_plain_file(fileobj):
+            # Much faster than tell() in text mode
+            fd = fileobj.buffer
+            vec = b'VEC'
+        else:
+            fd = fileobj
+            vec = 'VEC'
+        fd.seek(0)
+        offsets = []
+        natoms_list = []
+        nvecs = []
+        frame_pos = fd.tell()
+        line = fd.readline()
+        while line.strip():
+            try:
+                natoms = int(line)
+            except ValueError as err:
+                raise XYZError('ase.io.extxyz: Expected xyz header but got: '
+                               '{}'.format(err))
+            fd.readline()  # read comment line
+            if vec == b'VEC':
+                deque(islice(fd, natoms), maxlen=0)
+            else:
+                for i in range(natoms):
+                    fd.readline()
+            # check for VEC
+            nvec = 0
+            while True:
+                next_pos = fd.tell()
+                line = fd.readline()
+                if line.lstrip().startswith(vec):
+                    nvec += 1
+                    if nvec > 3:
+                        raise XYZError('ase.io.extxyz: More than 3 VECX '
+                                       'entries')
+                else:
+                    break
+            offsets.append(frame_pos)
+            natoms_list.append(natoms)
+            nvecs.append(nvec)
+            frame_pos = next_pos
+            if last_frame is not None and len(offsets) > last_frame:
+                break
+        return cls(offsets, natoms_list, nvecs)
+
+    @classmethod
+    def load(cls, filename):
+        """Read the sidecar index of an XYZ file.
+
+        Returns None if there is no index or if it is out of date."""
+        try:
+            with open(filename + '.idx', 'rb') as fd:
+                npz = np.load(fd)
+                stat = npz['stat']
+                if (stat != _stat(filename)).any():
+                    return None
+                return cls(npz['offsets'], npz['natoms'], npz['nvec'], stat)
+        except Exception:
+            return None
+
+    def save(self, filename):
+        """Write the sidecar index for an XYZ file.
+
+        Failure to write the index (e.g. in a read-only directory) is
+        silently ignored."""
+        try:
+            tmpname = filename + '.idx.tmp'
+            with open(tmpname, 'wb') as fd:
+                np.savez(fd, offsets=self.offsets, natoms=self.natoms,
+                         nvec=self.nvec, stat=_stat(filename))
+            os.replace(tmpname, filename + '.idx')
+        except (IOError, OSError):
+            pass
+
+    def read_frame(self, fileobj, i, properties_parser=key_val_str_to_dict):
+        """Read frame number i from the XYZ file."""
+        natoms = int(self.natoms[i])
+        fileobj.seek(int(self.offsets[i]))
+        # check for consistency with frame index table
+        assert int(fileobj.readline()) == natoms
+        return _read_xyz_frame(fileobj, natoms, properties_parser,
+                               int(self.nvec[i]))
+
+
+def get_xyz_index(filename, sidecar=True):
+    """Return the :class:`XYZIndex` of an XYZ file.
+
+    An up-to-date sidecar index is used if present.  Otherwise the file
+    is scanned and, if sidecar is True, the index is saved next to the
+    file for later use.  ``len(get_xyz_index(filename))`` is the number
+    of frames."""
+    frames = XYZIndex.load(filename)
+    if frames is None:
+        with open(filename) as fd:
+            frames = XYZIndex.scan(fd)
+        if sidecar:
+            frames.save(filename)
+    return frames
+
 
-iread_xyz = ImageIterator(ixyzchunks)
+def _index_plain_file(fileobj, scan=False):
+    if not is_plain_file(fileobj):
+        return None
+    frames = XYZIndex.load(fileobj.name)
+    if frames is None and scan:
+        frames = XYZIndex.scan(fileobj)
+    return frames
 
 
-def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
+iread_xyz = ImageIterator(ixyzchunks, _index_plain_file)
+
+
+def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict,
+             sidecar=None):
     """
     Read from a file in Extended XYZ format
 
@@ -546,6 +735,11 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
     to a dictionary, ``extxyz.key_val_str_to_dict`` is the default and can
     deal with most use cases, ``extxyz.key_val_str_to_dict_regex`` is slightly
     faster but has fewer features.
+
+    An up-to-date sidecar index of the frames (see :class:`XYZIndex`) is
+    used if present, so that any frame can be read without scanning the
+    file.  Use sidecar=True to also create the index when it is missing
+    or out of date, and sidecar=False to ignore it.
     """
     if isinstance(fileobj, basestring):
         fileobj = open(fileobj)
@@ -558,75 +752,33 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
     if isinstance(index, int) and index >= 0:
         last_frame = index
     elif isinstance(index, slice):
-        if index.stop is not None and index.stop >= 0:
-            last_frame = index.stop
-
-    # scan through file to find where the frames start
-    fileobj.seek(0)
-    frames = []
-    while True:
-        frame_pos = fileobj.tell()
-        line = fileobj.readline()
-        if line.strip() == '':
-            break
-        try:
-            natoms = int(line)
-        except ValueError as err:
-            raise XYZError('ase.io.extxyz: Expected xyz header but got: {}'
-                           .format(err))
-        fileobj.readline()  # read comment line
-        for i in range(natoms):
-            fileobj.readline()
-        #check for VEC
-        nvec = 0
-        while True:
-            lastPos = fileobj.tell()
-            line = fileobj.readline()
-            if line.lstrip().startswith('VEC'):
-                nvec += 1
-                if nvec > 3:
-                    raise XYZError('ase.io.extxyz: More than 3 VECX entries')
-            else:
-                fileobj.seek(lastPos)
-                break
-        frames.append((frame_pos, natoms, nvec))
-        if last_frame is not None and len(frames) > last_frame:
-            break
+        start, stop = index.start, index.stop
+        if index.step is not None and index.step < 0:
+            # Reverse slice: the first frame read is the last one needed
+            start, stop = stop, start
+        if (stop is not None and stop >= 0 and
+            (start is None or start >= 0)):
+            last_frame = stop
+
+    frames = None
+    plain = is_plain_file(fileobj)
+    if plain and sidecar is not False:
+        frames = XYZIndex.load(fileobj.name)
+    if frames is None:
+        if plain and sidecar:
+            frames = XYZIndex.scan(fileobj)
+            frames.save(fileobj.name)
+        else:
+            # scan through file to find where the frames start
+            frames = XYZIndex.scan(fileobj, last_frame)
 
     if isinstance(index, int):
-        if index < 0:
-            tmpsnp = len(frames) + index
-            trbl = range(tmpsnp, tmpsnp + 1, 1)
-        else:
-            trbl = range(index, index + 1, 1)
-    elif isinstance(index, slice):
-        start = index.start
-        stop = index.stop
-        step = index.step
-
-        if start is None:
-            start = 0
-        elif start < 0:
-            start = len(frames) + start
-
-        if step is None:
-            step = 1
-
-        if stop is None:
-            stop = len(frames)
-        elif stop < 0:
-            stop = len(frames) + stop
-
-        trbl = range(start, stop, step)
-        if step < 0:
-            trbl.reverse()
-
-    for index in trbl:
-        frame_pos, natoms, nvec = frames[index]
-        fileobj.seek(frame_pos)
-        # check for consistency with frame index table
-        assert int(fileobj.readline()) == natoms
-        yield _read_xyz_frame(fileobj, natoms, properties_parser, nvec)
+        trbl = [range(len(frames))[index]]
+    else:
+        trbl = range(len(frames))[index]
+
+    for i in trbl:
+        yield frames.read_frame(fileobj, i, properties_parser)
 
 
 def output_column_format(atoms, columns, arrays,
@@ -8,6 +8,10 @@ elements:
 * a write(filename, images) function
 * a 'single' boolean (False if multiple configurations is supported)
 * a 'acceptsfd' boolean (True if file-descriptors are accepted)
+* an optional index(fd) function returning the positions of all
+  configurations in a file (usually byte offsets)
+* an optional read_frame(fd, offset) function reading the configuration
+  at one of those positions
 
 There is a dict 'ioformats' that is filled with IOFormat objects as they are
 needed.  The 'initialize()' function will create the IOFormat object by
@@ -15,6 +19,11 @@ looking at the all_formats dict and by importing the correct read/write
 functions from the correct module.  The 'single' and 'acceptsfd' bools are
 parsed from two-charcter string in the all_formats dict below.
 
+The index and read_frame functions are found as index_<format>() and
+read_frame_<format>() in the module.  When both are present, read() and
+iread() use them for negative indices into uncompressed files, so that
+only the requested configurations are parsed.
+
 
 Example
 =======
@@ -40,7 +49,8 @@ class UnknownFileTypeError(Exception):
 
 
 IOFormat = collections.namedtuple('IOFormat',
-                                  'read, write, single, acceptsfd, isbinary')
+                                  'read, write, single, acceptsfd, isbinary, '
+                                  'index, read_frame')
 ioformats = {}  # will be filled at run-time
 
 # 1=single, +=multiple, F=accepts a file-descriptor, S=needs a file-name str,
@@ -88,6 +98,7 @@ all_formats = {
     'html': ('X3DOM HTML', '1F'),
     'iwm': ('?', '1F'),
     'json': ('ASE JSON database file', '+F'),
+    'jsonl': ('ASE JSON-lines database file', '+S'),
     'jsv': ('JSV file format', '1F'),
     'lammps-dump': ('LAMMPS dump file', '+F'),
     'lammps-data': ('LAMMPS data file', '1F'),
@@ -116,7 +127,7 @@ all_formats = {
     'v-sim': ('V_Sim ascii file', '1F'),
     'vasp': ('VASP POSCAR/CONTCAR file', '1F'),
     'vasp-out': ('VASP OUTCAR file', '+F'),
-    'vasp-xdatcar': ('VASP XDATCAR file', '+S'),
+    'vasp-xdatcar': ('VASP XDATCAR file', '+F'),
     'vasp-xml': ('VASP vasprun.xml file', '+F'),
     'vti': ('VTK XML Image Data', '1F'),
     'vtu': ('VTK XML Unstructured Grid', '1F'),
@@ -144,6 +155,7 @@ format2modulename = {
     'gif': 'animation',
     'html': 'x3d',
     'json': 'db',
+    'jsonl': 'db',
     'lammps-dump': 'lammpsrun',
     'lammps-data': 'lammpsdata',
     'mp4': 'animation',
@@ -209,8 +221,21 @@ def initialize(format):
     read = getattr(module, 'read_' + _format, None)
     write = getattr(module, 'write_' + _format, None)
 
+    # Prefer a streaming iread_<format>(fileobj, index) generator:
+    iread = getattr(module, 'iread_' + _format, None)
+    if (iread and inspect.isgeneratorfunction(iread) and
+        'index' in iread.__code__.co_varnames):
+        read = iread
+
     if read and not inspect.isgeneratorfunction(read):
         read = functools.partial(wrap_read_function, read)
+
+    # Optional random access to the configurations of a file:
+    index = getattr(module, 'index_' + _format, None)
+    read_frame = getattr(module, 'read_frame_' + _format, None)
+    if not (index and read_frame):
+        index = read_frame = None
+
     if not read and not write:
         raise ValueError('File format not recognized: ' + format)
     code = all_formats[format][1]
@@ -218,7 +243,8 @@ def initialize(format):
     assert code[1] in 'BFS'
     acceptsfd = code[1] != 'S'
     isbinary = code[1] == 'B'
-    ioformats[format] = IOFormat(read, write, single, acceptsfd, isbinary)
+    ioformats[format] = IOFormat(read, write, single, acceptsfd, isbinary,
+                                 index, read_frame)
 
 
 def get_ioformat(format):
@@ -334,6 +360,53 @@ def open_with_compression(filename, mode='r'):
     return fd
 
 
+def is_plain_file(fd):
+    """Check for an uncompressed file on disk.
+
+    Works for files opened in text as well as in binary mode."""
+    import io
+    raw = getattr(getattr(fd, 'buffer', fd), 'raw', None)
+    return isinstance(raw, io.FileIO)
+
+
+def find_markers(fd, marker, reverse=False, chunksize=1 << 22,
+                 line_start=True):
+    """Yield byte offsets of all lines starting with marker.
+
+    The file must be a plain file (see is_plain_file()) and marker a
+    bytes object.  The file is searched in large binary chunks, which is
+    much faster than reading it line by line.  With reverse=True, the
+    search starts at the end of the file and the offsets are yielded in
+    decreasing order.  With line_start=False, the offsets of the marker
+    anywhere in a line are yielded."""
+    buf = getattr(fd, 'buffer', fd)
+    buf.seek(0, os.SEEK_END)
+    size = buf.tell()
+    n = len(marker)
+    chunks = [(begin, min(begin + chunksize, size))
+              for begin in range(0, size, chunksize)]
+    if reverse:
+        chunks.reverse()
+    for begin, end in chunks:
+        # Find markers starting in [begin, end).  Read one extra byte in
+        # front to check for a newline and enough bytes after the end to
+        # catch markers crossing the boundary:
+        offset = max(begin - 1, 0)
+        buf.seek(offset)
+        data = buf.read(end + n - 1 - offset)
+        found = []
+        i = data.find(marker, begin - offset)
+        while i != -1 and offset + i < end:
+            if (not line_start or offset + i == 0 or
+                data[i - 1:i] == b'\n'):
+                found.append(offset + i)
+            i = data.find(marker, i + 1)
+        if reverse:
+            found.reverse()
+        for pos in found:
+            yield pos
+
+
 def wrap_read_function(read, filename, index=None, **kwargs):
     """Convert read-function to generator."""
     if index is None:
@@ -534,7 +607,17 @@ def _iread(filename, index, format, io, parallel=None, full_output=False,
 
     # Make sure fd is closed in case loop doesn't finish:
     try:
-        for dct in io.read(fd, *args, **kwargs):
+        if (io.index and isinstance(index, slice) and
+            any(i is not None and i < 0
+                for i in [index.start, index.stop, index.step]) and
+            is_plain_file(fd)):
+            # Find all configurations and parse only the ones we need:
+            offsets = io.index(fd)
+            images = (io.read_frame(fd, offsets[i], **kwargs)
+                      for i in range(len(offsets))[index])
+        else:
+            images = io.read(fd, *args, **kwargs)
+        for dct in images:
             if not isinstance(dct, dict):
                 dct = {'atoms': dct}
             if full_output:
@@ -69,6 +69,69 @@ def decode(txt):
     return numpyfy(mydecode(txt))
 
 
+binary_magic = b'ASE-JSON'
+
+
+class BinaryEncoder(MyEncoder):
+    """JSON encoder that leaves the data of numeric arrays out.
+
+    The arrays are collected in self.arrays and replaced by references
+    to their position in the concatenated raw array data."""
+    def __init__(self):
+        MyEncoder.__init__(self)
+        self.arrays = []
+        self.nbytes = 0
+
+    def default(self, obj):
+        if isinstance(obj, np.ndarray) and obj.dtype.kind in 'biufc':
+            obj = np.ascontiguousarray(obj)
+            self.arrays.append(obj)
+            ref = {'__ndarray__': [obj.shape, obj.dtype.str, self.nbytes]}
+            self.nbytes += obj.nbytes
+            return ref
+        return MyEncoder.default(self, obj)
+
+
+def encode_binary(obj):
+    """Encode object to bytes with NumPy arrays in binary form.
+
+    The result is: 8 bytes of magic, the length of the JSON part as a
+    64 bit integer, the JSON part and finally the raw data of the arrays."""
+    encoder = BinaryEncoder()
+    txt = encoder.encode(obj).encode()
+    return b''.join([binary_magic,
+                     np.array(len(txt), '<i8').tobytes(),
+                     txt] +
+                    [array.tobytes() for array in encoder.arrays])
+
+
+def is_binary(obj):
+    """Check if obj is bytes (or a buffer) created by encode_binary()."""
+    return (isinstance(obj, (bytes, memoryview)) and
+            bytes(obj[:8]) == binary_magic)
+
+
+def decode_binary(buf):
+    """Decode bytes created by encode_binary()."""
+    assert bytes(buf[:8]) == binary_magic
+    n = int(np.frombuffer(buf, '<i8', 1, 8)[0])
+    start = 16 + n
+
+    def hook(dct):
+        if '__ndarray__' in dct:
+            shape, dtype, offset = dct['__ndarray__']
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            if count == 0:
+                return np.zeros(shape, dtype)
+            array = np.frombuffer(buf, dtype, count, start + offset)
+            return array.reshape(shape).copy()
+        return object_hook(dct)
+
+    txt = bytes(buf[16:start]).decode()
+    return numpyfy(json.JSONDecoder(object_hook=hook).decode(txt))
+
+
 def read_json(name):
     if isinstance(name, basestring):
         fd = open(name, 'r')
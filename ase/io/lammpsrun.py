@@ -1,152 +1,269 @@
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
 from ase.atoms import Atoms
 from ase.quaternions import Quaternions
 from ase.calculators.singlepoint import SinglePointCalculator
 from ase.parallel import paropen
+from ase.io.formats import is_plain_file, find_markers
 from ase.utils import basestring
-from collections import deque
 
 
-def read_lammps_dump(fileobj, index=-1, order=True, atomsobj=Atoms):
-    """Method which reads a LAMMPS dump file.
+TIMESTEP_MARKER = b'ITEM: TIMESTEP'
+
+# Per-atom quantities and the dump columns they are read from:
+quantity_columns = [('positions', ['x', 'y', 'z']),
+                    ('scaled_positions', ['xs', 'ys', 'zs']),
+                    ('velocities', ['vx', 'vy', 'vz']),
+                    ('forces', ['fx', 'fy', 'fz']),
+                    ('quaternions', ['c_q[1]', 'c_q[2]', 'c_q[3]', 'c_q[4]'])]
+
+
+def index_lammps_dump(fileobj):
+    """Return the byte offsets of all frames in a LAMMPS dump file.
+
+    A frame starts at an "ITEM: TIMESTEP" line.  The file must be an
+    uncompressed file on disk opened in text mode."""
+    return list(find_markers(fileobj, TIMESTEP_MARKER))
+
+
+def _read_frame(fileobj, order=True, atomsobj=Atoms, columns=None,
+                skip=False):
+    """Read one frame starting at the current position of fileobj.
+
+    Returns None at the end of the file.  With skip=True the per-atom
+    lines are consumed without parsing them and True is returned."""
+    line = fileobj.readline()
+    while line and 'ITEM: TIMESTEP' not in line:
+        line = fileobj.readline()
+    if not line:
+        return None
+
+    natoms = 0
+    cell = celldisp = None
+    while True:
+        line = fileobj.readline()
+        if not line:
+            raise ValueError('Unexpected end of LAMMPS dump file')
+
+        if 'ITEM: NUMBER OF ATOMS' in line:
+            line = fileobj.readline()
+            natoms = int(line.split()[0])
+
+        elif 'ITEM: BOX BOUNDS' in line:
+            cell, celldisp = _read_box(fileobj, line)
+
+        elif 'ITEM: ATOMS' in line:
+            break
+
+    if skip:
+        deque(islice(fileobj, natoms), maxlen=0)
+        return True
+
+    # (reliably) identify values by labels behind
+    # "ITEM: ATOMS" - requires >=lammps-7Jul09
+    labels = line.split()[2:]
+    atom_attributes = dict((x, i) for i, x in enumerate(labels))
+
+    # Parse the whole block of per-atom lines at once:
+    text = ''.join(islice(fileobj, natoms))
+    try:
+        data = np.array(text.split(), float)
+    except ValueError:
+        # Some columns are not numbers (e.g. element names).  Only the
+        # columns that are needed will be converted below.
+        data = np.array(text.split())
+    data.shape = (natoms, -1)
+
+    def get_columns(labels, dtype=float):
+        return data[:, [atom_attributes[label]
+                        for label in labels]].astype(dtype)
+
+    ids = get_columns(['id'], int)[:, 0]
+    types = get_columns(['type'], int)[:, 0]
+
+    quantities = {}
+    for name, labels in quantity_columns:
+        if columns is not None and not set(labels).issubset(columns):
+            continue
+        if all(label in atom_attributes for label in labels):
+            quantities[name] = get_columns(labels)
+
+    if order:
+        ordering = np.argsort(ids, kind='mergesort')
+        types = types[ordering]
+        for name in quantities:
+            quantities[name] = quantities[name][ordering]
+
+    if 'quaternions' in quantities:
+        atoms = Quaternions(symbols=types,
+                            positions=quantities.get('positions'),
+                            cell=cell, celldisp=celldisp,
+                            quaternions=quantities['quaternions'])
+    elif 'positions' in quantities:
+        atoms = atomsobj(
+            symbols=types, positions=quantities['positions'],
+            celldisp=celldisp, cell=cell)
+    elif 'scaled_positions' in quantities:
+        atoms = atomsobj(
+            symbols=types, scaled_positions=quantities['scaled_positions'],
+            celldisp=celldisp, cell=cell)
+    else:
+        # Nothing to build an Atoms object from
+        return False
+
+    if 'velocities' in quantities:
+        atoms.set_velocities(quantities['velocities'])
+    if 'forces' in quantities:
+        calculator = SinglePointCalculator(atoms, energy=0.0,
+                                           forces=quantities['forces'])
+        atoms.set_calculator(calculator)
+
+    return atoms
+
+
+def _read_box(fileobj, line):
+    """Read the three lines of an "ITEM: BOX BOUNDS" section."""
+    lo = []
+    hi = []
+    tilt = []
+    # save labels behind "ITEM: BOX BOUNDS" in
+    # triclinic case (>=lammps-7Jul09)
+    tilt_items = line.split()[3:]
+    for i in range(3):
+        line = fileobj.readline()
+        fields = line.split()
+        lo.append(float(fields[0]))
+        hi.append(float(fields[1]))
+        if (len(fields) >= 3):
+            tilt.append(float(fields[2]))
+
+    # determine cell tilt (triclinic case!)
+    if (len(tilt) >= 3):
+        # for >=lammps-7Jul09 use labels behind
+        # "ITEM: BOX BOUNDS" to assign tilt (vector) elements ...
+        if (len(tilt_items) >= 3):
+            xy = tilt[tilt_items.index('xy')]
+            xz = tilt[tilt_items.index('xz')]
+            yz = tilt[tilt_items.index('yz')]
+        # ... otherwise assume default order in 3rd column
+        # (if the latter was present)
+        else:
+            xy = tilt[0]
+            xz = tilt[1]
+            yz = tilt[2]
+    else:
+        xy = xz = yz = 0
+    xhilo = (hi[0] - lo[0]) - (xy**2)**0.5 - (xz**2)**0.5
+    yhilo = (hi[1] - lo[1]) - (yz**2)**0.5
+    zhilo = (hi[2] - lo[2])
+    if xy < 0:
+        if xz < 0:
+            celldispx = lo[0] - xy - xz
+        else:
+            celldispx = lo[0] - xy
+    else:
+        celldispx = lo[0]
+    celldispy = lo[1]
+    celldispz = lo[2]
+
+    cell = [[xhilo, 0, 0], [xy, yhilo, 0], [xz, yz, zhilo]]
+    celldisp = [[celldispx, celldispy, celldispz]]
+    return cell, celldisp
+
+
+def _iread_frames(fileobj, skip=0, **kwargs):
+    """Read frames one by one from the current position of fileobj."""
+    while True:
+        atoms = _read_frame(fileobj, skip=skip > 0, **kwargs)
+        if atoms is None:
+            return
+        if atoms is False:
+            continue
+        if skip > 0:
+            skip -= 1
+            continue
+        yield atoms
+
+
+def iread_lammps_dump(fileobj, index=slice(None), order=True,
+                      atomsobj=Atoms, columns=None):
+    """Iterate over the frames of a LAMMPS dump file.
+
+    Frames are read lazily and each block of per-atom lines is parsed in
+    one go with NumPy.  For an uncompressed file on disk, the byte offsets
+    of the "ITEM: TIMESTEP" lines are used for random access, so that
+    negative indices only require reading the last frames of the file.
 
     order: Order the particles according to their id. Might be faster to
     switch it off.
+
+    columns: If given, only per-atom quantities whose dump columns
+    (e.g. 'x', 'y', 'z' or 'fx', 'fy', 'fz') are all in this list are read.
+    The 'id' and 'type' columns are always read.
     """
     if isinstance(fileobj, basestring):
-        f = paropen(fileobj)
+        fd = paropen(fileobj)
     else:
-        f = fileobj
+        fd = fileobj
 
-    # load everything into memory
-    lines = deque(f.readlines())
+    if isinstance(index, int):
+        index = slice(index, index + 1 or None)
 
-    natoms = 0
-    images = []
-
-    while len(lines) > natoms:
-        line = lines.popleft()
-
-        if 'ITEM: TIMESTEP' in line:
-            lo = []
-            hi = []
-            tilt = []
-            id = []
-            types = []
-            positions = []
-            scaled_positions = []
-            velocities = []
-            forces = []
-            quaternions = []
+    kwargs = dict(order=order, atomsobj=atomsobj, columns=columns)
+    start = index.start
+    stop = index.stop
+    step = index.step or 1
 
-        if 'ITEM: NUMBER OF ATOMS' in line:
-            line = lines.popleft()
-            natoms = int(line.split()[0])
-            
-        if 'ITEM: BOX BOUNDS' in line:
-            # save labels behind "ITEM: BOX BOUNDS" in
-            # triclinic case (>=lammps-7Jul09)
-            tilt_items = line.split()[3:]
-            for i in range(3):
-                line = lines.popleft()
-                fields = line.split()
-                lo.append(float(fields[0]))
-                hi.append(float(fields[1]))
-                if (len(fields) >= 3):
-                    tilt.append(float(fields[2]))
-
-            # determine cell tilt (triclinic case!)
-            if (len(tilt) >= 3):
-                # for >=lammps-7Jul09 use labels behind
-                # "ITEM: BOX BOUNDS" to assign tilt (vector) elements ...
-                if (len(tilt_items) >= 3):
-                    xy = tilt[tilt_items.index('xy')]
-                    xz = tilt[tilt_items.index('xz')]
-                    yz = tilt[tilt_items.index('yz')]
-                # ... otherwise assume default order in 3rd column
-                # (if the latter was present)
-                else:
-                    xy = tilt[0]
-                    xz = tilt[1]
-                    yz = tilt[2]
-            else:
-                xy = xz = yz = 0
-            xhilo = (hi[0] - lo[0]) - (xy**2)**0.5 - (xz**2)**0.5
-            yhilo = (hi[1] - lo[1]) - (yz**2)**0.5
-            zhilo = (hi[2] - lo[2])
-            if xy < 0:
-                if xz < 0:
-                    celldispx = lo[0] - xy - xz
-                else:
-                    celldispx = lo[0] - xy
-            else:
-                celldispx = lo[0]
-            celldispy = lo[1]
-            celldispz = lo[2]
-
-            cell = [[xhilo, 0, 0], [xy, yhilo, 0], [xz, yz, zhilo]]
-            celldisp = [[celldispx, celldispy, celldispz]]
-
-        def add_quantity(fields, var, labels):
-            for label in labels:
-                if label not in atom_attributes:
-                    return
-            var.append([float(fields[atom_attributes[label]])
-                        for label in labels])
-                
-        if 'ITEM: ATOMS' in line:
-            # (reliably) identify values by labels behind
-            # "ITEM: ATOMS" - requires >=lammps-7Jul09
-            # create corresponding index dictionary before
-            # iterating over atoms to (hopefully) speed up lookups...
-            atom_attributes = {}
-            for (i, x) in enumerate(line.split()[2:]):
-                atom_attributes[x] = i
-            for n in range(natoms):
-                line = lines.popleft()
-                fields = line.split()
-                id.append(int(fields[atom_attributes['id']]))
-                types.append(int(fields[atom_attributes['type']]))
-                add_quantity(fields, positions, ['x', 'y', 'z'])
-                add_quantity(fields, scaled_positions, ['xs', 'ys', 'zs'])
-                add_quantity(fields, velocities, ['vx', 'vy', 'vz'])
-                add_quantity(fields, forces, ['fx', 'fy', 'fz'])
-                add_quantity(fields, quaternions, ['c_q[1]', 'c_q[2]',
-                                                   'c_q[3]', 'c_q[4]'])
-
-            if order:
-                def reorder(inlist):
-                    if not len(inlist):
-                        return inlist
-                    outlist = [None] * len(id)
-                    for i, v in zip(id, inlist):
-                        outlist[i - 1] = v
-                    return outlist
-                types = reorder(types)
-                positions = reorder(positions)
-                scaled_positions = reorder(scaled_positions)
-                velocities = reorder(velocities)
-                forces = reorder(forces)
-                quaternions = reorder(quaternions)
-
-            if len(quaternions):
-                images.append(Quaternions(symbols=types,
-                                          positions=positions,
-                                          cell=cell, celldisp=celldisp,
-                                          quaternions=quaternions))
-            elif len(positions):
-                images.append(atomsobj(
-                    symbols=types, positions=positions,
-                    celldisp=celldisp, cell=cell))
-            elif len(scaled_positions):
-                images.append(atomsobj(
-                    symbols=types, scaled_positions=scaled_positions,
-                    celldisp=celldisp, cell=cell))
-
-            if len(velocities):
-                images[-1].set_velocities(velocities)
-            if len(forces):
-                calculator = SinglePointCalculator(images[-1],
-                                                   energy=0.0, forces=forces)
-                images[-1].set_calculator(calculator)
-
-    return images[index]
+    try:
+        if step > 0 and (start or 0) >= 0 and (stop is None or stop >= 0):
+            frames = _iread_frames(fd, skip=start or 0, **kwargs)
+            for atoms in islice(frames, 0,
+                                None if stop is None else
+                                max(stop - (start or 0), 0), step):
+                yield atoms
+            return
+
+        if not is_plain_file(fd):
+            images = list(_iread_frames(fd, **kwargs))
+            for atoms in images[index]:
+                yield atoms
+            return
+
+        if (step > 0 and start is not None and start < 0 and
+                (stop is None or stop < 0)):
+            # Only the last -start frames are needed.  Slicing these
+            # gives the same frames as slicing all of them.
+            offsets = list(islice(find_markers(fd, TIMESTEP_MARKER,
+                                               reverse=True), -start))
+            offsets.reverse()
+        else:
+            offsets = index_lammps_dump(fd)
+
+        for i in range(len(offsets))[index]:
+            fd.seek(offsets[i])
+            atoms = _read_frame(fd, **kwargs)
+            if atoms is not False:
+                yield atoms
+    finally:
+        if isinstance(fileobj, basestring):
+            fd.close()
+
+
+def read_lammps_dump(fileobj, index=-1, order=True, atomsobj=Atoms,
+                     columns=None):
+    """Method which reads a LAMMPS dump file.
+
+    order: Order the particles according to their id. Might be faster to
+    switch it off.
+
+    See :func:`iread_lammps_dump` for a generator version and the
+    *columns* keyword.
+    """
+    images = iread_lammps_dump(fileobj, index, order=order,
+                               atomsobj=atomsobj, columns=columns)
+    if isinstance(index, int):
+        return next(images)
+    return list(images)
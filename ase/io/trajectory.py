@@ -1,4 +1,5 @@
 from __future__ import print_function
+import copy
 import warnings
 
 import numpy as np
@@ -11,11 +12,17 @@ from ase.atoms import Atoms
 from ase.io.jsonio import encode, decode
 from ase.io.pickletrajectory import PickleTrajectory
 from ase.parallel import world
+from ase.utils import BackgroundWriter
 
 __all__ = ['Trajectory', 'PickleTrajectory']
 
+# Arrays stored in single precision with singleprecision=True:
+singleprecision_arrays = ['positions', 'momenta', 'forces', 'magmoms',
+                          'charges', 'energies', 'stresses']
 
-def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
+
+def Trajectory(filename, mode='r', atoms=None, properties=None, master=None,
+               asynchronous=False, singleprecision=False, compression=None):
     """A Trajectory can be created in read, write or append mode.
 
     Parameters:
@@ -41,18 +48,29 @@ def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
         Controls which process does the actual writing. The
         default is that process number 0 does this.  If this
         argument is given, processes where it is True will write.
-
-    The atoms, properties and master arguments are ignores in read mode.
+    asynchronous: bool
+        Write to the file in a background thread.  See
+        :class:`TrajectoryWriter`.
+    singleprecision: bool or list of str
+        Store arrays in single precision.  See :class:`TrajectoryWriter`.
+    compression: None, 'zlib' or 'lzma'
+        Compress arrays.  See :class:`TrajectoryWriter`.
+
+    Only the filename and mode arguments are used in read mode.
     """
     if mode == 'r':
         return TrajectoryReader(filename)
-    return TrajectoryWriter(filename, mode, atoms, properties, master=master)
+    return TrajectoryWriter(filename, mode, atoms, properties, master=master,
+                            asynchronous=asynchronous,
+                            singleprecision=singleprecision,
+                            compression=compression)
 
 
 class TrajectoryWriter:
     """Writes Atoms objects to a .traj file."""
     def __init__(self, filename, mode='w', atoms=None, properties=None,
-                 extra=[], master=None):
+                 extra=[], master=None, asynchronous=False,
+                 singleprecision=False, compression=None):
         """A Trajectory writer, in write or append mode.
 
         Parameters:
@@ -78,12 +96,32 @@ class TrajectoryWriter:
             Controls which process does the actual writing. The
             default is that process number 0 does this.  If this
             argument is given, processes where it is True will write.
+        asynchronous: bool
+            Write to the file in a background thread.  The write() method
+            takes a copy of everything that should be written and returns
+            while the file is being written, so that writing overlaps with
+            the calculation of the next frame.  Frames are written in
+            order.  An error in the background thread is raised by the
+            next call to write() or close().
+        singleprecision: bool or list of str
+            Store floating point arrays in single precision.  True means
+            the per-atom arrays (positions, momenta, forces, ...).  Use a
+            list of names to select arrays.  The unit cell is always
+            stored in double precision.  The arrays are converted back
+            to double precision when read.
+        compression: None, 'zlib' or 'lzma'
+            Compress the arrays with the zlib or lzma module from Python's
+            standard library.  Both options are transparent to the
+            :class:`TrajectoryReader`.
         """
         if master is None:
             master = (world.rank == 0)
         self.master = master
         self.atoms = atoms
         self.properties = properties
+        self.writer = BackgroundWriter() if asynchronous else None
+        self.singleprecision = singleprecision
+        self.compression = compression
 
         self.description = {}
         self.header_data = None
@@ -105,7 +143,12 @@ class TrajectoryWriter:
         if mode not in 'aw':
             raise ValueError('mode must be "w" or "a".')
         if self.master:
-            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory')
+            float32 = self.singleprecision
+            if float32 is True:
+                float32 = singleprecision_arrays
+            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory',
+                                    float32=float32,
+                                    compression=self.compression)
             if len(self.backend) > 0 and mode == 'a':
                 atoms = Trajectory(filename)[0]
                 self.header_data = get_header_data(atoms)
@@ -129,8 +172,14 @@ class TrajectoryWriter:
             self._write_atoms(image, **kwargs)
 
     def _write_atoms(self, atoms, **kwargs):
-        b = self.backend
+        if self.writer is None:
+            self._write_frame(self.backend, atoms, **kwargs)
+        else:
+            snapshot = Snapshot()
+            self._write_frame(snapshot, atoms, **kwargs)
+            self.writer.put(snapshot.write_to, self.backend)
 
+    def _write_frame(self, b, atoms, **kwargs):
         if self.header_data is None:
             b.write(version=1, ase_version=__version__)
             if self.description:
@@ -200,12 +249,54 @@ class TrajectoryWriter:
 
     def close(self):
         """Close the trajectory file."""
-        self.backend.close()
+        try:
+            if self.writer is not None:
+                self.writer.close()
+        finally:
+            self.backend.close()
 
     def __len__(self):
+        if self.writer is not None:
+            self.writer.flush()
         return world.sum(len(self.backend))
 
 
+class Snapshot:
+    """Stand-in for an ulm writer that keeps copies of what is written.
+
+    Call write_to() to write it all to a real writer later."""
+    def __init__(self):
+        self.items = []  # (name, value) tuples
+
+    def write(self, *args, **kwargs):
+        if args:
+            name, value = args
+            kwargs[name] = value
+        for name, value in kwargs.items():
+            if isinstance(value, np.ndarray):
+                value = value.copy()
+            else:
+                value = copy.deepcopy(value)
+            self.items.append((name, value))
+
+    def child(self, name):
+        child = Snapshot()
+        self.items.append((name, child))
+        return child
+
+    def sync(self):
+        pass
+
+    def write_to(self, writer, sync=True):
+        for name, value in self.items:
+            if isinstance(value, Snapshot):
+                value.write_to(writer.child(name), sync=False)
+            else:
+                writer.write(name, value)
+        if sync:
+            writer.sync()
+
+
 class TrajectoryReader:
     """Reads Atoms objects from a .traj file."""
     def __init__(self, filename):
@@ -264,7 +355,10 @@ class TrajectoryReader:
             c = b.calculator
             for prop in all_properties:
                 if prop in c:
-                    results[prop] = c.get(prop)
+                    x = c.get(prop)
+                    if isinstance(x, np.ndarray) and x.dtype == np.float32:
+                        x = x.astype(float)
+                    results[prop] = x
                     implemented_properties.append(prop)
             calc = SinglePointCalculator(atoms, **results)
             calc.name = b.calculator.name
@@ -51,6 +51,13 @@ Versions:
 
 3) Changed magic string from "AFFormat" to "- of Ulm".
 
+Arrays can be stored in single precision and compressed with zlib or lzma
+from Python's standard library (see the float32 and compression arguments
+of the :class:`Writer`).  A compressed array is stored in chunks of
+consecutive rows and has a "compressed_ndarray" entry instead of an
+"ndarray" entry in the json data, so that older versions of ASE will fail
+to read it instead of returning garbage.
+
 """
 
 from __future__ import print_function
@@ -72,14 +79,16 @@ VERSION = 3
 N1 = 42  # block size - max number of items: 1, N1, N1*N1, N1*N1*N1, ...
 
 
-def open(filename, mode='r', index=None, tag=''):
+def open(filename, mode='r', index=None, tag='', float32=(),
+         compression=None):
     """Open ulm-file."""
     if mode == 'r':
         return Reader(filename, index or 0)
     if mode not in 'wa':
         2 / 0
     assert index is None
-    return Writer(filename, mode, tag)
+    return Writer(filename, mode, tag, float32=float32,
+                  compression=compression)
 
 
 ulmopen = open
@@ -113,6 +122,17 @@ def readints(fd, n):
     return a
 
 
+def get_compressor(compression):
+    """Return (compress, decompress) functions."""
+    if compression == 'zlib':
+        import zlib
+        return zlib.compress, zlib.decompress
+    if compression == 'lzma':
+        import lzma
+        return lzma.compress, lzma.decompress
+    raise ValueError('Unknown compression: {0}'.format(compression))
+
+
 def file_has_fileno(fd):
     """Tell whether file implements fileio() or not.
 
@@ -131,7 +151,11 @@ def file_has_fileno(fd):
 
 
 class Writer:
-    def __init__(self, fd, mode='w', tag='', data=None):
+    # Size of the chunks that compressed arrays are divided into:
+    chunk_size = 2**20
+
+    def __init__(self, fd, mode='w', tag='', data=None, float32=(),
+                 compression=None):
         """Create writer object.
 
         fd: str
@@ -141,10 +165,20 @@ class Writer:
             existing one) and 'a' for appending to an existing file.
         tag: str
             Magic ID string.
+        float32: list of str or bool
+            Names of float64 arrays that should be stored in single
+            precision.  Use True for all float64 arrays.
+        compression: None, 'zlib' or 'lzma'
+            Compress arrays written with the write() method.
         """
 
         assert mode in 'aw'
 
+        if compression is not None:
+            get_compressor(compression)  # check that it is OK
+        self.float32 = float32 or ()
+        self.compression = compression
+
         # Header to be written later:
         self.header = b''
 
@@ -310,16 +344,41 @@ class Writer:
                                   type(None))):
                 self.data[name] = value
             elif isinstance(value, np.ndarray):
-                self.add_array(name, value.shape, value.dtype)
-                self.fill(value)
+                if value.dtype == np.float64 and (self.float32 is True or
+                                                  name in self.float32):
+                    value = value.astype(np.float32)
+                if self.compression and value.ndim > 0 and value.size > 0:
+                    self.write_compressed_array(name, value)
+                else:
+                    self.add_array(name, value.shape, value.dtype)
+                    self.fill(value)
             else:
                 value.write(self.child(name))
 
+    def write_compressed_array(self, name, a):
+        """Write ndarray compressed in chunks of rows."""
+        self._write_header()
+        assert self.nmissing == 0, 'last array not done'
+        compress = get_compressor(self.compression)[0]
+        a = np.ascontiguousarray(a)
+        nrows = max(1, self.chunk_size // max(1, a[0].nbytes))
+        i = align(self.fd)
+        sizes = []
+        for start in range(0, len(a), nrows):
+            chunk = compress(a[start:start + nrows].tobytes())
+            self.fd.write(chunk)
+            sizes.append(len(chunk))
+        shape = tuple(int(s) for s in a.shape)
+        self.data[name + '.'] = {
+            'compressed_ndarray': (shape, a.dtype.name, i,
+                                   self.compression, nrows, sizes)}
+
     def child(self, name):
         """Create child-writer object."""
         self._write_header()
         dct = self.data[name + '.'] = {}
-        return Writer(self.fd, data=dct)
+        return Writer(self.fd, data=dct, float32=self.float32,
+                      compression=self.compression)
 
     def close(self):
         """Close file."""
@@ -416,6 +475,17 @@ class Reader:
                                           np.dtype(dtype),
                                           offset,
                                           self._little_endian)
+                elif 'compressed_ndarray' in value:
+                    (shape, dtype, offset,
+                     compression, nrows, sizes) = value['compressed_ndarray']
+                    value = CompressedNDArrayReader(self._fd,
+                                                    shape,
+                                                    np.dtype(dtype),
+                                                    offset,
+                                                    self._little_endian,
+                                                    compression,
+                                                    nrows,
+                                                    sizes)
                 else:
                     value = Reader(self._fd, data=value,
                                    little_endian=self._little_endian)
@@ -540,6 +610,19 @@ class NDArrayReader:
                 i += len(self)
             return self[i:i + 1][0]
         start, stop, step = i.indices(len(self))
+        a = self._read(start, stop)
+        if step != 1:
+            a = a[::step].copy()
+        if self.little_endian != np.little_endian:
+            a = a.byteswap(inplace=a.flags.writeable) # frombuffer() returns readonly array
+        if self.length_of_last_dimension is not None:
+            a = a[..., :self.length_of_last_dimension]
+        if self.scale != 1.0:
+            a *= self.scale
+        return a
+
+    def _read(self, start, stop):
+        """Read rows start to stop."""
         stride = np.prod(self.shape[1:], dtype=int)
         offset = self.offset + start * self.itemsize * stride
         self.fd.seek(offset)
@@ -551,14 +634,6 @@ class NDArrayReader:
             a = np.frombuffer(self.fd.read(int(count * self.itemsize)),
                               self.dtype)
         a.shape = (stop - start,) + self.shape[1:]
-        if step != 1:
-            a = a[::step].copy()
-        if self.little_endian != np.little_endian:
-            a = a.byteswap(inplace=a.flags.writeable) # frombuffer() returns readonly array
-        if self.length_of_last_dimension is not None:
-            a = a[..., :self.length_of_last_dimension]
-        if self.scale != 1.0:
-            a *= self.scale
         return a
 
     def proxy(self, *indices):
@@ -574,6 +649,62 @@ class NDArrayReader:
         return p
 
 
+class CompressedNDArrayReader(NDArrayReader):
+    def __init__(self, fd, shape, dtype, offset, little_endian,
+                 compression, nrows, sizes):
+        NDArrayReader.__init__(self, fd, shape, dtype, offset, little_endian)
+        self.decompress = get_compressor(compression)[1]
+        self.nrows = nrows  # number of rows per chunk
+        self.sizes = [int(size) for size in sizes]
+        self.offsets = offset + np.cumsum([0] + self.sizes[:-1])
+
+    def _read(self, start, stop):
+        """Decompress the chunks with rows start to stop."""
+        c1 = start // self.nrows
+        c2 = max(c1, (stop - 1) // self.nrows + 1)
+        buf = b''
+        if c2 > c1:
+            self.fd.seek(int(self.offsets[c1]))
+            for size in self.sizes[c1:c2]:
+                buf += self.decompress(self.fd.read(size))
+        a = np.frombuffer(buf, self.dtype)
+        a.shape = (-1,) + self.shape[1:]
+        start -= c1 * self.nrows
+        stop -= c1 * self.nrows
+        return a[start:max(start, stop)].copy()
+
+    def proxy(self, *indices):
+        return CompressedArrayProxy(self, indices)
+
+
+class CompressedArrayProxy:
+    """Part of a compressed array.
+
+    The chunk with the data is decompressed the first time the proxy is
+    read or indexed."""
+    def __init__(self, reader, indices):
+        self.reader = reader
+        self.indices = indices
+        self.shape = reader.shape[len(indices):]
+        self.dtype = reader.dtype
+        self.ndim = len(self.shape)
+        self.array = None
+
+    def __len__(self):
+        return int(self.shape[0])
+
+    def read(self):
+        return self[:]
+
+    def __getitem__(self, i):
+        if self.array is None:
+            self.array = self.reader[self.indices[0]][self.indices[1:]]
+        a = self.array[i]
+        if isinstance(a, np.ndarray):
+            a = a.copy()
+        return a
+
+
 def print_ulm_info(filename, index=None, verbose=False):
     b = ulmopen(filename, 'r')
     if index is None:
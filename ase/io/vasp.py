@@ -9,6 +9,7 @@ import re
 import ase.units
 
 from ase.utils import basestring
+from ase.io.formats import is_plain_file, find_markers
 
 
 def get_atomtypes(fname):
@@ -228,141 +229,252 @@ def read_vasp(filename='CONTCAR'):
     return atoms
 
 
-def read_vasp_out(filename='OUTCAR', index=-1, force_consistent=False):
-    """Import OUTCAR type file.
+_FUSED_NUMBERS = re.compile('([0-9])-([0-9])')
+# First electronic iteration of an ionic step, e.g. "Iteration    7(   1)"
+_OUTCAR_STEP_START = re.compile(br'Iteration\s*\d+\(\s*1\)')
 
-    Reads unitcell, atom positions, energies, and forces from the OUTCAR file
-    and attempts to read constraints (if any) from CONTCAR/POSCAR, if present.
-    """
+
+def _outcar_floats(text, nrows):
+    """Parse a block of OUTCAR numbers into an array with nrows rows.
+
+    VASP sometimes prints negative numbers without a separating space
+    (e.g. ``0.000-14``); those are split before converting."""
     import numpy as np
-    from ase.calculators.singlepoint import SinglePointCalculator
-    from ase import Atoms, Atom
+    if _FUSED_NUMBERS.search(text):
+        text = _FUSED_NUMBERS.sub(r'\1 -\2', text)
+    return np.array(text.split(), float).reshape((nrows, -1))
 
-    try:  # try to read constraints, first from CONTCAR, then from POSCAR
-        constr = read_vasp('CONTCAR').constraints
-    except Exception:
+
+def _read_outcar_constraints(fd):
+    """Read constraints from CONTCAR or POSCAR next to the OUTCAR file."""
+    name = getattr(fd, 'name', None)
+    if isinstance(name, basestring):
+        directory = os.path.dirname(name)
+    else:
+        directory = ''
+    for fname in ['CONTCAR', 'POSCAR']:
         try:
-            constr = read_vasp('POSCAR').constraints
+            return read_vasp(os.path.join(directory, fname)).constraints
         except Exception:
-            constr = None
+            pass
+    return None
 
-    if isinstance(filename, basestring):
-        f = open(filename)
-    else:  # Assume it's a file-like object
-        f = filename
-    data = f.readlines()
-    natoms = 0
-    images = []
-    atoms = Atoms(pbc=True, constraint=constr)
+
+def _outcar_images(fd, header, force_consistent=False, header_only=False):
+    """Parse OUTCAR lines from fd and yield one Atoms per ionic step.
+
+    The file is read line by line, so only a single ionic step is ever
+    held in memory.  The *header* dict (species, symbols and cell) is
+    updated in place, which allows parsing to resume from the start of
+    any ionic step once the header has been read.  With *header_only*,
+    reading stops at the first ionic step."""
+    from ase import Atoms
+    from ase.calculators.singlepoint import SinglePointCalculator
+
+    species = header['species']
     energy = 0
-    species = []
-    species_num = []
     stress = None
-    symbols = []
+    magnetization = None
+    magmom = None
     ecount = 0
     poscount = 0
-    magnetization = []
-    magmom = None
-
-    for n, line in enumerate(data):
-        if re.search('[0-9]-[0-9]',line):
-            data[n] = re.sub('([0-9])-([0-9])',r'\1 -\2',line)
-    for n, line in enumerate(data):
+    pending = None  # image waiting for its energy
+
+    def finish(image, energy):
+        atoms = Atoms(header['symbols'], positions=image['positions'],
+                      cell=image['cell'], pbc=True,
+                      constraint=header['constraints'])
+        atoms.calc = SinglePointCalculator(atoms, energy=energy,
+                                           forces=image['forces'],
+                                           stress=image['stress'])
+        if image['magnetization'] is not None:
+            atoms.calc.magmoms = image['magnetization']
+            atoms.calc.results['magmoms'] = image['magnetization']
+        if image['magmom'] is not None:
+            atoms.calc.results['magmom'] = image['magmom']
+        return atoms
+
+    for line in fd:
+        if header_only and 'Iteration' in line:
+            return
         if 'POTCAR:' in line:
             temp = line.split()[2]
             for c in ['.', '_', '1']:
                 if c in temp:
                     temp = temp[0:temp.find(c)]
-            species += [temp]
-        if 'ions per type' in line:
-            species = species[:len(species) // 2]
+            species.append(temp)
+        elif 'ions per type' in line:
+            del species[len(species) // 2:]
             temp = line.split()
-            ntypes = min(len(temp)-4, len(species))
+            ntypes = min(len(temp) - 4, len(species))
+            symbols = []
             for ispecies in range(ntypes):
-                species_num += [int(temp[ispecies + 4])]
-                natoms += species_num[-1]
-                for iatom in range(species_num[-1]):
-                    symbols += [species[ispecies]]
-        if 'direct lattice vectors' in line:
-            cell = []
-            for i in range(3):
-                temp = data[n + 1 + i].split()
-                cell += [[float(temp[0]), float(temp[1]), float(temp[2])]]
-            atoms.set_cell(cell)
-        if 'FREE ENERGIE OF THE ION-ELECTRON SYSTEM' in line:
+                symbols += [species[ispecies]] * int(temp[ispecies + 4])
+            header['symbols'] = symbols
+        elif 'direct lattice vectors' in line:
+            block = ''.join(next(fd) for i in range(3))
+            header['cell'] = _outcar_floats(block, 3)[:, :3]
+        elif 'FREE ENERGIE OF THE ION-ELECTRON SYSTEM' in line:
+            lines = [next(fd) for i in range(4)]
             # choose between energy wigh smearing extrapolated to zero
             # or free energy (latter is consistent with forces)
-            energy_zero = float(data[n + 4].split()[6])
-            energy_free = float(data[n + 2].split()[4])
+            energy_zero = float(lines[3].split()[6])
+            energy_free = float(lines[1].split()[4])
             energy = energy_zero
             if force_consistent:
                 energy = energy_free
-            if ecount < poscount:
-                # reset energy for LAST set of atoms, not current one -
-                # VASP 5.11? and up
-                images[-1].calc.results['energy'] = energy
-                images[-1].calc.set(energy=energy)
+            if ecount < poscount and pending is not None:
+                # energy belongs to the LAST set of atoms, not the
+                # current one - VASP 5.11? and up
+                yield finish(pending, energy)
+                pending = None
             ecount += 1
-        if 'magnetization (x)' in line:
-            magnetization = []
-            for i in range(natoms):
-                magnetization += [float(data[n + 4 + i].split()[4])]
-        if 'number of electron' in line:
+        elif 'magnetization (x)' in line:
+            natoms = len(header['symbols'])
+            for i in range(3):
+                next(fd)
+            block = ''.join(next(fd) for i in range(natoms))
+            magnetization = _outcar_floats(block, natoms)[:, 4].copy()
+        elif 'number of electron' in line:
             parts = line.split()
             if len(parts) > 5 and parts[0].strip() != "NELECT":
                 magmom = float(parts[5])
-        if 'in kB ' in line:
-            stress = -np.array([float(a) for a in line.split()[2:]])
+        elif 'in kB ' in line:
+            stress = -_outcar_floats(line.split(None, 2)[2], 1)[0]
             stress = stress[[0, 1, 2, 4, 5, 3]] * 1e-1 * ase.units.GPa
-        if 'POSITION          ' in line:
-            forces = []
-            positions = []
-            for iatom in range(natoms):
-                temp = data[n + 2 + iatom].split()
-                atoms += Atom(symbols[iatom],
-                              [float(temp[0]), float(temp[1]), float(temp[2])])
-                forces += [[float(temp[3]), float(temp[4]), float(temp[5])]]
-                positions += [[float(temp[0]), float(temp[1]), float(temp[2])]]
-            atoms.set_calculator(SinglePointCalculator(atoms,
-                                                       energy=energy,
-                                                       forces=forces,
-                                                       stress=stress))
-            images += [atoms]
-            if len(magnetization) > 0:
-                mag = np.array(magnetization, float)
-                images[-1].calc.magmoms = mag
-                images[-1].calc.results['magmoms'] = mag
-            if magmom is not None:
-                images[-1].calc.results['magmom'] = magmom
-            atoms = Atoms(pbc=True, constraint=constr)
+        elif 'POSITION          ' in line:
+            if pending is not None:
+                yield finish(pending, energy)
+                pending = None
+            natoms = len(header['symbols'])
+            next(fd)
+            block = ''.join(next(fd) for i in range(natoms))
+            data = _outcar_floats(block, natoms)
+            image = {'positions': data[:, :3], 'forces': data[:, 3:],
+                     'cell': header['cell'], 'stress': stress,
+                     'magnetization': magnetization, 'magmom': magmom}
+            if ecount > poscount:
+                # Energy was printed before the positions (old VASP)
+                yield finish(image, energy)
+            else:
+                pending = image
             poscount += 1
 
-    # return requested images, code borrowed from ase/io/trajectory.py
+    if pending is not None:
+        yield finish(pending, energy)
+
+
+def _outcar_step_offset(fd, nsteps):
+    """Find where the nsteps'th last ionic step starts.
+
+    The file is searched backwards, so this is cheap even for very large
+    files.  Returns a byte offset or None if the file contains fewer than
+    nsteps ionic steps."""
+    buf = fd.buffer
+    found = 0
+    for pos in find_markers(fd, b'Iteration', reverse=True,
+                            line_start=False):
+        buf.seek(pos)
+        if _OUTCAR_STEP_START.match(buf.read(64)):
+            found += 1
+            if found == nsteps:
+                return pos
+    return None
+
+
+def iread_vasp_out(filename='OUTCAR', index=slice(None),
+                   force_consistent=False):
+    """Iterate over the images of an OUTCAR type file.
+
+    The file is parsed as a stream, one ionic step at a time, and reading
+    stops as soon as the requested images have been produced.  Negative
+    indices into an uncompressed file are resolved by searching for the
+    last ionic steps from the end of the file, so that reading e.g. the
+    final image does not require parsing the whole file.
+
+    Constraints are read from a CONTCAR or POSCAR file in the same
+    directory as the OUTCAR file, if present."""
+    import itertools
+
+    if isinstance(filename, basestring):
+        fd = open(filename)
+    else:  # Assume it's a file-like object
+        fd = filename
+
     if isinstance(index, int):
-        return images[index]
-    else:
+        index = slice(index, index + 1 or None)
+
+    header = {'species': [], 'symbols': [], 'cell': None,
+              'constraints': _read_outcar_constraints(fd)}
+
+    try:
         step = index.step or 1
-        if step > 0:
-            start = index.start or 0
-            if start < 0:
-                start += len(images)
-            stop = index.stop or len(images)
-            if stop < 0:
-                stop += len(images)
+        start = index.start
+        stop = index.stop
+        if (step > 0 and start is not None and start < 0 and
+            (stop is None or stop < 0) and is_plain_file(fd)):
+            # Read the header and then only the last few ionic steps
+            for atoms in _outcar_images(fd, header, header_only=True):
+                pass
+            nsteps = -start
+            while True:
+                offset = _outcar_step_offset(fd, nsteps)
+                if offset is None:
+                    # Fewer ionic steps than requested: parse everything
+                    header['species'] = []
+                    offset = 0
+                fd.seek(offset)
+                images = list(_outcar_images(fd, dict(header),
+                                             force_consistent))
+                if offset == 0 or len(images) >= -start:
+                    break
+                # Incomplete trailing steps: look further back
+                nsteps += -start - len(images)
+            for atoms in images[index]:
+                yield atoms
+        elif (step > 0 and (start is None or start >= 0) and
+              (stop is None or stop >= 0)):
+            images = _outcar_images(fd, header, force_consistent)
+            for atoms in itertools.islice(images, start, stop, step):
+                yield atoms
         else:
-            if index.start is None:
-                start = len(images) - 1
-            else:
-                start = index.start
-                if start < 0:
-                    start += len(images)
-            if index.stop is None:
-                stop = -1
-            else:
-                stop = index.stop
-                if stop < 0:
-                    stop += len(images)
-        return [images[i] for i in range(start, stop, step)]
+            images = list(_outcar_images(fd, header, force_consistent))
+            for atoms in images[index]:
+                yield atoms
+    finally:
+        if isinstance(filename, basestring):
+            fd.close()
+
+
+def read_vasp_out(filename='OUTCAR', index=-1, force_consistent=False):
+    """Import OUTCAR type file.
+
+    Reads unitcell, atom positions, energies, and forces from the OUTCAR file
+    and attempts to read constraints (if any) from CONTCAR/POSCAR, if present.
+
+    See :func:`iread_vasp_out` for a generator version."""
+    images = iread_vasp_out(filename, index, force_consistent)
+    if isinstance(index, int):
+        for atoms in images:
+            return atoms
+        raise IndexError('No ionic step with index {}'.format(index))
+    return list(images)
+
+
+def _xdatcar_header(lines):
+    """Parse the seven header lines of an XDATCAR file.
+
+    Returns the cell, the chemical formula and the number of atoms."""
+    import numpy as np
+
+    lattice_constant = float(lines[1])
+    cell = np.array([[float(x) for x in line.split()]
+                     for line in lines[2:5]]) * lattice_constant
+    symbols = lines[5].split()
+    numbers = [int(n) for n in lines[6].split()]
+    atomic_formula = ''.join('%s%s' % (sym, n)
+                             for sym, n in zip(symbols, numbers))
+    return cell, atomic_formula, sum(numbers)
 
 
 def read_vasp_xdatcar(filename, index=-1):
@@ -379,42 +491,35 @@ def read_vasp_xdatcar(filename, index=-1):
     import numpy as np
     from ase import Atoms
 
-    images = list()
-
-    cell = np.eye(3)
-    atomic_formula = str()
+    if isinstance(filename, basestring):
+        xdatcar = open(filename, 'r')
+    else:  # Assume it's a file-like object
+        xdatcar = filename
 
-    with open(filename, 'r') as xdatcar:
+    images = list()
 
+    try:
         while True:
             comment_line = xdatcar.readline()
             if "Direct configuration=" not in comment_line:
+                lines = [comment_line] + [xdatcar.readline()
+                                          for i in range(6)]
                 try:
-                    lattice_constant = float(xdatcar.readline())
-                except:
+                    cell, atomic_formula, total = _xdatcar_header(lines)
+                except ValueError:
                     break
 
-                xx = [float(x) for x in xdatcar.readline().split()]
-                yy = [float(y) for y in xdatcar.readline().split()]
-                zz = [float(z) for z in xdatcar.readline().split()]
-                cell = np.array([xx, yy, zz]) * lattice_constant
-
-                symbols = xdatcar.readline().split()
-                numbers = [int(n) for n in xdatcar.readline().split()]
-                total = sum(numbers)
-
-                atomic_formula = str()
-                for n, sym in enumerate(symbols):
-                    atomic_formula += '%s%s' % (sym, numbers[n])
-
                 xdatcar.readline()
 
-            coords = [np.array(xdatcar.readline().split(), np.float)
+            coords = [np.array(xdatcar.readline().split(), float)
                       for ii in range(total)]
 
             image = Atoms(atomic_formula, cell=cell, pbc=True)
             image.set_scaled_positions(np.array(coords))
             images.append(image)
+    finally:
+        if isinstance(filename, basestring):
+            xdatcar.close()
 
     if not index:
         return images
@@ -422,6 +527,50 @@ def read_vasp_xdatcar(filename, index=-1):
         return images[index]
 
 
+def index_vasp_xdatcar(fd):
+    """Return the byte offsets of all configurations in an XDATCAR file.
+
+    Each configuration starts at a "Direct configuration=" line."""
+    return list(find_markers(fd, b'Direct configuration='))
+
+
+def read_frame_vasp_xdatcar(fd, offset):
+    """Read the configuration starting at offset.
+
+    See :func:`index_vasp_xdatcar`."""
+    import numpy as np
+    from ase import Atoms
+
+    fd.seek(0)
+    cell, atomic_formula, total = _xdatcar_header([fd.readline()
+                                                   for i in range(7)])
+
+    # Files from variable cell runs repeat the header in front of every
+    # configuration.  The seven lines in front of the configuration are
+    # a header unless they end the previous configuration, which starts
+    # with its marker total + 1 lines before this one:
+    nlines = max(total + 1, 7)
+    buf = fd.buffer
+    nbytes = 1024
+    while True:
+        begin = max(offset - nbytes, 0)
+        buf.seek(begin)
+        lines = buf.read(offset - begin).decode().splitlines()
+        if len(lines) > nlines or begin == 0:
+            break
+        nbytes *= 4
+    if (len(lines) > total and
+            not lines[-total - 1].startswith('Direct configuration=')):
+        cell, atomic_formula, total = _xdatcar_header(lines[-7:])
+
+    fd.seek(offset)
+    fd.readline()
+    coords = [fd.readline().split() for i in range(total)]
+    atoms = Atoms(atomic_formula, cell=cell, pbc=True)
+    atoms.set_scaled_positions(np.array(coords, float))
+    return atoms
+
+
 def __get_xml_parameter(par):
     """An auxillary function that enables convenient extraction of
     parameter values from a vasprun.xml file with proper type
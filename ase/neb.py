@@ -8,7 +8,7 @@ import numpy as np
 
 import ase.parallel as mpi
 from ase.build import minimize_rotation_and_translation
-from ase.calculators.calculator import Calculator
+from ase.calculators.calculator import Calculator, calculate_batches
 from ase.calculators.singlepoint import SinglePointCalculator
 from ase.io import read
 from ase.optimize import MDMin
@@ -202,7 +202,9 @@ class NEB:
             energies[-1] = images[-1].get_potential_energy()
 
         if not self.parallel:
-            # Do all images - one at a time:
+            # Do all images - one at a time unless the calculators
+            # can do several in one go:
+            calculate_batches(images[1:-1], ['energy', 'forces'])
             for i in range(1, self.nimages - 1):
                 energies[i] = images[i].get_potential_energy()
                 forces[i - 1] = images[i].get_forces()
@@ -1,7 +1,6 @@
 from math import sqrt
 
 import numpy as np
-from scipy import sparse as sp
 
 from ase.data import atomic_numbers
 from ase.geometry import complete_cell
@@ -266,14 +265,14 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
 
                 # Shift vectors.
                 _cell_shift_vector_x_n = \
-                    np.resize(shiftx_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftx_xyz.size)).T
+                    np.repeat(shiftx_xyz.reshape(-1, 1),
+                              max_natoms_per_bin**2, axis=1)
                 _cell_shift_vector_y_n = \
-                    np.resize(shifty_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shifty_xyz.size)).T
+                    np.repeat(shifty_xyz.reshape(-1, 1),
+                              max_natoms_per_bin**2, axis=1)
                 _cell_shift_vector_z_n = \
-                    np.resize(shiftz_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftz_xyz.size)).T
+                    np.repeat(shiftz_xyz.reshape(-1, 1),
+                              max_natoms_per_bin**2, axis=1)
 
                 # We have created too many pairs because we assumed each bin
                 # has exactly max_natoms_per_bin atoms. Remove all surperfluous
@@ -609,6 +608,7 @@ def get_connectivity_matrix(nl, sparse=True):
         raise RuntimeError('Must call update(atoms) on your neighborlist first!')
 
     if sparse:
+        from scipy import sparse as sp
         matrix = sp.dok_matrix((nAtoms, nAtoms), dtype=np.int8)
     else:
         matrix = np.zeros((nAtoms, nAtoms), dtype=np.int8)
@@ -972,3 +972,51 @@ class NeighborList:
     def npbcneighbors(self):
         """Get number of pbc neighbors."""
         return self.nl.npbcneighbors
+
+
+class PairList:
+    """All pairs of a half neighbor list as arrays.
+
+    Pair number p is between atom i[p] and atom j[p] displaced by
+    offsets[p] unit cells.  Calculators use this for updating
+    energies and forces when only a few atoms have moved.
+
+    nl: NeighborList object
+        An up to date neighbor list with bothways=False.
+    natoms: int
+        Number of atoms.
+    """
+
+    def __init__(self, nl, natoms):
+        neighbors = [nl.get_neighbors(a) for a in range(natoms)]
+        self.i = np.repeat(np.arange(natoms),
+                           [len(indices) for indices, offsets in neighbors])
+        self.j = np.zeros(0, int)
+        self.offsets = np.zeros((0, 3), int)
+        if len(self.i):
+            self.j = np.concatenate([indices for indices, offsets
+                                     in neighbors]).astype(int)
+            self.offsets = np.concatenate([offsets for indices, offsets
+                                           in neighbors]).reshape((-1, 3))
+
+        # Pairs of atom a are self.pairs[self.first[a]:self.first[a + 1]]:
+        atoms = np.concatenate([self.i, self.j])
+        order = np.argsort(atoms, kind='mergesort')
+        self.pairs = np.concatenate([np.arange(len(self))] * 2)[order]
+        self.first = first_neighbors(natoms, atoms[order])
+
+    def __len__(self):
+        return len(self.i)
+
+    def get_vectors(self, positions, cell, pairs=slice(None)):
+        """Vectors from atom i to atom j for the given pairs."""
+        return (positions[self.j[pairs]] - positions[self.i[pairs]] +
+                np.dot(self.offsets[pairs], cell))
+
+    def touching(self, indices):
+        """Pairs that one or both of the given atoms are part of."""
+        pairs = [self.pairs[self.first[a]:self.first[a + 1]]
+                 for a in indices]
+        if not pairs:
+            return np.zeros(0, int)
+        return np.unique(np.concatenate(pairs))
@@ -3,9 +3,6 @@ from ase.optimize.gpmin.kernel import SquaredExponential
 
 import numpy as np
 
-from scipy.optimize import minimize
-from scipy.linalg import solve_triangular, cho_factor, cho_solve
-
 from ase.optimize.gpmin.prior import ZeroPrior
 
 class GaussianProcess():
@@ -58,6 +55,7 @@ class GaussianProcess():
         Y: targets (i.e. energy and forces). numpy array with 
             shape (nsamples, D+1)
         noise: Noise parameter in the case it needs to be restated. '''
+        from scipy.linalg import cho_factor, cho_solve
 
         if noise is not None:
             self.noise = noise  # Set noise atribute to a different value
@@ -92,6 +90,7 @@ class GaussianProcess():
         get_variance (bool): if False, only the prediction f is returned
                             if True, the prediction f and the variance V are
                             returned: Note V is O(D*nsample2)'''
+        from scipy.linalg import solve_triangular
 
         n = self.X.shape[0]
         k = self.kernel.kernel_vector(x, self.X, n)
@@ -121,6 +120,7 @@ class GaussianProcess():
         l: The scale for which we compute the marginal likelihood
         *args: Should be a tuple containing the inputs and targets
                in the training set- '''
+        from scipy.linalg import cho_solve
 
         X, Y = args
         self.kernel.set_params(np.array([self.kernel.weight, l , self.noise]))
@@ -156,6 +156,7 @@ class GaussianProcess():
         Y: targets (i.e. energy and forces). 
            numpy array with shape (nsamples, D+1)
         '''
+        from scipy.optimize import minimize
 
         l = np.copy(self.hyperparams)[1]
         arguments = (X, Y)
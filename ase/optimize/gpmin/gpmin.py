@@ -2,7 +2,6 @@ from __future__ import print_function
 
 from ase.optimize.optimize import Optimizer
 import numpy as np
-from scipy.optimize import minimize
 
 from ase.parallel import rank
 
@@ -149,6 +148,7 @@ class GPMin(Optimizer, GaussianProcess):
         self.train(np.array(self.x_list), np.array(self.y_list))
 
     def relax_model(self, r0):
+        from scipy.optimize import minimize
 
         result = minimize(self.acquisition, r0, method='L-BFGS-B', jac=True)
 
@@ -1,6 +1,7 @@
 from __future__ import division, print_function, absolute_import
 import fractions
 import functools
+import itertools
 import re
 from collections import OrderedDict
 
@@ -125,6 +126,59 @@ def print_results(results):
     print('------------------------------------')
 
 
+def _vertices(A, b, eps=1e-9):
+    """Find the vertices of the polytope {x | np.dot(A, x) = b, 0 <= x <= 1}.
+
+    The elements of A and b must be non-negative.  Variables with only
+    zeros in their column of A are set to zero."""
+    assert (A >= 0).all() and (b >= 0).all()
+    cols = np.where(abs(A).sum(0) > 0)[0]
+    rank = np.linalg.matrix_rank(A[:, cols]) if len(cols) else 0
+    # Use only independent equations:
+    rows = []
+    for i in range(len(A)):
+        if np.linalg.matrix_rank(A[rows + [i]][:, cols]) > len(rows):
+            rows.append(i)
+
+    def upper(start, rhs):
+        """Generate sets of variables at their upper bound."""
+        yield [], rhs
+        for n in range(start, len(cols)):
+            c = A[:, cols[n]]
+            if (c <= rhs + eps).all():
+                for S, r in upper(n + 1, rhs - c):
+                    yield [cols[n]] + S, r
+
+    vertices = {}
+    for S, rhs in upper(0, b.astype(float)):
+        rest = [c for c in cols if c not in S]
+        if rank == 0:
+            bases = np.zeros((1, 0), int)
+        else:
+            bases = np.array(list(itertools.combinations(rest, rank)),
+                             int).reshape((-1, rank))
+        M = A[rows][:, bases].transpose((1, 0, 2))
+        ok = abs(np.linalg.det(M)) > eps if rank else np.ones(1, bool)
+        bases = bases[ok]
+        if rank:
+            X = np.linalg.solve(M[ok], rhs[rows][np.newaxis].repeat(ok.sum(),
+                                                                    0))
+        else:
+            X = np.zeros((len(bases), 0))
+        for basis, xb in zip(bases, X):
+            if (xb < -eps).any() or (xb > 1 + eps).any():
+                continue
+            x = np.zeros(A.shape[1])
+            x[S] = 1.0
+            x[basis] = xb.clip(0.0, 1.0)
+            if abs(np.dot(A, x) - b).max() > 1e-7:
+                continue
+            vertices[tuple(x.round(9))] = x
+    if not vertices:
+        raise ValueError('No solution')
+    return np.array(list(vertices.values()))
+
+
 class Pourbaix:
     def __init__(self, references, formula=None, T=300.0, **kwargs):
         """Pourbaix object.
@@ -185,21 +239,49 @@ class Pourbaix:
         Returns optimal coefficients and energy.
         """
 
+        names, energies, dedU, dedpH, eq2, eq1, bounds = self._equations(
+            concentration)
+        energies = energies + U * dedU + pH * dedpH
+
+        if verbose:
+            for i, (name, energy) in enumerate(zip(names, energies)):
+                print('{:<5}{:10}{:10.3f}'.format(i, name, energy))
+
+        try:
+            from scipy.optimize import linprog
+        except ImportError:
+            from ase.utils._linprog import linprog
+        result = linprog(energies, None, None, eq2.T, eq1, bounds)
+
+        if verbose:
+            print_results(zip(names, result.x, energies))
+
+        return result.x, result.fun
+
+    def _equations(self, concentration):
+        """Set up the linear program solved by decompose().
+
+        We want to minimize np.dot(energies, x) under the constraints:
+
+            np.dot(x, eq2) == eq1
+
+        with bounds[i,0] <= x[i] <= bounds[i, 1].
+
+        First two equations are charge and number of hydrogens, and
+        the rest are the remaining species.
+
+        The energies are linear in U and pH: energies + U * dedU +
+        pH * dedpH.  Returns names, energies, dedU, dedpH, eq2, eq1 and
+        bounds."""
+
         alpha = np.log(10) * self.kT
         entropy = -np.log(concentration) * self.kT
 
-        # We want to minimize np.dot(energies, x) under the constraints:
-        #
-        #     np.dot(x, eq2) == eq1
-        #
-        # with bounds[i,0] <= x[i] <= bounds[i, 1].
-        #
-        # First two equations are charge and number of hydrogens, and
-        # the rest are the remaining species.
-
         eq1 = [0, 0] + list(self.count.values())
         eq2 = []
         energies = []
+        dedU = []
+        dedpH = []
         bounds = []
         names = []
         for count, charge, aq, energy, name in self.references:
@@ -208,32 +290,26 @@ class Pourbaix:
             for symbol, n in count.items():
                 eq[self.N[symbol]] = n
             eq2.append(eq)
+            dU = dpH = 0.0
             if name in ['H2O(aq)', 'H+(aq)', 'e-']:
                 bounds.append((-np.inf, np.inf))
                 if name == 'e-':
-                    energy = -U
+                    energy = 0.0
+                    dU = -1.0
                 elif name == 'H+(aq)':
-                    energy = -pH * alpha
+                    energy = 0.0
+                    dpH = -alpha
             else:
                 bounds.append((0, 1))
                 if aq:
                     energy -= entropy
-            if verbose:
-                print('{:<5}{:10}{:10.3f}'.format(len(energies),
-                                                     name, energy))
             energies.append(energy)
+            dedU.append(dU)
+            dedpH.append(dpH)
             names.append(name)
 
-        try:
-            from scipy.optimize import linprog
-        except ImportError:
-            from ase.utils._linprog import linprog
-        result = linprog(energies, None, None, np.transpose(eq2), eq1, bounds)
-
-        if verbose:
-            print_results(zip(names, result.x, energies))
-
-        return result.x, result.fun
+        return (names, np.array(energies), np.array(dedU), np.array(dedpH),
+                np.array(eq2), np.array(eq1, float), bounds)
 
     def diagram(self, U, pH, plot=True, show=True, ax=None):
         """Calculate Pourbaix diagram.
@@ -250,11 +326,13 @@ class Pourbaix:
             When creating plot, plot onto the given axes object.
             If none given, plot onto the current one.
         """
-        a = np.empty((len(U), len(pH)), int)
-        a[:] = -1
         colors = {}
-        f = functools.partial(self.colorfunction, colors=colors)
-        bisect(a, U, pH, f)
+        a = self._phases(np.asarray(U, float), np.asarray(pH, float), colors)
+        if a is None:
+            a = np.empty((len(U), len(pH)), int)
+            a[:] = -1
+            f = functools.partial(self.colorfunction, colors=colors)
+            bisect(a, U, pH, f)
         compositions = [None] * len(colors)
         names = [ref[-1] for ref in self.references]
         for indices, color in colors.items():
@@ -296,6 +374,76 @@ class Pourbaix:
 
         return a, compositions, text
 
+    def _phases(self, U, pH, colors, concentration=1e-6):
+        """Find the stable combination of references on a (U, pH) grid.
+
+        The equations for charge, hydrogen and oxygen give the
+        coefficients of e-, H+(aq) and H2O(aq), and what remains is a
+        linear program over the box 0 <= x <= 1 that does not depend on U
+        and pH.  Its vertices are found once, and for each grid point the
+        vertex with the lowest energy is picked with a matrix product.
+
+        Returns array of colors like the one made with colorfunction()
+        (None if H2O(aq) or H+(aq) is missing)."""
+
+        names, e0, dedU, dedpH, eq2, eq1, bounds = self._equations(
+            concentration)
+        A = eq2.T
+        free = [names.index(name) for name in ['H2O(aq)', 'H+(aq)', 'e-']
+                if name in names]
+        if len(free) < 3:
+            return None
+        rows = [0, 1, self.N['O']]
+        others = [i for i in range(len(A)) if i not in rows]
+        y = [i for i in range(len(names)) if i not in free]
+
+        # x[free] = x0 - np.dot(P, x[y]):
+        Minv = np.linalg.inv(A[rows][:, free])
+        x0 = np.dot(Minv, eq1[rows])
+        P = np.dot(Minv, A[rows][:, y])
+
+        # Energies of the remaining references after eliminating the
+        # free ones (rows: constant, dE/dU and dE/dpH):
+        E = np.array([e0, dedU, dedpH])
+        g = E[:, y] - np.dot(E[:, free], P)
+
+        # References that contain none of the remaining species are
+        # either fully included or not at all:
+        B = A[others][:, y]
+        zero = np.where(abs(B).sum(0) == 0)[0]
+        vertices = _vertices(B, eq1[others])
+        cost = np.dot(vertices, g.T)
+
+        nv = len(vertices)
+        keys = np.empty((len(U), len(pH)), int)
+        chunksize = max(1, 10**7 // (len(pH) * (nv + len(zero))))
+        for i in range(0, len(U), chunksize):
+            u = U[i:i + chunksize, np.newaxis, np.newaxis]
+            e = cost[:, 0] + u * cost[:, 1] + pH[:, np.newaxis] * cost[:, 2]
+            k = e.argmin(2)
+            ez = g[0, zero] + u * g[1, zero] + pH[:, np.newaxis] * g[2, zero]
+            k += np.dot(ez < 0, nv * 2**np.arange(len(zero)))
+            keys[i:i + chunksize] = k
+
+        # Give the combinations colors in the order they are found:
+        unique, first, inverse = np.unique(keys, return_index=True,
+                                           return_inverse=True)
+        keycolors = np.empty(len(unique), int)
+        for j in np.argsort(first):
+            v, bits = unique[j] % nv, unique[j] // nv
+            x = np.zeros(len(names))
+            x[y] = vertices[v]
+            x[np.array(y)[zero]] = (bits >> np.arange(len(zero))) & 1
+            x[free] = x0 - np.dot(P, x[y])
+            indices = tuple(np.where(abs(x) > 1e-7)[0])
+            color = colors.get(indices)
+            if color is None:
+                color = len(colors)
+                colors[indices] = color
+            keycolors[j] = color
+
+        return keycolors[inverse].reshape(keys.shape)
+
     def colorfunction(self, U, pH, colors):
         coefs, energy = self.decompose(U, pH, verbose=False)
         indices = tuple(sorted(np.where(abs(coefs) > 1e-7)[0]))
@@ -446,6 +594,69 @@ class PhaseDiagram:
 
         return energy, indices, np.array(coefs)
 
+    def decompose_many(self, formulas, energies=None):
+        """Decompose many compositions at once.
+
+        formulas: list of str or dict, or 2-d ndarray
+            Stoichiometries (like ``'ZnO'`` or ``{'Zn': 1, 'O': 1}``) or an
+            array with the number of atoms of each species (in the order
+            of the species of the phase diagram), one row per composition.
+        energies: 1-d array-like
+            Total energies of the compositions.  If given, their energies
+            above the convex hull are calculated.
+
+        The energy of the convex hull is the largest of the energies of the
+        planes through its simplices, so the simplices are found for all
+        compositions with one matrix product.
+
+        Returns arrays of energies, indices of references and
+        coefficients with one row per composition (see
+        :meth:`decompose`) and the energies above the convex hull per atom
+        (None if *energies* is not given)."""
+
+        if isinstance(formulas, np.ndarray):
+            counts = formulas.astype(float).reshape((-1, len(self.species)))
+        else:
+            counts = np.zeros((len(formulas), len(self.species)))
+            for count, formula in zip(counts, formulas):
+                if isinstance(formula, basestring):
+                    formula = parse_formula(formula)[0]
+                for symbol, n in formula.items():
+                    count[self.species[symbol]] = n
+        N = counts.sum(1)
+        x = counts[:, 1:] / N[:, np.newaxis]
+
+        # Planes through the simplices: e = c0 + c1 * x1 + c2 * x2 + ...
+        # (degenerate simplices are skipped like in decompose()):
+        points = self.points[self.simplices]
+        A = points[:, :, :-1].copy()
+        A[:, :, 0] = 1.0
+        ok = np.where(abs(np.linalg.det(A)) > 1e-12)[0]
+        planes = np.linalg.solve(A[ok], points[ok, :, -1])
+
+        simplices = np.empty(len(x), int)
+        chunksize = max(1, 10**7 // len(planes))
+        for i in range(0, len(x), chunksize):
+            e = np.dot(x[i:i + chunksize], planes[:, 1:].T) + planes[:, 0]
+            simplices[i:i + chunksize] = ok[e.argmax(1)]
+
+        # Coordinates within the simplices:
+        b = np.hstack([np.ones((len(x), 1)), x])
+        scaledcoefs = np.linalg.solve(A[simplices].transpose((0, 2, 1)),
+                                      b[:, :, np.newaxis])[:, :, 0]
+
+        indices = self.simplices[simplices]
+        hull_energies = N * (scaledcoefs * self.points[indices, -1]).sum(1)
+        natoms = np.array([ref[3] for ref in self.references])
+        coefs = scaledcoefs * N[:, np.newaxis] / natoms[indices]
+
+        if energies is None:
+            above = None
+        else:
+            above = (np.asarray(energies) - hull_energies) / N
+
+        return hull_energies, indices, coefs, above
+
     def plot(self, ax=None, dims=None, show=True):
         """Make 2-d or 3-d plot of datapoints and convex hull.
 
@@ -12,6 +12,7 @@ import numpy.linalg as la
 import numpy.fft as fft
 
 import ase.units as units
+from ase.calculators.calculator import supports_batch
 from ase.parallel import rank
 from ase.dft import monkhorst_pack
 from ase.io.trajectory import Trajectory
@@ -29,7 +30,9 @@ class Displacement:
     the different displacements in its ``run`` member function.
 
     Derived classes must overwrite the ``__call__`` member function which is
-    called for each atomic displacement.
+    called for each atomic displacement.  They can also overwrite
+    ``batch_supported`` and ``call_batch`` to do all the displacements
+    in one go.
 
     """
 
@@ -83,6 +86,18 @@ class Displacement:
 
         raise NotImplementedError("Implement in derived classes!.")
 
+    def call_batch(self, images):
+        """Member function called in ``run`` for many displacements at once.
+
+        Only used if ``batch_supported()`` returns True.  Must return a
+        list with the output for each of the images."""
+
+        raise NotImplementedError
+
+    def batch_supported(self):
+        """Whether ``run`` should use ``call_batch`` (default: False)."""
+        return False
+
     def set_atoms(self, atoms):
         """Set the atoms to vibrate.
 
@@ -142,54 +157,90 @@ class Displacement:
         assert self.calc is not None, "Provide calculator in __init__ method"
         atoms_N.set_calculator(self.calc)
 
-        # Do calculation on equilibrium structure
-        self.state = 'eq.pckl'
-        filename = self.name + '.' + self.state
-
-        fd = opencew(filename)
-        if fd is not None:
-            # Call derived class implementation of __call__
-            output = self.__call__(atoms_N)
-            # Write output to file
-            if rank == 0:
-                pickle.dump(output, fd, protocol=2)
-                sys.stdout.write('Writing %s\n' % filename)
-                fd.close()
-            sys.stdout.flush()
-
         # Positions of atoms to be displaced in the reference cell
         natoms = len(self.atoms)
         offset = natoms * self.offset
         pos = atoms_N.positions[offset: offset + natoms].copy()
 
-        # Loop over all displacements
+        # Equilibrium structure and all displacements
+        displacements = [('eq.pckl', None)]
         for a in self.indices:
             for i in range(3):
                 for sign in [-1, 1]:
-                    # Filename for atomic displacement
-                    self.state = '%d%s%s.pckl' % (a, 'xyz'[i], ' +-'[sign])
-                    filename = self.name + '.' + self.state
-                    # Wait for ranks before checking for file
-                    # barrier()
-                    fd = opencew(filename)
-                    if fd is None:
-                        # Skip if already done
-                        continue
-
-                    # Update atomic positions
-                    atoms_N.positions[offset + a, i] = \
-                        pos[a, i] + sign * self.delta
-
-                    # Call derived class implementation of __call__
-                    output = self.__call__(atoms_N)
-                    # Write output to file
-                    if rank == 0:
-                        pickle.dump(output, fd, protocol=2)
-                        sys.stdout.write('Writing %s\n' % filename)
-                        fd.close()
-                    sys.stdout.flush()
-                    # Return to initial positions
-                    atoms_N.positions[offset + a, i] = pos[a, i]
+                    state = '%d%s%s.pckl' % (a, 'xyz'[i], ' +-'[sign])
+                    x = pos[a, i] + sign * self.delta
+                    displacements.append((state, (offset + a, i, x)))
+
+        if self.batch_supported():
+            self.run_batch(atoms_N, displacements)
+            return
+
+        for self.state, displacement in displacements:
+            # Filename for atomic displacement
+            filename = self.name + '.' + self.state
+            # Wait for ranks before checking for file
+            # barrier()
+            fd = opencew(filename)
+            if fd is None:
+                # Skip if already done
+                continue
+
+            if displacement is not None:
+                # Update atomic positions
+                b, i, x = displacement
+                x0 = atoms_N.positions[b, i]
+                atoms_N.positions[b, i] = x
+
+            # Call derived class implementation of __call__
+            output = self.__call__(atoms_N)
+            self.write_output(output, filename, fd)
+
+            if displacement is not None:
+                # Return to initial positions
+                atoms_N.positions[b, i] = x0
+
+    def run_batch(self, atoms_N, displacements):
+        """Do all missing displacements with one call to ``call_batch``."""
+
+        filenames = []
+        fds = []
+        images = []
+        nwritten = 0
+        try:
+            for state, displacement in displacements:
+                filename = self.name + '.' + state
+                fd = opencew(filename)
+                if fd is None:
+                    continue
+                filenames.append(filename)
+                fds.append(fd)
+                atoms = atoms_N.copy()
+                if displacement is not None:
+                    b, i, x = displacement
+                    atoms.positions[b, i] = x
+                images.append(atoms)
+
+            if images:
+                outputs = self.call_batch(images)
+                for output, filename, fd in zip(outputs, filenames, fds):
+                    self.write_output(output, filename, fd)
+                    nwritten += 1
+        finally:
+            # Empty files would be taken as finished displacements:
+            if rank == 0:
+                for filename, fd in zip(filenames[nwritten:],
+                                        fds[nwritten:]):
+                    fd.close()
+                    remove(filename)
+
+    def write_output(self, output, filename, fd):
+        """Write output to file."""
+
+        if rank == 0:
+            pickle.dump(output, fd, protocol=2)
+            sys.stdout.write('Writing %s\n' % filename)
+            fd.close()
+        sys.stdout.flush()
 
     def clean(self):
         """Delete generated pickle files."""
@@ -293,6 +344,23 @@ class Phonons(Displacement):
 
         return forces
 
+    def batch_supported(self):
+        """Use batches if the calculator has its own calculate_batch()."""
+
+        return supports_batch(self.calc)
+
+    def call_batch(self, images):
+        """Calculate forces for many supercells in one go."""
+
+        results = self.calc.calculate_batch(images, ['forces'])
+        output = []
+        for atoms, result in zip(images, results):
+            forces = result['forces'].copy()
+            for constraint in atoms.constraints:
+                constraint.adjust_forces(atoms, forces)
+            output.append(forces)
+        return output
+
     def check_eq_forces(self):
         """Check maximum size of forces in the equilibrium structure."""
 
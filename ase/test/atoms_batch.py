@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+
+from ase.batch import AtomsBatch
+from ase.build import bulk, molecule
+from ase.calculators.emt import EMT
+from ase.db import connect
+from ase.io import read
+from ase.neighborlist import neighbor_list
+
+images = []
+for i in range(6):
+    if i % 2:
+        atoms = bulk('Cu', cubic=True) * (1, 1, i)
+        atoms.pbc = [True, True, i != 3]
+        atoms.positions += 2.0
+    else:
+        atoms = molecule('CH3CH2OH' if i == 2 else 'H2O')
+        atoms.set_tags(1)
+    atoms.rattle(stdev=0.1, seed=i)
+    if i != 4:
+        atoms.calc = EMT()
+        atoms.get_forces()
+    images.append(atoms)
+images[5].set_masses(np.arange(len(images[5])) + 1.0)
+
+batch = AtomsBatch(images)
+assert len(batch) == 6
+assert (batch.get_number_of_atoms() == [len(a) for a in images]).all()
+assert len(batch.positions) == sum(len(a) for a in images)
+assert (batch.get_frame_indices()[batch.slice(3)] == 3).all()
+
+
+def check(images, batch):
+    assert len(images) == len(batch)
+    for atoms, atoms2 in zip(images, batch):
+        assert atoms == atoms2
+        assert (atoms.get_tags() == atoms2.get_tags()).all()
+        assert abs(atoms.get_masses() - atoms2.get_masses()).max() < 1e-12
+        if atoms.calc is None:
+            assert atoms2.calc is None
+        else:
+            e = atoms.get_potential_energy()
+            assert abs(atoms2.get_potential_energy() - e) < 1e-12
+            f = atoms.get_forces()
+            assert abs(atoms2.get_forces() - f).max() < 1e-12
+
+
+check(images, batch)
+check(images[1::2], batch[1::2])
+check([images[0], images[5]], batch[[0, -1]])
+
+# Views:
+atoms = batch[1]
+atoms.positions[0] = 42.0
+assert (batch.positions[batch.offsets[1]] == 42.0).all()
+atoms.positions[0] = images[1].positions[0]
+
+# Vectorized operations:
+assert abs(batch.get_volumes() -
+           [abs(np.linalg.det(a.cell)) for a in images]).max() < 1e-10
+for wrap in [False, True]:
+    scaled = batch.get_scaled_positions(wrap=wrap)
+    for i, atoms in enumerate(images):
+        if atoms.cell.any(1).all():
+            ref = atoms.get_scaled_positions(wrap=wrap)
+            assert abs(scaled[batch.slice(i)] - ref).max() < 1e-12
+
+batch.wrap()
+for i, atoms in enumerate(images):
+    atoms = atoms.copy()
+    if atoms.pbc.any():
+        atoms.wrap()
+    assert abs(batch[i].positions - atoms.positions).max() < 1e-10
+
+i, j, d = batch.neighbor_list('ijd', 2.6)
+offset = 0
+for n, atoms in enumerate(images):
+    i0, j0, d0 = neighbor_list('ijd', atoms, 2.6)
+    mask = batch.get_frame_indices()[i] == n
+    assert (i[mask] == i0 + offset).all()
+    assert (j[mask] == j0 + offset).all()
+    assert np.allclose(d[mask], d0)
+    offset += len(atoms)
+
+# Reuse of the pairs for small displacements:
+rattled = []
+for n in range(4):
+    atoms = bulk('Cu', cubic=True) * 2
+    atoms.rattle(0.02 * n, seed=n)
+    rattled.append(atoms)
+small = AtomsBatch(rattled)
+for cutoff in [3.0, np.ones(len(small.numbers)) * 1.5]:
+    i, j, D = small.neighbor_list('ijD', cutoff)
+    i2, j2, D2 = small.neighbor_list('ijD', cutoff, skin=0.3)
+    pairs = sorted(zip(i, j, D.round(8).tolist()))
+    assert pairs == sorted(zip(i2, j2, D2.round(8).tolist()))
+
+# Files and databases:
+for name in ['batch.traj', 'batch.db']:
+    if os.path.exists(name):
+        os.remove(name)
+    batch.write(name)
+    assert len(read(name, ':')) == 6
+    check(list(batch), AtomsBatch.read(name))
+assert len(AtomsBatch.from_db(connect('batch.db'), 'Cu')) == 3
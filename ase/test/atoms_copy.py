@@ -0,0 +1,53 @@
+"""Timings of copying, slicing and extending Atoms with constraints.
+
+For 10, 1000 and 100000 atoms.  The FixAtoms constraint used to make
+slicing scale quadratically with the number of atoms."""
+import time
+
+import numpy as np
+
+from ase import Atoms
+from ase.constraints import FixAtoms, FixedLine
+
+for n in [10, 1000, 100000]:
+    atoms = Atoms('H%d' % n, positions=np.random.rand(n, 3))
+    atoms.set_tags(range(n))
+    atoms.set_momenta(np.ones((n, 3)))
+    atoms.set_constraint([FixAtoms(indices=range(0, n, 2)),
+                          FixedLine(n - 1, [0, 0, 1])])
+    every_other = list(range(0, n, 2))
+    mask = np.arange(n) % 3 == 0
+    repeats = max(1, 10000 // n)
+    timings = []
+    for name, func in [('copy', atoms.copy),
+                       ('slice', lambda: atoms[::2]),
+                       ('list', lambda: atoms[every_other]),
+                       ('mask', lambda: atoms[mask]),
+                       ('extend', lambda: atoms.copy().extend(atoms))]:
+        t0 = time.time()
+        for i in range(repeats):
+            func()
+        timings.append('{}: {:.1f} us'.format(
+            name, (time.time() - t0) / repeats * 1e6))
+    print('{:6} atoms:'.format(n), ', '.join(timings))
+
+    # Check the shuffled constraints:
+    for subset, index in [(atoms[::2], every_other),
+                          (atoms[every_other], every_other),
+                          (atoms[mask], np.arange(n)[mask])]:
+        tags = subset.get_tags()
+        assert (tags == index).all()
+        fixed = tags[subset.constraints[0].index]
+        assert (fixed % 2 == 0).all()
+        assert len(fixed) == (tags % 2 == 0).sum()
+        assert subset.constraints[0].removed_dof == 3 * len(fixed)
+        if (n - 1) in index:
+            assert subset.constraints[1].a == len(subset) - 1
+        else:
+            assert len(subset.constraints) == 1
+        subset.positions[0] = -1.0
+    assert (atoms.positions >= 0).all()
+
+    copy = atoms.copy()
+    copy.constraints[0].index[0] = 1
+    assert atoms.constraints[0].index[0] == 0
@@ -0,0 +1,133 @@
+"""Compare calculate_batch() with one calculation at a time."""
+import os
+
+from ase import Atoms
+from ase.build import bulk, fcc111, molecule, add_adsorbate
+from ase.calculators.calculator import (Calculator, calculate_batches,
+                                        supports_batch)
+from ase.calculators.emt import EMT
+from ase.calculators.lj import LennardJones
+from ase.calculators.morse import MorsePotential
+from ase.constraints import FixAtoms
+from ase.neb import NEB
+from ase.phonons import Phonons
+from ase.vibrations import Vibrations
+
+
+class SequentialEMT(EMT):
+    calculate_batch = Calculator.calculate_batch
+
+
+class FailingEMT(EMT):
+    def calculate_batch(self, images, properties=['energy', 'forces']):
+        raise RuntimeError('batch failed')
+
+
+class CountingEMT(EMT):
+    def calculate(self, *args, **kwargs):
+        EMT.calculate(self, *args, **kwargs)
+
+
+assert supports_batch(EMT())
+assert not supports_batch(SequentialEMT())
+assert not supports_batch(CountingEMT())
+assert not supports_batch(None)
+
+images = [bulk('Cu', cubic=True) * 2,
+          bulk('Al') * (2, 1, 3),
+          fcc111('Au', (2, 2, 3), vacuum=4.0),
+          molecule('H2O'),
+          Atoms('Ni')]
+images[2].pbc = (1, 0, 0)
+for atoms in images:
+    atoms.rattle(0.05, seed=3)
+
+for calc in [EMT(), SequentialEMT(), MorsePotential(),
+             LennardJones(sigma=2.3, epsilon=0.1)]:
+    results = calc.calculate_batch(images, ['energy', 'forces'])
+    for atoms, result in zip(images, results):
+        single = calc.__class__(**calc.parameters)
+        e = single.get_potential_energy(atoms)
+        f = single.get_forces(atoms)
+        assert abs(e - result['energy']) < 1e-10, (calc, e)
+        assert abs(f - result['forces']).max() < 1e-10, (calc, atoms)
+
+# Stress needs three lattice vectors:
+lj = LennardJones(sigma=2.3, epsilon=0.1)
+periodic = [images[0], images[1]]
+results = lj.calculate_batch(periodic, ['energy', 'forces', 'stress'])
+for atoms, result in zip(periodic, results):
+    s = LennardJones(sigma=2.3, epsilon=0.1).get_stress(atoms)
+    assert abs(s - result['stress']).max() < 1e-10
+
+# Results are stored in calculators that have done the same system before:
+images = [bulk('Cu', cubic=True) for i in range(3)]
+for atoms in images:
+    atoms.calc = EMT()
+    atoms.get_forces()
+    atoms.rattle(0.02, seed=len(images))
+images[0].calc = None
+calculate_batches(images)
+assert images[1].calc.atoms == images[1]
+assert not images[1].calc.calculation_required(images[1], ['forces'])
+
+# NEB, vibrations and phonons with and without batches:
+slab = fcc111('Cu', (2, 2, 3), vacuum=4.0)
+add_adsorbate(slab, 'Cu', 1.8, 'hcp')
+slab.set_constraint(FixAtoms(range(8)))
+final = slab.copy()
+final.positions[-1] += final.cell[0] / 2
+
+
+def neb(calculator):
+    neb_images = [slab.copy()]
+    neb_images += [slab.copy() for i in range(3)]
+    neb_images.append(final.copy())
+    for image in neb_images:
+        image.calc = calculator()
+    band = NEB(neb_images)
+    band.interpolate()
+    f = [band.get_forces() for step in range(2)]
+    return f[1], band.get_potential_energy()
+
+
+f1, e1 = neb(EMT)
+f2, e2 = neb(SequentialEMT)
+assert abs(f1 - f2).max() < 1e-10
+assert abs(e1 - e2) < 1e-10
+
+n2 = Atoms('N2', positions=[(0, 0, 0), (0, 0, 1.1)])
+hessians = []
+for calc in [EMT(), SequentialEMT()]:
+    n2.calc = calc
+    vib = Vibrations(n2, name='batchvib')
+    vib.run()
+    vib.read()
+    hessians.append(vib.H)
+    assert vib.clean() == 13
+assert abs(hessians[0] - hessians[1]).max() < 1e-8
+
+atoms = bulk('Al', 'fcc', a=4.05)
+force_constants = []
+for calc in [EMT(), SequentialEMT()]:
+    ph = Phonons(atoms, calc, supercell=(2, 2, 2), delta=0.05,
+                 name='batchph')
+    ph.run()
+    ph.read(acoustic=True)
+    force_constants.append(ph.C_N)
+    ph.clean()
+    assert not os.path.isfile('batchph.eq.pckl')
+assert abs(force_constants[0] - force_constants[1]).max() < 1e-8
+
+# A failed batch must not leave empty files that look like results:
+n2.calc = FailingEMT()
+for obj in [Vibrations(n2, name='failvib'),
+            Phonons(atoms, FailingEMT(), supercell=(2, 2, 2),
+                    name='failph')]:
+    try:
+        obj.run()
+    except RuntimeError:
+        pass
+    else:
+        assert False
+    assert not [name for name in os.listdir('.') if name.startswith('fail')]
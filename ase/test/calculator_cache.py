@@ -0,0 +1,79 @@
+import os
+
+from ase.build import bulk, molecule
+from ase.calculators.cache import CachedCalculator, cache_key
+from ase.calculators.emt import EMT
+from ase.calculators.lj import LennardJones
+from ase.db import connect
+
+if os.path.exists('cache.db'):
+    os.remove('cache.db')
+
+
+class CountingEMT(EMT):
+    ncalculations = 0
+
+    def calculate(self, *args, **kwargs):
+        CountingEMT.ncalculations += 1
+        EMT.calculate(self, *args, **kwargs)
+
+
+def image(i):
+    atoms = bulk('Cu', cubic=True) * (2, 1, 1)
+    atoms.rattle(stdev=0.05, seed=i)
+    return atoms
+
+
+ref = []
+for i in range(5):
+    atoms = image(i)
+    atoms.calc = EMT()
+    ref.append((atoms.get_potential_energy(), atoms.get_forces()))
+
+
+def run(indices, maxsize=None):
+    """Calculate images using a fresh calculator (like a new script).
+
+    Returns number of hits and misses."""
+    calc = CachedCalculator(CountingEMT(), maxsize=maxsize)
+    for i in indices:
+        atoms = image(i)
+        atoms.calc = calc
+        e, f = ref[i]
+        assert abs(atoms.get_potential_energy() - e) < 1e-12
+        assert abs(atoms.get_forces() - f).max() < 1e-12
+    return calc.hits, calc.misses
+
+
+assert run(range(4)) == (0, 4)
+assert run([3, 2, 1, 0, 3]) == (5, 0)
+assert CountingEMT.ncalculations == 4
+assert len(connect('cache.db')) == 4
+
+# Least recently used is image 3 and it must make room for image 4:
+assert run([1, 2, 0], maxsize=4) == (3, 0)
+assert run([4], maxsize=4) == (0, 1)
+assert len(connect('cache.db')) == 4
+assert run([0, 1, 2, 4]) == (4, 0)
+assert run([3]) == (0, 1)
+assert CountingEMT.ncalculations == 6
+
+# Anything that changes the result changes the key:
+atoms = molecule('H2O')
+calc = LennardJones()
+key = cache_key(atoms, calc)
+assert key == cache_key(atoms.copy(), LennardJones())
+calc.set(sigma=1.1)
+assert cache_key(atoms, calc) != key
+assert cache_key(atoms, EMT()) != key
+for change in ['positions', 'cell', 'pbc', 'magmoms']:
+    atoms2 = atoms.copy()
+    if change == 'positions':
+        atoms2.positions[0, 0] += 1e-10
+    elif change == 'cell':
+        atoms2.cell = [1, 1, 1]
+    elif change == 'pbc':
+        atoms2.pbc = True
+    else:
+        atoms2.set_initial_magnetic_moments([1, 0, 0])
+    assert cache_key(atoms2, LennardJones()) != key, change
@@ -0,0 +1,71 @@
+"""Test binary storage of arrays in the data column."""
+import os
+import sqlite3
+
+import numpy as np
+
+from ase import Atoms
+from ase.db import connect
+from ase.io.jsonio import encode, encode_binary, decode_binary
+
+data = {'dos': np.linspace(0, 1, 1000),
+        'k': np.arange(6).reshape((2, 3)),
+        'chi': np.array([1 + 0.5j, 0.5]),
+        'empty': np.zeros((0, 3)),
+        'mask': np.array([True, False]),
+        'list': [1, 2, 3],
+        'nested': {'a': np.ones(2, np.float32), 'b': 'text'},
+        7: 'int key'}
+
+dct = decode_binary(encode_binary(data))
+assert sorted(dct, key=str) == sorted(data, key=str)
+assert (dct['k'] == data['k']).all()
+
+db = connect('binary.db', append=False)
+id = db.write(Atoms('H'), data=data)
+row = db.get(id)
+assert not isinstance(row._data, dict)  # not decoded yet
+d = row.data
+assert (d.dos == data['dos']).all()
+assert d.k.shape == (2, 3) and d.k.dtype == int
+assert (d.chi == data['chi']).all()
+assert d.empty.shape == (0, 3)
+assert d.mask.dtype == bool
+assert (d.list == [1, 2, 3]).all()
+assert d.nested['a'].dtype == np.float32 and d.nested['b'] == 'text'
+assert d[7] == 'int key'
+d.dos[0] = 42.0  # arrays must be writable
+
+# Updating a row must keep its data:
+db.update(id, x=1)
+assert (db.get(id).data.dos == data['dos']).all()
+
+# Copying rows to databases that can not store the binary form:
+old = connect('old.db', append=False)
+old.write(Atoms())
+con = sqlite3.connect('old.db')
+con.execute("UPDATE information SET value='8' WHERE name='version'")
+con.commit()
+con.close()
+targets = [connect('old.db')]
+if os.environ.get('ASE_TEST_POSTGRES_URL'):
+    targets.append(connect(os.environ['ASE_TEST_POSTGRES_URL']))
+for target in targets:
+    copy = target.get(target.write(db.get(id)))
+    assert (copy.data.dos == data['dos']).all()
+    assert copy.data.nested['b'] == 'text'
+    target.delete([copy.id])
+assert targets[0].version == 8
+old_id = targets[0].write(db.get(id))
+con = sqlite3.connect('old.db')
+txt, = con.execute('SELECT data FROM systems WHERE id=?', (old_id,)).fetchone()
+assert isinstance(txt, str)  # JSON text, not binary
+con.close()
+
+# Data stored as JSON text (version 8 and earlier) can still be read:
+con = sqlite3.connect('binary.db')
+con.execute('UPDATE systems SET data=? WHERE id=?',
+            (encode({'abc': [1.0, 2.0]}), id))
+con.commit()
+con.close()
+assert (db.get(id).data.abc == [1.0, 2.0]).all()
@@ -1,3 +1,5 @@
+import os
+
 from ase import Atoms
 from ase.db import connect
 import ase.db.app as app
@@ -34,3 +36,26 @@ c.get('/default/json/1').data
 c.get('/default/sqlite/1').data
 c.get('/default/sqlite?x=1').data
 c.get('/default/json?x=1').data
+
+# Tables and counts are cached until the database is modified:
+page = c.get('/default/?x=1&page=0').data.decode()
+assert 'out of 1' in page
+ntables = len(app.tables)
+c.get('/default/?x=1&page=0')
+assert len(app.tables) == ntables
+db = app.databases['default']
+db.write(atoms, foo=17.0)
+page = c.get('/default/?x=1&page=0').data.decode()
+assert 'out of 2' in page
+assert len(app.tables) == ntables + 1
+
+# Thumbnails are rendered in the background:
+try:
+    import matplotlib
+except ImportError:
+    matplotlib = 0
+
+if matplotlib:
+    app.thumbnails.join()
+    assert os.path.isfile(os.path.join(app.tmpdir, 'default-2.png'))
+    assert c.get('/default/image/2.png').status_code == 200
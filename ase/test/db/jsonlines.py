@@ -0,0 +1,34 @@
+"""Test the append-only JSON-lines database."""
+from ase import Atoms
+from ase.db import connect
+
+name = 'testase.jsonl'
+db = connect(name, append=False)
+for i in range(10):
+    db.write(Atoms('H'), i=i)
+db.update(3, x=1)
+db.delete([4, 5])
+assert db.write(Atoms('H2')) == 11
+
+with open(name) as fd:
+    nlines = len(fd.readlines())
+assert nlines == 14
+
+# A new connection sees the same rows:
+db2 = connect(name)
+assert len(db2) == 9
+assert db2.get(3).x == 1
+assert [row.id for row in db2.select('i>5')] == [7, 8, 9, 10]
+
+# Rows written by one connection are seen by the other:
+id = db2.write(Atoms('H3'), i=11)
+assert db.get(id).i == 11
+assert db.get(id=id).natoms == 3
+assert len(list(db.select(id=4))) == 0
+
+db.compact()
+with open(name) as fd:
+    assert len(fd.readlines()) == 11
+assert len(db2) == 10
+assert db2.get(3).x == 1
+assert db2.write(Atoms()) == 13
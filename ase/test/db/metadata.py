@@ -13,7 +13,7 @@ plot = {'a': [0, 1, 2],
                    'xlabel': 'blah-blah [eV]',
                    'ylabel': 'Answers'}}
 
-for name in ['md.json', 'md.db']:
+for name in ['md.json', 'md.jsonl', 'md.db']:
     print(name)
     db = connect(name)
     db.write(Atoms('H'), answer=42, kind='atom', foo=True)
@@ -0,0 +1,65 @@
+"""Test storage of per-atom energies and stresses in all backends."""
+import os
+import sqlite3
+
+from ase import Atoms
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.db import connect
+from ase.db.sqlite import init_statements
+
+atoms = bulk('Cu', cubic=True)
+atoms.rattle(0.05, seed=4)
+atoms.calc = EMT()
+energies = atoms.get_potential_energies()
+stresses = atoms.get_stresses()
+
+
+def check(row):
+    assert abs(row.energies - energies).max() < 1e-12
+    assert abs(row.stresses - stresses).max() < 1e-12
+    assert row.stresses.shape == (4, 6)
+    copy = row.toatoms()
+    assert abs(copy.get_potential_energies() - energies).max() < 1e-12
+    assert abs(copy.get_stresses() - stresses).max() < 1e-12
+
+
+names = ['peratom.json', 'peratom.jsonl', 'peratom.db']
+if os.environ.get('ASE_TEST_POSTGRES_URL'):
+    names.append(os.environ['ASE_TEST_POSTGRES_URL'])
+
+for name in names:
+    db = connect(name, append=False)
+    if 'postgres' in name:
+        db.delete([row.id for row in db.select()])
+    id = db.write(atoms)
+    check(db.get(id))
+    for row in db.select(columns=['id', 'numbers', 'positions', 'cell',
+                                  'pbc', 'energies', 'stresses']):
+        check(row)
+    db.update(id, x=1)
+    check(db.get(id))
+    if 'postgres' in name:
+        db.delete([id])
+
+# A version 9 file gets the new columns when they are needed:
+con = sqlite3.connect('v9.db')
+for statement in init_statements:
+    statement = statement.replace(
+        """charge REAL,
+    energies BLOB,  -- per-atom properties
+    stresses BLOB)""", 'charge REAL)')
+    con.execute(statement.replace("'version', '10'", "'version', '9'"))
+con.commit()
+con.close()
+db = connect('v9.db')
+h = Atoms('H')
+h.calc = SinglePointCalculator(h, energy=1.0)
+id1 = db.write(h)
+assert db.version == 9
+id2 = db.write(atoms)
+assert db.version == 10
+check(db.get(id2))
+assert db.get(id1).energy == 1.0 and 'energies' not in db.get(id1)
+assert connect('v9.db').get(id2).energies.shape == (4,)
@@ -2,7 +2,7 @@ from time import time
 import ase.db
 from ase import Atoms
 
-for name in ['x.json', 'x.db']:
+for name in ['x.json', 'x.jsonl', 'x.db']:
     print(name)
     db = ase.db.connect(name, append=False)
     db.write(Atoms(), x=1, data={'a': 1})
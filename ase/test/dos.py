@@ -43,3 +43,12 @@ for dos, ref in [(dos1, ref1), (dos2, ref2), (dos3, ref3)]:
         plt.plot(energies, ref)
         plt.show()
     dims += 1
+
+# Several bands with weights are done at once and must add up:
+eigs = np.random.RandomState(42).rand(4, 5, 3, 6)
+weights = np.random.RandomState(17).rand(4, 5, 3, 6)
+energies = np.linspace(-0.1, 1.1, 100)
+dos = ltidos(cell, eigs, energies, weights)
+dosn = sum(ltidos(cell, eigs[..., n:n + 1], energies, weights[..., n:n + 1])
+           for n in range(6))
+assert abs(dos - dosn).max() < 1e-12
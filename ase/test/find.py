@@ -0,0 +1,60 @@
+"""Test ase find and its cache."""
+import os
+import sys
+import time
+
+from ase.build import bulk, molecule
+from ase.cli.main import main
+from ase.db import connect
+from ase.io import write
+from ase.utils import StringIO
+
+os.mkdir('findme')
+write('findme/h2o.xyz', molecule('H2O'))
+write('findme/cu.traj', bulk('Cu') * 2)
+with open('findme/notes.txt', 'w') as fd:
+    fd.write('nothing here\n')
+
+
+def find(query=None, *args):
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    try:
+        main(args=['find', 'findme'] + ([query] if query else []) +
+             ['--cache', 'find.db'] + list(args))
+        return sorted(sys.stdout.getvalue().split())
+    finally:
+        sys.stdout = stdout
+
+
+for jobs in ['1', '2']:
+    for i in range(2):  # second time from the cache
+        assert find(None, '-j', jobs) == ['findme/cu.traj', 'findme/h2o.xyz']
+        assert find('H>1', '-j', jobs) == ['findme/h2o.xyz']
+        assert find('pbc=TTT,natoms=8', '-j', jobs) == ['findme/cu.traj']
+    os.remove('find.db')
+
+assert find('H>1') == ['findme/h2o.xyz']
+assert len(connect('find.db')) == 3
+
+# Modified files are read again:
+time.sleep(0.01)
+write('findme/h2o.xyz', molecule('CH4'))
+assert find('C=1') == ['findme/h2o.xyz']
+assert find('H>1', '--no-cache') == ['findme/h2o.xyz']
+assert len(connect('find.db')) == 3
+
+# Removed files are dropped from the cache:
+os.remove('findme/cu.traj')
+assert find() == ['findme/h2o.xyz']
+assert len(connect('find.db')) == 2
+
+# Work without a cache if it can't be created:
+stderr = sys.stderr
+sys.stderr = StringIO()
+try:
+    assert find('C=1', '--cache', 'findme/notes.txt/find.db') == [
+        'findme/h2o.xyz']
+    assert 'Not using cache' in sys.stderr.getvalue()
+finally:
+    sys.stderr = stderr
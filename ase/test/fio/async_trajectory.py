@@ -0,0 +1,48 @@
+"""Test writing of trajectories in a background thread."""
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.io import read
+from ase.io.bundletrajectory import BundleTrajectory
+from ase.io.trajectory import Trajectory
+
+for asynchronous in [False, True]:
+    atoms = bulk('Cu', cubic=True) * (2, 2, 2)
+    atoms.calc = EMT()
+    name = 'async{}'.format(int(asynchronous))
+    traj = Trajectory(name + '.traj', 'w', atoms, asynchronous=asynchronous)
+    bundle = BundleTrajectory(name + '.bundle', 'w', atoms,
+                              asynchronous=asynchronous)
+    for step in range(5):
+        atoms.rattle(seed=step)
+        atoms.info['step'] = step
+        atoms.get_forces()
+        traj.write()
+        bundle.write()
+        # Changing the atoms after write() must not change what is written:
+        atoms.positions[0] = 42.0
+    assert len(traj) == 5
+    traj.close()
+    bundle.close()
+
+for ext in ['traj', 'bundle']:
+    images0 = read('async0.' + ext, ':')
+    images1 = read('async1.' + ext, ':')
+    assert len(images1) == 5
+    for a0, a1 in zip(images0, images1):
+        assert (a0.positions == a1.positions).all()
+        assert a1.positions[0, 0] != 42.0
+        assert a0.get_potential_energy() == a1.get_potential_energy()
+        assert (a0.get_forces() == a1.get_forces()).all()
+        if ext == 'traj':
+            assert a0.info == a1.info
+
+# Errors show up in close():
+traj = Trajectory('error.traj', 'w', asynchronous=True)
+traj.backend.fd.close()
+traj.write(atoms)
+try:
+    traj.close()
+except ValueError:
+    pass
+else:
+    assert 0, 'no error'
@@ -222,3 +222,28 @@ assert singleFrame[-1] == frames[-1]
 os.unlink('append.xyz')
 os.unlink('append.xyz.gz')
 os.unlink('not_append.xyz')
+
+# frame index stored in a sidecar file
+frames = [at * (n, 1, 1) for n in range(1, 8)]
+ase.io.write('index.xyz', frames)
+# slices with and without a partial scan of the file (no sidecar yet):
+for index, expected in [('6:2:-1', [7, 6, 5, 4]), (':2:-1', [7, 6, 5, 4]),
+                        ('2::-1', [3, 2, 1]), ('3:-6:-1', [4, 3]),
+                        ('10:4:-2', [7]), ('1:3', [2, 3]), (':2', [1, 2]),
+                        ('5:-1', [6]), ('-2:', [6, 7])]:
+    images = ase.io.read('index.xyz', index)
+    assert [len(a) // 2 for a in images] == expected, (index, images)
+assert not os.path.exists('index.xyz.idx')
+assert [len(a) for a in ase.io.read('index.xyz', '-3:')] == [10, 12, 14]
+assert len(ase.io.read('index.xyz', 2, sidecar=True)) == 6
+assert len(extxyz.get_xyz_index('index.xyz')) == 7
+assert os.path.exists('index.xyz.idx')
+assert [len(a) for a in ase.io.read('index.xyz', '::-3')] == [14, 8, 2]
+with open('index.xyz') as fd:
+    assert [len(a) for a in extxyz.iread_xyz(fd, slice(1, 3))] == [4, 6]
+# appending a frame makes the index out of date
+ase.io.write('index.xyz', at, append=True)
+assert extxyz.XYZIndex.load('index.xyz') is None
+assert len(ase.io.read('index.xyz')) == 2
+os.unlink('index.xyz')
+os.unlink('index.xyz.idx')
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+from ase.io import read, iread
+from ase.io.lammpsrun import index_lammps_dump, read_lammps_dump
+
+frame = """\
+ITEM: TIMESTEP
+{step}
+ITEM: NUMBER OF ATOMS
+3
+ITEM: BOX BOUNDS xy xz yz pp pp pp
+-1.0 10.0 -0.5
+0.0 11.0 0.0
+0.0 12.0 0.0
+ITEM: ATOMS id type x y z vx vy vz fx fy fz
+3 2 {x} 2.0 3.0 0.1 0.2 0.3 1.0 2.0 3.0
+1 1 0.0 0.0 0.0 0.0 0.0 0.0 0.5 0.5 0.5
+2 1 1.0 0.0 0.0 0.0 0.0 0.0 0.5 0.5 0.5
+"""
+
+fname = 'lammps.dump'
+with open(fname, 'w') as fd:
+    for step in range(5):
+        fd.write(frame.format(step=step * 10, x=float(step)))
+
+try:
+    images = read(fname, ':', format='lammps-dump')
+    assert len(images) == 5
+    atoms = images[2]
+    assert (atoms.numbers == [1, 1, 2]).all()
+    assert np.allclose(atoms.positions[2], [2.0, 2.0, 3.0])
+    assert np.allclose(atoms.cell[1], [-0.5, 11.0, 0.0])
+    assert np.allclose(atoms.get_celldisp(), [[-0.5, 0.0, 0.0]])
+    assert np.allclose(atoms.get_forces()[2], [1.0, 2.0, 3.0])
+
+    x = [atoms.positions[2, 0] for atoms in iread(fname, format='lammps-dump')]
+    assert x == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    with open(fname) as fd:
+        offsets = index_lammps_dump(fd)
+    assert len(offsets) == 5 and offsets[0] == 0
+
+    for index, expected in [(-1, [4.0]), ('-2:', [3.0, 4.0]),
+                            ('::-2', [4.0, 2.0, 0.0]), ('1:4:2', [1.0, 3.0]),
+                            ('-10:', [0.0, 1.0, 2.0, 3.0, 4.0]),
+                            (':-1', [0.0, 1.0, 2.0, 3.0]),
+                            (':-2', [0.0, 1.0, 2.0]),
+                            (slice(None, -2), [0.0, 1.0, 2.0])]:
+        images = read(fname, index, format='lammps-dump')
+        if not isinstance(images, list):
+            images = [images]
+        assert [atoms.positions[2, 0] for atoms in images] == expected
+
+    atoms = read_lammps_dump(fname, columns=['x', 'y', 'z'])
+    assert atoms.calc is None and atoms.get_velocities() is None
+finally:
+    os.remove(fname)
@@ -0,0 +1,63 @@
+"""Test single precision and compressed arrays in trajectories."""
+import os
+
+import numpy as np
+
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.io import Trajectory, read, ulm
+from ase.md.velocitydistribution import MaxwellBoltzmannDistribution
+
+atoms = bulk('Cu', cubic=True) * (3, 3, 3)
+atoms.rattle(seed=17)
+MaxwellBoltzmannDistribution(atoms, 0.1)
+atoms.calc = EMT()
+atoms.get_forces()
+atoms.get_stress()
+
+sizes = {}
+for label, singleprecision in [('double', False),
+                               ('mixed', ['positions', 'forces']),
+                               ('single', True)]:
+    for compression in [None, 'zlib', 'lzma']:
+        name = '{}-{}.traj'.format(label, compression)
+        with Trajectory(name, 'w', singleprecision=singleprecision,
+                        compression=compression) as traj:
+            for i in range(3):
+                traj.write(atoms)
+        sizes[name] = os.path.getsize(name)
+
+        images = read(name, ':')
+        assert len(images) == 3
+        a = images[-1]
+        if singleprecision:
+            tol = 1e-5
+        else:
+            tol = 0.0
+        for x, y in [(a.positions, atoms.positions),
+                     (a.get_forces(), atoms.get_forces()),
+                     (a.get_momenta(), atoms.get_momenta())]:
+            assert x.dtype == float
+            assert abs(x - y).max() <= tol * abs(y).max()
+        assert a.get_potential_energy() == atoms.get_potential_energy()
+        assert (a.get_stress() == atoms.get_stress()).all()
+        assert (a.cell == atoms.cell).all()
+        assert (a.numbers == atoms.numbers).all()
+
+print(sizes)
+assert sizes['single-None.traj'] < 0.6 * sizes['double-None.traj']
+assert sizes['single-zlib.traj'] < sizes['single-None.traj']
+
+# Parts of compressed arrays are decompressed when first used:
+array = np.arange(60.0).reshape((3, 4, 5))
+for compression in [None, 'zlib']:
+    w = ulm.open('proxy.ulm', 'w', compression=compression)
+    w.write(a=array)
+    w.close()
+    r = ulm.open('proxy.ulm')
+    p = r.proxy('a', 1)
+    assert len(p) == 4
+    assert (p[2] == array[1, 2]).all()
+    assert (p.read() == array[1]).all()
+    assert (r.proxy('a', 2, 3)[1:3] == array[2, 3, 1:3]).all()
+    r.close()
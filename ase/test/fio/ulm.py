@@ -44,3 +44,16 @@ print(ulm.open('a.ulm')[2].z)
 print(ulm.open('a.ulm', index=3).proxy('psi')[0:3])
 for d in ulm.open('a.ulm'):
     print(d)
+
+# Single precision and compressed arrays:
+x = np.arange(100000.0).reshape((-1, 4))
+for compression in [None, 'zlib', 'lzma']:
+    with ulm.open('c.ulm', 'w', float32=['y'], compression=compression) as w:
+        w.chunk_size = 4000
+        w.write(x=x, y=x, n=np.arange(7))
+    r = ulm.open('c.ulm')
+    assert r.y.dtype == np.float32
+    assert (r.x == x).all() and (r.y == x).all()
+    assert (r.n == np.arange(7)).all()
+    assert (r.proxy('x')[17:1234:3] == x[17:1234:3]).all()
+    assert (r.proxy('x')[-1] == x[-1]).all()
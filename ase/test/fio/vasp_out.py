@@ -1,5 +1,6 @@
 import os
-from ase.io import read
+from ase.io import read, iread
+from ase.io.vasp import read_vasp_out
 
 outcar = """
  vasp.5.3.3 18Dez12gamma-only
@@ -3945,5 +3946,40 @@ try:
 	a2 = read('OUTCAR', force_consistent=False)
 	assert abs(a2.get_potential_energy() - -68.23102426) < 1e-6
 
+	# Several ionic steps: streaming and reading from the end of the file
+	lines = outcar.splitlines(True)
+	i0 = [i for i, line in enumerate(lines) if 'Iteration' in line][0]
+	i1 = [i for i, line in enumerate(lines)
+	      if 'FREE ENERGIE OF THE ION' in line][0] + 5
+	with open('OUTCAR', 'w') as fd:
+		fd.write(''.join(lines[:i0]))
+		for n in range(4):
+			step = ''.join(lines[i0:i1])
+			step = step.replace('-68.23102426', '{:.8f}'.format(-68.0 - n))
+			fd.write(step.replace('Iteration    1(',
+			                       'Iteration {:4}('.format(n + 1)))
+		# Last ionic step did not finish:
+		fd.write(''.join(lines[i0:i0 + 30]))
+
+	energies = [atoms.get_potential_energy() for atoms in iread('OUTCAR')]
+	assert energies == [-68.0, -69.0, -70.0, -71.0]
+	assert read('OUTCAR').get_potential_energy() == -71.0
+	assert read('OUTCAR', 1).get_potential_energy() == -69.0
+	images = read('OUTCAR', '-3:-1')
+	assert [atoms.get_potential_energy() for atoms in images] == [-69.0, -70.0]
+	assert len(read('OUTCAR', '-10:')) == 4
+
+	# No ionic steps:
+	with open('OUTCAR', 'w') as fd:
+		fd.write(''.join(lines[:i0]))
+	assert read('OUTCAR', ':') == []
+	for index in [0, -1]:
+		try:
+			read_vasp_out('OUTCAR', index)
+		except IndexError:
+			pass
+		else:
+			assert False
+
 finally:
 	os.unlink('OUTCAR')
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Read configurations from XDATCAR files with and without the index."""
+import gzip
+
+import numpy as np
+
+from ase.io import read, iread
+from ase.io.formats import get_ioformat
+
+header = """{1}
+           1
+     {0:11.6f}    0.000000    0.000000
+      0.000000    5.000000    0.000000
+      0.000000    0.000000    5.000000
+   {2}
+     {3}
+"""
+
+# Formula, symbols and counts:
+systems = {3: ('Si2 O', 'Si   O', '2     1'),
+           1: ('Si', 'Si', '1')}
+
+
+def xdatcar(nsteps, variable_cell, natoms=3):
+    text = header.format(5.0, *systems[natoms])
+    for i in range(nsteps):
+        if variable_cell and i > 0:
+            text += header.format(5.0 + 0.1 * i, *systems[natoms])
+        text += 'Direct configuration=     {}\n'.format(i + 1)
+        for j in range(natoms):
+            text += '  {0:.8f}  {1:.8f}  {2:.8f}\n'.format(0.1 * j,
+                                                          0.01 * i, 0.5)
+    return text
+
+
+assert get_ioformat('vasp-xdatcar').index is not None
+
+for natoms, variable_cell in [(3, False), (3, True), (1, False), (1, True)]:
+    text = xdatcar(5, variable_cell, natoms)
+    with open('XDATCAR', 'w') as fd:
+        fd.write(text)
+    with gzip.open('XDATCAR.gz', 'wt') as fd:
+        fd.write(text)
+
+    images = read('XDATCAR', ':', format='vasp-xdatcar')
+    assert len(images) == 5
+    assert images[0].get_chemical_formula() == ('OSi2' if natoms == 3
+                                                else 'Si')
+    for i, atoms in enumerate(images):
+        assert abs(atoms.get_scaled_positions()[:, 1] - 0.01 * i).max() < 1e-8
+        a = 5.0 + 0.1 * i if variable_cell and i > 0 else 5.0
+        assert abs(atoms.cell[0, 0] - a) < 1e-8
+
+    for name in ['XDATCAR', 'XDATCAR.gz']:
+        for index in [-1, -2, '-2:', '::-1', '1:-1:2', ':-3', '-4::2']:
+            if isinstance(index, int):
+                expected = [images[index]]
+                found = [read(name, index, format='vasp-xdatcar')]
+            else:
+                expected = images[slice(*[int(x) if x else None
+                                          for x in index.split(':')])]
+                found = read(name, index, format='vasp-xdatcar')
+            assert len(found) == len(expected), (name, index)
+            for a, b in zip(found, expected):
+                assert a == b
+        assert len(list(iread(name, '-3:', format='vasp-xdatcar'))) == 3
+
+    last = read('XDATCAR', format='vasp-xdatcar')
+    assert np.allclose(last.positions, images[-1].positions)
@@ -0,0 +1,69 @@
+"""Test reading of frames on demand in the GUI."""
+import os
+
+import numpy as np
+
+from ase import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.gui.images import Images, LazyFrames
+from ase.io import write
+
+frames = []
+for i in range(20):
+    atoms = Atoms('H2', [(0, 0, 0), (0, 0, 0.7 + 0.01 * i)])
+    atoms.calc = SinglePointCalculator(atoms, energy=-i,
+                                       forces=np.zeros((2, 3)))
+    frames.append(atoms)
+frames.append(Atoms('H3', [(0, 0, 0), (0, 0, 1), (0, 0, 2)]))
+frames[-1].calc = SinglePointCalculator(frames[-1], energy=0.0)
+
+for name in ['h2.traj', 'h2.xyz', 'h2.db']:
+    write(name, frames)
+
+    images = Images()
+    images.read([name])
+    lazy = images._images
+    assert isinstance(lazy, LazyFrames)
+    assert len(images) == len(frames)
+    assert images.maxnatoms == 2
+    assert images.filenames[3] == name + '@3'
+    lazy.cache_size = 5
+
+    assert abs(images[7].positions[1, 2] - 0.77) < 1e-10
+    assert images[7].get_potential_energy() == -7
+    assert len(images[-1]) == 3
+    assert images.maxnatoms == 3
+    assert len(images.selected) == 3
+
+    xy = images.graph('i, e')
+    assert (xy[0] == np.arange(21)).all()
+    assert (xy[1, :20] == -np.arange(20)).all()
+    xy = images.graph('s, E[i] - E[0]')
+    assert abs(xy[0, 19] - 0.19) < 1e-10
+    assert xy[0, 20] == xy[0, 19]  # number of atoms changes
+    assert (xy[1, :20] == -np.arange(20)).all()
+
+    # Modified frames are not forgotten:
+    images[5].positions[1, 2] = 42.0
+    lazy.queue.join()
+    for atoms in images:
+        pass
+    assert len(lazy.cache) == 5
+    assert images[5].positions[1, 2] == 42.0
+    assert images[6].positions[1, 2] == 0.76
+
+    files = list(lazy.files)
+
+    # Only some of the frames:
+    images.read([name + '@2:10:2'])
+    assert len(images) == 4
+    assert images[1].get_potential_energy() == -4
+
+    # Files of replaced frames are closed:
+    assert lazy.files == []
+    if name == 'h2.xyz':
+        assert files[0].closed
+        assert not images._images.files[0].closed
+
+# Opening an XYZ file does not write an index next to it:
+assert not os.path.exists('h2.xyz.idx')
@@ -0,0 +1,53 @@
+"""Keep "import ase" and the command line tool fast.
+
+Heavy optional dependencies must only be imported when they are needed.
+The total import times are printed so that they can be compared over time.
+"""
+import os
+import subprocess
+import sys
+
+import ase
+from ase.test import NotAvailable
+
+if sys.version_info < (3, 7):
+    raise NotAvailable('python -X importtime needs Python 3.7')
+
+heavy = ['scipy', 'matplotlib', 'flask', 'spglib', 'distutils']
+
+env = dict(os.environ)
+env['PYTHONPATH'] = os.pathsep.join(
+    [os.path.dirname(os.path.dirname(ase.__file__)),
+     env.get('PYTHONPATH', '')])
+
+
+def importtime(*args):
+    """Run Python with -X importtime.
+
+    Returns dict mapping module names to cumulative import times in
+    seconds."""
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime'] + list(args),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            env=env)
+    out, err = proc.communicate()
+    assert proc.returncode == 0, err.decode()
+    times = {}
+    for line in err.decode().splitlines():
+        if line.startswith('import time:'):
+            words = line.split('|')
+            if words[1].strip().isdigit():
+                times[words[2].strip()] = int(words[1]) * 1e-6
+    return times
+
+
+for args, notused in [(['-c', 'import ase'], ['ase.io', 'ase.neighborlist']),
+                      (['-m', 'ase', '--help'], []),
+                      (['-m', 'ase', 'info', '--help'], ['ase.optimize'])]:
+    times = importtime(*args)
+    total = sum(t for name, t in times.items() if '.' not in name)
+    print('python {}: {:.3f} s (ase: {:.3f} s)'
+          .format(' '.join(args), total, times['ase']))
+    for name in times:
+        assert name.split('.')[0] not in heavy, (args, name)
+    for name in notused:
+        assert name not in times, (args, name)
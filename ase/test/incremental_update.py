@@ -0,0 +1,44 @@
+"""Compare incremental updates after moving a few atoms with full ones."""
+import numpy as np
+
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.calculators.lj import LennardJones
+
+rng = np.random.RandomState(17)
+
+for calculator in [EMT, lambda: LennardJones(sigma=2.3, epsilon=0.1)]:
+    atoms = bulk('Cu', cubic=True) * 5
+    atoms.rattle(0.05, seed=2)
+    calc = calculator()
+    calc.full_update_interval = 10
+    atoms.calc = calc
+    atoms.get_forces()
+    nincremental = []
+    for step in range(25):
+        # Move one or two atoms:
+        for a in rng.randint(len(atoms), size=rng.randint(1, 3)):
+            atoms.positions[a] += rng.normal(0, 0.05, 3)
+        e = atoms.get_potential_energy()
+        f = atoms.get_forces()
+        nincremental.append(calc.nincremental)
+        ref = calculator()
+        assert abs(e - ref.get_potential_energy(atoms)) < 1e-10
+        assert abs(f - ref.get_forces(atoms)).max() < 1e-10
+        if isinstance(calc, LennardJones):
+            assert abs(atoms.get_stress() -
+                       ref.get_stress(atoms)).max() < 1e-12
+    assert max(nincremental) == 10
+    assert min(nincremental) == 0
+
+    # Moving everything does a full calculation:
+    atoms.rattle(0.01, seed=3)
+    atoms.get_forces()
+    assert calc.nincremental == 0
+
+# New parameters mean a new calculation:
+lj = LennardJones()
+atoms.calc = lj
+e1 = atoms.get_potential_energy()
+lj.set(epsilon=2.0)
+assert abs(atoms.get_potential_energy() - 2 * e1) < 1e-10
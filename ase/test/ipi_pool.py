@@ -0,0 +1,56 @@
+"""Several SocketClients sharing the work of one SocketPool."""
+import os
+import threading
+
+from ase.calculators.emt import EMT
+from ase.calculators.socketio import SocketClient, SocketPool
+from ase.cluster.icosahedron import Icosahedron
+
+unixsocket = 'ase-test-pool-{}'.format(os.getpid())
+nclients = 3
+ncalculations = [0] * nclients
+
+
+def run_client(i):
+    atoms = Icosahedron('Au', 2)
+    atoms.calc = EMT()
+    client = SocketClient(unixsocket=unixsocket, timeout=20.0)
+    for _ in client.irun(atoms, use_stress=False):
+        ncalculations[i] += 1
+        if i == 0:
+            # Disconnect before returning the forces.  The pool must
+            # give the calculation to one of the other clients:
+            break
+
+
+images = []
+for i in range(12):
+    atoms = Icosahedron('Au', 2)
+    atoms.rattle(stdev=0.05, seed=i)
+    images.append(atoms)
+
+with SocketPool(unixsocket=unixsocket, timeout=20.0) as pool:
+    threads = [threading.Thread(target=run_client, args=(i,))
+               for i in range(nclients)]
+    for thread in threads:
+        thread.start()
+    futures = [pool.submit(atoms) for atoms in images]
+    # Changing the atoms must not change what is calculated:
+    positions = images[0].get_positions()
+    images[0].positions += 1.0
+    results = [future.result() for future in futures]
+    images[0].positions = positions
+    results += pool.map(images[:2])
+    assert 1 <= pool.nclients <= nclients
+
+for thread in threads:
+    thread.join()
+print(ncalculations)
+assert sum(ncalculations[1:]) == len(images) + 2, ncalculations
+assert not os.path.exists('/tmp/ipi_' + unixsocket)
+
+for atoms, result in zip(images + images[:2], results):
+    atoms.calc = EMT()
+    assert abs(result['energy'] - atoms.get_potential_energy()) < 1e-10
+    assert abs(result['forces'] - atoms.get_forces()).max() < 1e-10
+    assert result['virial'].shape == (3, 3)
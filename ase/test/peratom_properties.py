@@ -0,0 +1,75 @@
+"""Check per-atom energies and stresses of the built-in potentials."""
+import numpy as np
+
+from ase.build import bulk, molecule
+from ase.calculators.calculator import PropertyNotImplementedError
+from ase.calculators.eam import EAM
+from ase.calculators.emt import EMT
+from ase.calculators.lj import LennardJones
+from ase.calculators.morse import MorsePotential
+from ase.test.eam_pot import Pt_u3
+
+with open('Pt_u3.eam', 'w') as fd:
+    fd.write(Pt_u3)
+
+
+def lj():
+    return LennardJones(sigma=2.3, epsilon=0.1)
+
+
+def eam():
+    return EAM(potential='Pt_u3.eam', elements=['Pt'])
+
+
+for calculator, symbol in [(EMT, 'Cu'), (lj, 'Cu'), (eam, 'Pt')]:
+    atoms = bulk(symbol, cubic=True) * 2
+    atoms.cell[1, 0] += 0.3
+    atoms.rattle(0.05, seed=1)
+    calc = calculator()
+    atoms.calc = calc
+    e = atoms.get_potential_energy()
+    s = atoms.get_stress()
+    assert abs(atoms.get_potential_energies().sum() - e) < 1e-10
+    assert abs(atoms.get_stresses().sum(0) - s).max() < 1e-12
+    assert abs(calc.calculate_numerical_stress(atoms, d=1e-5) -
+               s).max() < 1e-8
+
+# Incremental updates and batches give the same per-atom values:
+for calculator in [EMT, lj]:
+    atoms = bulk('Cu', cubic=True) * 5
+    atoms.rattle(0.05, seed=2)
+    atoms.calc = calculator()
+    atoms.get_stress()
+    atoms.positions[5] += (0.1, 0.0, -0.05)
+    energies = atoms.get_potential_energies()
+    stresses = atoms.get_stresses()
+    assert atoms.calc.nincremental == 1
+    ref = calculator()
+    assert abs(energies - ref.get_potential_energies(atoms)).max() < 1e-10
+    assert abs(stresses - ref.get_stresses(atoms)).max() < 1e-10
+    result = ref.calculate_batch([atoms], ['energy', 'energies', 'forces',
+                                           'stresses'])[0]
+    assert abs(energies - result['energies']).max() < 1e-10
+    assert abs(stresses - result['stresses']).max() < 1e-10
+
+# Stress needs three lattice vectors:
+h2o = molecule('H2O')
+h2o.calc = EMT()
+try:
+    h2o.get_stresses()
+except PropertyNotImplementedError:
+    pass
+else:
+    assert False
+
+# Morse: half of each pair energy goes to each atom
+atoms = molecule('CH4')
+atoms.calc = MorsePotential(r0=1.5)
+energies = atoms.get_potential_energies()
+e = 0.0
+for i in range(len(atoms)):
+    for j in range(i):
+        expf = np.exp(6.0 * (1.0 - atoms.get_distance(i, j) / 1.5))
+        e += expf * (expf - 2)
+assert abs(energies.sum() - e) < 1e-10
+assert abs(atoms.get_potential_energy() - e) < 1e-10
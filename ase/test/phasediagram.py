@@ -0,0 +1,50 @@
+"""Compare PhaseDiagram.decompose_many() with decompose()."""
+import numpy as np
+
+from ase.phasediagram import PhaseDiagram
+
+rng = np.random.RandomState(7)
+
+refs = [('Zn', 0.0), ('O', 0.0), ('Cu', 0.0)]
+for i in range(30):
+    zn, o, cu = rng.randint(0, 4, 3)
+    if zn + o + cu < 2:
+        continue
+    formula = {'Zn': zn, 'O': o, 'Cu': cu}
+    refs.append((formula, -rng.rand() * (zn + o + cu)))
+pd = PhaseDiagram(refs, verbose=False)
+
+formulas = ['ZnO', 'Zn3O2Cu', 'CuO4', 'Cu', {'Zn': 2, 'Cu': 5}]
+counts = rng.randint(0, 6, (50, 3))
+counts[:, 0] += 1
+formulas += [{symbol: n for symbol, n in zip(pd.symbols, count)}
+             for count in counts]
+
+energies, indices, coefs, above = pd.decompose_many(formulas)
+assert above is None
+for formula, energy, index, coef in zip(formulas, energies, indices, coefs):
+    if isinstance(formula, str):
+        e, i, c = pd.decompose(formula)
+    else:
+        e, i, c = pd.decompose(**formula)
+    assert abs(energy - e) < 1e-10, (formula, energy, e)
+    # Compare the decompositions (there may be zero coefficients):
+    a = np.zeros(len(pd.references))
+    b = np.zeros(len(pd.references))
+    np.add.at(a, index, coef)
+    np.add.at(b, i, c)
+    assert abs(a - b).max() < 1e-10, (formula, a, b)
+
+# Array input and energies above the hull:
+energies2, indices2, coefs2, above = pd.decompose_many(
+    counts, energies=np.zeros(len(counts)))
+assert abs(energies2 - energies[5:]).max() < 1e-12
+assert (above >= -1e-12).all()
+assert abs(above + energies2 / counts.sum(1)).max() < 1e-12
+
+# References on the hull are 0 eV above it:
+names = [ref[0] for ref in refs]
+e = np.array([ref[1] for ref in refs])
+above = pd.decompose_many(names, e)[3]
+assert abs(above[pd.hull]).max() < 1e-10
+assert (above > -1e-10).all()
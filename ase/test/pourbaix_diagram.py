@@ -0,0 +1,23 @@
+"""Compare Pourbaix.diagram() with Pourbaix.decompose()."""
+import numpy as np
+
+from ase.phasediagram import Pourbaix, solvated
+
+refs = solvated('Zn') + [('Zn', 0.0), ('ZnO', -3.323), ('ZnO2(aq)', -2.921),
+                         ('Zn2O', -2.0)]
+for count in [{'Zn': 1, 'O': 1}, {'Zn': 3, 'O': 2}, {'Zn': 1}]:
+    pb = Pourbaix(refs, verbose=False, **count)
+    names = [ref[-1] for ref in pb.references]
+    U = np.linspace(-2, 2, 9)
+    pH = np.linspace(-1, 15, 11)
+    a, compositions, text = pb.diagram(U, pH, plot=False)
+    assert len(compositions) == len(set(compositions)) == len(text)
+    assert sorted(set(a.ravel())) == list(range(len(compositions)))
+    for i, u in enumerate(U):
+        for j, ph in enumerate(pH):
+            coefs, energy = pb.decompose(u, ph, verbose=False)
+            found = ' + '.join(names[k]
+                               for k in np.where(abs(coefs) > 1e-7)[0]
+                               if names[k] not in
+                               ['H2O(aq)', 'H+(aq)', 'e-'])
+            assert compositions[a[i, j]] == found, (count, u, ph)
@@ -6,7 +6,6 @@ from multiprocessing import Process, cpu_count, Queue
 import tempfile
 import unittest
 from glob import glob
-from distutils.version import LooseVersion
 import time
 import traceback
 import warnings
@@ -293,6 +292,7 @@ def summary(results):
 def test(calculators=[], jobs=0,
          stream=sys.stdout, files=None, verbose=False, strict=False):
     """Main test-runner for ASE."""
+    from distutils.version import LooseVersion
 
     if LooseVersion(np.__version__) >= '1.14':
         # Our doctests need this (spacegroup.py)
@@ -26,3 +26,18 @@ for TIPnP in [TIP3P, TIP4P]:
     dF = dimer.calc.calculate_numerical_forces(dimer) - F
     print(dF)
     assert abs(dF).max() < 2e-6
+
+# The same periodic system described by an orthorhombic and by a
+# triclinic cell must give the same energy and forces:
+box = dimer.copy()
+box.cell = [6.0, 6.0, 6.0]
+box.pbc = True
+box.center()
+tri = box.copy()
+tri.set_cell([[6.0, 0, 0], [6.0, 6.0, 0], [0, 6.0, 6.0]])
+for TIPnP in [TIP3P, TIP4P]:
+    box.calc = TIPnP(rc=5.5)
+    tri.calc = TIPnP(rc=5.5)
+    assert abs(box.get_potential_energy() -
+               tri.get_potential_energy()) < 1e-10
+    assert abs(box.get_forces() - tri.get_forces()).max() < 1e-10
@@ -0,0 +1,25 @@
+"""Test the Tkatchenko-Scheffler vdW correction."""
+from ase.build import fcc111, molecule
+from ase.calculators.emt import EMT
+from ase.calculators.vdwcorrection import vdWTkatchenko09prl
+
+mol = molecule('CH3CH2OH')
+mol.center(3.0)
+slab = fcc111('Cu', (2, 2, 3), vacuum=4.0)
+slab.rattle(0.05, seed=42)
+
+for atoms in [mol, slab]:
+    emt = EMT()
+    atoms.calc = emt
+    e0 = atoms.get_potential_energy()
+    f0 = atoms.get_forces()
+    atoms.calc = vdWTkatchenko09prl(hirshfeld=[0.9] * len(atoms),
+                                    calculator=emt, sR=0.94, Rmax=6.0)
+    e = atoms.get_potential_energy()
+    f = atoms.get_forces()
+    assert e < e0
+    # The correction on its own must not exert a net force:
+    assert abs((f - f0).sum(0)).max() < 1e-10
+    df = atoms.calc.calculate_numerical_forces(atoms, d=1e-4) - f
+    print(abs(df).max())
+    assert abs(df).max() < 1e-4
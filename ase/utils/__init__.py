@@ -3,6 +3,7 @@ import functools
 import os
 import pickle
 import sys
+import threading
 import time
 import string
 from importlib import import_module
@@ -27,8 +28,8 @@ from ase.data import covalent_radii
 
 __all__ = ['exec_', 'basestring', 'import_module', 'seterr', 'plural',
            'devnull', 'gcd', 'convert_string_to_fd', 'Lock',
-           'opencew', 'OpenLock', 'rotate', 'irotate', 'givens',
-           'hsv2rgb', 'hsv', 'pickleload', 'FileNotFoundError',
+           'opencew', 'OpenLock', 'BackgroundWriter', 'rotate', 'irotate',
+           'givens', 'hsv2rgb', 'hsv', 'pickleload', 'FileNotFoundError',
            'formula_hill', 'formula_metal', 'PurePath', 'natural_cutoffs']
 
 
@@ -194,6 +195,64 @@ class OpenLock:
         pass
 
 
+class BackgroundWriter:
+    """Call functions one at a time and in order in a background thread.
+
+    Used for overlapping file output with computations.  At most maxsize
+    calls can be waiting; put() blocks when the queue is full.  If a call
+    fails, the rest are skipped and the error is raised by the next call
+    to put(), flush() or close()."""
+
+    def __init__(self, maxsize=2):
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            call = self.queue.get()
+            try:
+                if call is None:
+                    return
+                if self.error is None:
+                    function, args = call
+                    function(*args)
+            except BaseException as x:
+                self.error = x
+            finally:
+                self.queue.task_done()
+
+    def _raise(self):
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise error
+
+    def put(self, function, *args):
+        """Call function(*args) in the background."""
+        self._raise()
+        self.queue.put((function, args))
+
+    def flush(self):
+        """Wait for all calls to finish."""
+        self.queue.join()
+        self._raise()
+
+    def close(self):
+        """Wait for all calls to finish and stop the thread."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        self._raise()
+
+
 def search_current_git_hash(arg, world=None):
     """Search for .git directory and current git commit hash.
 
@@ -11,6 +11,7 @@ from math import sin, pi, sqrt, log
 import numpy as np
 
 import ase.units as units
+from ase.calculators.calculator import supports_batch
 from ase.io.trajectory import Trajectory
 from ase.parallel import rank, paropen
 
@@ -122,6 +123,9 @@ class Vibrations:
         If the program you want to use does not have a calculator in ASE, use
         ``iterdisplace`` to get all displaced structures and calculate the forces
         on your own.
+
+        Calculators with their own ``calculate_batch()`` method get all the
+        missing displacements in one call.
         """
 
         if op.isfile(self.name + '.all.pckl'):
@@ -129,12 +133,48 @@ class Vibrations:
                 'Cannot run calculation. ' +
                 self.name + '.all.pckl must be removed or split in order ' +
                 'to have only one sort of data structure at a time.')
+        if (supports_batch(self.calc) and not self.ir and not self.ram and
+            type(self).calculate is Vibrations.calculate):
+            self.run_batch()
+            return
         for dispName, atoms in self.iterdisplace(inplace=True):
             filename = dispName + '.pckl'
             fd = opencew(filename)
             if fd is not None:
                 self.calculate(atoms, filename, fd)
 
+    def run_batch(self):
+        """Calculate forces for all missing displacements in one batch."""
+        filenames = []
+        fds = []
+        images = []
+        nwritten = 0
+        try:
+            for dispName, atoms in self.iterdisplace():
+                filename = dispName + '.pckl'
+                fd = opencew(filename)
+                if fd is not None:
+                    filenames.append(filename)
+                    fds.append(fd)
+                    images.append(atoms)
+            if not images:
+                return
+            results = self.calc.calculate_batch(images, ['forces'])
+            for filename, fd, result in zip(filenames, fds, results):
+                if rank == 0:
+                    pickle.dump(result['forces'], fd, protocol=2)
+                    sys.stdout.write('Writing %s\n' % filename)
+                    fd.close()
+                nwritten += 1
+        finally:
+            # Empty files would be taken as finished displacements:
+            if rank == 0:
+                for filename, fd in zip(filenames[nwritten:],
+                                        fds[nwritten:]):
+                    fd.close()
+                    os.remove(filename)
+        sys.stdout.flush()
+
     def iterdisplace(self, inplace=False):
         """Yield name and atoms object for initial and displaced structures.
 